@@ -28,3 +28,28 @@ class FirestoreClient:
         raise FileExistsError(
             f"No document found at {collection_name} with the id {document_id}"
         )
+
+    def set(self, collection_name: str, document_id: str, value: dict, merge: bool = False) -> None:
+        """Create or overwrite one document.
+        Args:
+            collection_name: The collection name
+            document_id: The document id
+            value: The document value
+            merge: Only update the given fields instead of replacing the document
+        """
+        self.client.collection(collection_name).document(document_id).set(value, merge=merge)
+
+    def create_parameters_collection(self) -> None:
+        """Create the "parameters" document with the default model parameters."""
+        self.set("parameters", "parameters", {"n_estimators": 100, "criterion": "gini", "n_jobs": None, "backend": "auto"})
+
+    def update_parameters(self, parameters: dict) -> None:
+        """Update the fields of the "parameters" document.
+        Args:
+            parameters: The fields to update
+        """
+        self.set("parameters", "parameters", parameters, merge=True)
+
+    def close(self) -> None:
+        """Close the underlying gRPC channel."""
+        self.client.close()
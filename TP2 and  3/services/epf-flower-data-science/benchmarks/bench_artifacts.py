@@ -0,0 +1,126 @@
+"""
+Model artifact benchmark: packed artifact vs plain joblib pickle.
+
+Trains a forest of `--trees` trees on an Iris-shaped dataset of `--rows`
+rows and saves it as a plain pickle and as packed artifacts with each
+compression. For each file it reports:
+  - the file size;
+  - the time to open it and make a first prediction with the "compiled"
+    engine (cold start of a worker) and with the "sklearn" engine (a pickle
+    is unpickled in both cases);
+  - the memory of `--workers` processes serving it at the same time
+    (compiled engine): RSS, and PSS/USS from /proc/<pid>/smaps_rollup,
+    where pages shared between workers are split (PSS) or left out (USS).
+
+Usage:
+    python benchmarks/bench_artifacts.py --rows 50000 --trees 200 --workers 4
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.services.artifacts import COMPRESSIONS, ModelArtifact, dump_artifact
+
+
+def make_rows(rows, seed):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 3, rows)
+    centers = np.array([[5.0, 3.4, 1.5, 0.2], [5.9, 2.8, 4.3, 1.3], [6.6, 3.0, 5.6, 2.0]])
+    X = (centers[y] + rng.normal(scale=0.35, size=(rows, 4))).astype(np.float32)
+    return X, np.asarray(["setosa", "versicolor", "virginica"])[y]
+
+
+def memory():
+    # Valeurs en kB ; smaps_rollup n'existe que sous Linux
+    values = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    values[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        return {}
+    return {"rss": values.get("Rss", 0), "pss": values.get("Pss", 0),
+            "uss": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)}
+
+
+def serve(path, X, ready, done, results):
+    # Un pickle est désérialisé puis compilé ; un artefact compact est mappé
+    ModelArtifact.open(path).forest.predict(X)
+    results.put(memory())
+    ready.release()
+    done.wait()
+
+
+def measure_workers(path, X, workers):
+    context = multiprocessing.get_context("spawn")
+    ready, done, results = context.Semaphore(0), context.Event(), context.Queue()
+    processes = [context.Process(target=serve, args=(path, X, ready, done, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    # Tous les workers restent vivants pendant la mesure : les pages partagées sont comptées une fois
+    for _ in processes:
+        ready.acquire()
+    samples = [results.get() for _ in processes]
+    done.set()
+    for process in processes:
+        process.join()
+    return {key: sum(sample.get(key, 0) for sample in samples) / 1024 for key in ("rss", "pss", "uss")}
+
+
+def timed(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    X, y = make_rows(args.rows, 0)
+    model = RandomForestClassifier(n_estimators=args.trees, n_jobs=-1, random_state=0).fit(X, y)
+    model.set_params(n_jobs=None)
+    sample = X[:100]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {}
+        buffer = io.BytesIO()
+        joblib.dump(model, buffer)
+        files["pickle"] = os.path.join(tmp, "model-pickle.pkl")
+        with open(files["pickle"], "wb") as f:
+            f.write(buffer.getvalue())
+        for compression in COMPRESSIONS:
+            files[f"packed/{compression}"] = os.path.join(tmp, f"model-{compression}.pkl")
+            with open(files[f"packed/{compression}"], "wb") as f:
+                f.write(dump_artifact(model, compression=compression))
+
+        print(f"{'artifact':>14} {'size (MB)':>10} {'compiled (s)':>13} {'sklearn (s)':>12} "
+              f"{'RSS (MB)':>9} {'PSS (MB)':>9} {'USS (MB)':>9}   ({args.workers} workers)")
+        for name, path in files.items():
+            load_compiled = lambda: ModelArtifact.open(path).forest.predict(sample)
+            load_sklearn = lambda: ModelArtifact.open(path).estimator.predict(sample)
+            workers = measure_workers(path, sample, args.workers)
+            print(f"{name:>14} {os.path.getsize(path) / 2**20:>10.1f} {timed(load_compiled):>13.3f} "
+                  f"{timed(load_sklearn):>12.3f} {workers['rss']:>9.1f} {workers['pss']:>9.1f} {workers['uss']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Inference benchmark: scikit-learn RandomForestClassifier.predict vs CompiledForest.
+
+Fits a forest on the Iris dataset with the parameters of
+src/config/model_parameters.json, checks that both engines return the same
+predictions, then reports the median latency per call at each batch size.
+
+Usage:
+    python benchmarks/bench_compiled_forest.py --batch-sizes 1 32 1024 --repeat 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.services.compiled_forest import CompiledForest
+from src.services.data import load_iris_dataset
+
+
+def median_latency(predict, X, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    config_path = os.path.join(os.path.dirname(__file__), '../src/config/model_parameters.json')
+    with open(config_path) as config_file:
+        params = json.load(config_file)["RandomForestClassifier"]
+
+    df = load_iris_dataset()
+    X = df.drop(columns=['Species']).to_numpy()
+    model = RandomForestClassifier(**params).fit(X, df['Species'].to_numpy())
+    compiled = CompiledForest.from_sklearn(model)
+
+    rng = np.random.default_rng(0)
+    for batch_size in args.batch_sizes:
+        batch = rng.uniform(X.min(axis=0), X.max(axis=0), size=(batch_size, X.shape[1]))
+        assert (model.predict(batch) == compiled.predict(batch)).all()
+        sklearn_time = median_latency(model.predict, batch, args.repeat)
+        compiled_time = median_latency(compiled.predict, batch, args.repeat)
+        print(
+            f"batch={batch_size:<6} sklearn={sklearn_time * 1000:8.3f}ms "
+            f"compiled={compiled_time * 1000:8.3f}ms speed-up x{sklearn_time / compiled_time:.1f}"
+        )
@@ -0,0 +1,86 @@
+"""
+Concurrency benchmark: latency of /hello/{name} while models are being trained.
+
+Runs the application in-process with an ASGI client, measures /hello latency
+when idle, then again while `--trainings` concurrent POST /train-iris-model
+requests are running (identical submissions are merged into one job, so
+this measures a single training run whatever the count). With training off the event loop both series should
+stay in the same range.
+
+Usage:
+    python benchmarks/bench_event_loop.py --trainings 4 --interval-ms 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+from src.app import get_application
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def measure_hello(client, duration, interval):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/hello/bench")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def measure_while_training(client, trainings, interval):
+    start = time.perf_counter()
+    training = asyncio.gather(*(client.post("/train-iris-model?wait=true", timeout=None) for _ in range(trainings)))
+    latencies = []
+    while not training.done():
+        request_start = time.perf_counter()
+        await client.get("/hello/bench")
+        latencies.append(time.perf_counter() - request_start)
+        await asyncio.sleep(interval)
+    responses = await training
+    return latencies, time.perf_counter() - start, [response.status_code for response in responses]
+
+
+def report(name, latencies):
+    print(
+        f"{name:<18} n={len(latencies):<5} "
+        f"p50={statistics.median(latencies) * 1000:8.2f}ms "
+        f"p99={percentile(latencies, 0.99) * 1000:8.2f}ms "
+        f"max={max(latencies) * 1000:8.2f}ms"
+    )
+
+
+async def main(args):
+    app = get_application()
+    interval = args.interval_ms / 1000
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        # Premier entraînement pour démarrer le pool de processus
+        await client.post("/train-iris-model?wait=true", timeout=None)
+
+        idle = await measure_hello(client, args.idle_seconds, interval)
+        busy, elapsed, statuses = await measure_while_training(client, args.trainings, interval)
+
+    report("idle", idle)
+    report("during training", busy)
+    print(f"{args.trainings} trainings finished in {elapsed:.2f}s with statuses {statuses}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trainings", type=int, default=4)
+    parser.add_argument("--interval-ms", type=float, default=10)
+    parser.add_argument("--idle-seconds", type=float, default=2)
+    asyncio.run(main(parser.parse_args()))
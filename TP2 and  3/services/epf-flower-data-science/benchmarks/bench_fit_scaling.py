@@ -0,0 +1,88 @@
+"""
+Forest fit scaling: fit time against core count and n_estimators.
+
+Builds an Iris-shaped dataset of `--rows` rows and fits the
+RandomForestClassifier of `model_parameters.json` through
+`fit_in_parallel`, for every combination of `--n-estimators`, `--n-jobs`
+and `--backend`. Each point is the best of `--repeat` fits; the speed-up
+is relative to n_jobs=1 with the same backend and forest size. n_jobs is
+the value the fit ran with: requests above the available cores minus
+`TRAINING_RESERVED_CORES` are capped. The automatic choice of the training service (`plan_training`) on
+this host is printed first.
+
+Usage:
+    python benchmarks/bench_fit_scaling.py --rows 100000 --n-estimators 50 100 200 --n-jobs 1 2 4 8 16 32
+    python benchmarks/bench_fit_scaling.py --backend threading loky --json results/fit_scaling.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.services.data import load_model_parameters
+from src.services.resources import available_cores, current_plan, fit_in_parallel
+
+
+def make_rows(rows, seed):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 3, rows)
+    centers = np.array([[5.0, 3.4, 1.5, 0.2], [5.9, 2.8, 4.3, 1.3], [6.6, 3.0, 5.6, 2.0]])
+    X = (centers[y] + rng.normal(scale=0.35, size=(rows, 4))).round(1)
+    return X, np.array(["setosa", "versicolor", "virginica"])[y]
+
+
+def fit_time(params, X, y, n_jobs, backend, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        model = RandomForestClassifier(**params)
+        start = time.perf_counter()
+        plan = fit_in_parallel(model, X, y, n_jobs, backend)
+        best = min(best, time.perf_counter() - start)
+    return best, plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--n-estimators", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--n-jobs", type=int, nargs="+", help="default: powers of two up to the available cores")
+    parser.add_argument("--backend", nargs="+", default=["threading"], choices=("threading", "loky"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    cores = available_cores()
+    n_jobs_list = args.n_jobs or sorted({1, *(2 ** i for i in range(1, cores.bit_length()) if 2 ** i <= cores), cores})
+    print(f"{cores} available cores, automatic plan: {current_plan()}")
+
+    X, y = make_rows(args.rows, 0)
+    params = {name: value for name, value in load_model_parameters().items() if name != "n_jobs"}
+    params["random_state"] = 0
+    results = []
+    print(f"{'backend':>10} {'trees':>6} {'n_jobs':>7} {'fit (s)':>9} {'speed-up':>9} {'efficiency':>11}")
+    for backend in args.backend:
+        for n_estimators in args.n_estimators:
+            baseline = None
+            for n_jobs in n_jobs_list:
+                seconds, plan = fit_time({**params, "n_estimators": n_estimators}, X, y, n_jobs, backend, args.repeat)
+                baseline = baseline or seconds
+                speedup = baseline / seconds
+                results.append({"backend": plan["backend"], "n_estimators": n_estimators, "n_jobs": plan["n_jobs"],
+                                "seconds": seconds, "speedup": speedup})
+                print(f"{plan['backend']:>10} {n_estimators:>6} {plan['n_jobs']:>7} {seconds:>9.3f} "
+                      f"{speedup:>8.2f}x {speedup / plan['n_jobs']:>10.0%}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"rows": args.rows, "available_cores": cores, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
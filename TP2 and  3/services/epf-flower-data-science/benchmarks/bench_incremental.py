@@ -0,0 +1,81 @@
+"""
+Retraining benchmark: full refit vs incremental (warm-start) retraining.
+
+Starts from an Iris-shaped dataset of `--rows` rows and appends `--growth`
+(a fraction of the current size) new rows at each of `--steps` steps. At
+each step it measures the wall time of:
+  - "full": `train_incremental(..., mode="full")`, a refit from scratch on
+    the whole training split;
+  - "incremental": `train_incremental(..., mode="incremental")`, which only
+    adds trees for the new rows (or refits if they drift).
+and the accuracy of both models on the rows appended at the next step.
+
+Usage:
+    python benchmarks/bench_incremental.py --rows 100000 --steps 5 --growth 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.services.incremental import train_incremental
+from src.services.model_registry import model_registry
+
+CLASSES = ("setosa", "versicolor", "virginica")
+
+
+def make_rows(rows, seed):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 3, rows).astype(np.int32)
+    centers = np.array([[5.0, 3.4, 1.5, 0.2], [5.9, 2.8, 4.3, 1.3], [6.6, 3.0, 5.6, 2.0]])
+    X = (centers[y] + rng.normal(scale=0.35, size=(rows, 4))).round(1).astype(np.float32)
+    return X, y
+
+
+def accuracy(model_path, X, y):
+    model = model_registry.get(model_path).model
+    return float((model.predict(X) == np.asarray(CLASSES)[y]).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--growth", type=float, default=0.05)
+    args = parser.parse_args()
+
+    X, y = make_rows(args.rows, 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        full_path = os.path.join(tmp, "full.pkl")
+        incremental_path = os.path.join(tmp, "incremental.pkl")
+        train_incremental(X, y, full_path, CLASSES, mode="full")
+        train_incremental(X, y, incremental_path, CLASSES, mode="incremental")
+
+        print(f"{'rows':>10} {'new':>8} {'full (s)':>10} {'incr. (s)':>10} {'speedup':>8} "
+              f"{'mode':>12} {'trees':>6} {'acc full':>9} {'acc incr.':>9}")
+        for step in range(1, args.steps + 1):
+            new_X, new_y = make_rows(int(len(X) * args.growth), step)
+            X, y = np.concatenate([X, new_X]), np.concatenate([y, new_y])
+
+            start = time.perf_counter()
+            train_incremental(X, y, full_path, CLASSES, mode="full")
+            full_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            entry = train_incremental(X, y, incremental_path, CLASSES, mode="incremental")
+            incremental_time = time.perf_counter() - start
+
+            holdout_X, holdout_y = make_rows(5000, 1000 + step)
+            print(f"{len(X):>10} {len(new_X):>8} {full_time:>10.2f} {incremental_time:>10.2f} "
+                  f"{full_time / incremental_time:>7.1f}x {entry['mode']:>12} {entry['n_estimators']:>6} "
+                  f"{accuracy(full_path, holdout_X, holdout_y):>9.3f} "
+                  f"{accuracy(incremental_path, holdout_X, holdout_y):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Instrumentation overhead benchmark.
+
+Calls the application `--requests` times through ASGI, without a server
+or network, on GET /hello/{name}: once as built by `get_application`
+(metrics middleware on), once with the middleware removed. Also times one
+`stage()` block and one scrape of /metrics. The difference is the cost
+of the instrumentation per request.
+
+Usage:
+    python benchmarks/bench_metrics.py --requests 20000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.middleware import MetricsMiddleware
+from src.app import get_application
+from src.services.logs import configure_logging
+from src.services.metrics import metrics, stage
+
+
+async def call(app, path):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def per_request(app, requests):
+    for _ in range(200):
+        await call(app, "/hello/warmup")
+    start = time.perf_counter()
+    for i in range(requests):
+        await call(app, f"/hello/user{i % 100}")
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    instrumented = get_application()
+    bare = get_application()
+    bare.user_middleware = [m for m in bare.user_middleware if m.cls is not MetricsMiddleware]
+    # Le coût mesuré est celui de la décision d'échantillonnage, pas celui de l'écriture des logs
+    configure_logging("WARNING")
+
+    # Mesures alternées, meilleure des trois : le bruit de la machine touche les deux variantes
+    with_metrics, without_metrics = float("inf"), float("inf")
+    for _ in range(3):
+        with_metrics = min(with_metrics, asyncio.run(per_request(instrumented, args.requests)))
+        without_metrics = min(without_metrics, asyncio.run(per_request(bare, args.requests)))
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        with stage("bench"):
+            pass
+    stage_cost = (time.perf_counter() - start) / args.requests
+
+    start = time.perf_counter()
+    text = metrics.render()
+    render_time = time.perf_counter() - start
+
+    print(f"request without metrics : {without_metrics * 1e6:8.1f} us")
+    print(f"request with metrics    : {with_metrics * 1e6:8.1f} us")
+    print(f"middleware overhead     : {(with_metrics - without_metrics) * 1e6:8.1f} us/request")
+    print(f"stage() block           : {stage_cost * 1e6:8.1f} us")
+    print(f"/metrics render         : {render_time * 1e3:8.2f} ms ({len(text.splitlines())} lines)")
+
+
+if __name__ == "__main__":
+    main()
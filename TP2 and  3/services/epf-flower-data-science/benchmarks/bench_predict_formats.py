@@ -0,0 +1,83 @@
+"""
+Bulk prediction throughput by request format.
+
+Trains the Iris model through the API, then posts the same matrix to
+/predict as JSON, raw float32, NPY and Arrow IPC (fixed-size list column),
+in-process through ASGI. Bodies are encoded once beforehand: the timings
+cover decoding, scoring and encoding the predictions, i.e. the server side.
+Predictions are asked for in the format of the request.
+
+Usage:
+    python benchmarks/bench_predict_formats.py --rows 1000 10000 100000 --repeat 5
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import struct
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+import numpy as np
+
+from src.app import get_application
+from src.services.payloads import ARROW, JSON, NPY, RAW_FLOAT32
+
+
+def encode(matrix, media):
+    if media == JSON:
+        return json.dumps({"data": matrix.tolist()}).encode()
+    if media == RAW_FLOAT32:
+        return struct.pack("<II", *matrix.shape) + matrix.astype("<f4").tobytes()
+    if media == NPY:
+        buffer = io.BytesIO()
+        np.save(buffer, matrix.astype(np.float32))
+        return buffer.getvalue()
+    import pyarrow as pa
+
+    rows = pa.FixedSizeListArray.from_arrays(pa.array(matrix.astype(np.float32).ravel()), matrix.shape[1])
+    table = pa.table({"features": rows})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+async def run(rows_list, repeat):
+    app = get_application()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=600) as client:
+        response = await client.post("/train-iris-model?wait=true")
+        response.raise_for_status()
+
+        rng = np.random.default_rng(0)
+        print(f"{'rows':>8} {'format':>38} {'body MB':>8} {'best ms':>9} {'rows/s':>12} {'vs JSON':>8}")
+        for rows in rows_list:
+            # Id puis les quatre mesures, comme les lignes du CSV d'entraînement
+            matrix = np.column_stack([np.arange(rows), rng.uniform(0.1, 8.0, size=(rows, 4))])
+            json_best = None
+            for media in (JSON, RAW_FLOAT32, NPY, ARROW):
+                body = encode(matrix, media)
+                best = float("inf")
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    response = await client.post("/predict", content=body, headers={"Content-Type": media})
+                    best = min(best, time.perf_counter() - start)
+                    response.raise_for_status()
+                json_best = json_best or best
+                print(f"{rows:>8} {media:>38} {len(body) / 1e6:>8.2f} {best * 1e3:>9.1f} {rows / best:>12,.0f} {json_best / best:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
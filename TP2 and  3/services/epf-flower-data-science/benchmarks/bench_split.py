@@ -0,0 +1,83 @@
+"""
+Split benchmark: in-memory split vs the former JSON round-trip.
+
+Builds an Iris-shaped frame of `--rows` rows, then measures wall time and
+peak traced memory of:
+  - "json round-trip": train_test_split on the frame, `to_json(orient='split')`
+    of the four sets, then `read_json` of X_train and a rebuilt y_train Series
+    (what /train-iris-model used to do);
+  - "in-memory split": `split_iris_dataset`, which returns NumPy arrays.
+
+Usage:
+    python benchmarks/bench_split.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from io import StringIO
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from src.services.data import split_iris_dataset
+
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Id": np.arange(1, rows + 1),
+        "SepalLengthCm": rng.uniform(4.3, 7.9, rows).round(1),
+        "SepalWidthCm": rng.uniform(2.0, 4.4, rows).round(1),
+        "PetalLengthCm": rng.uniform(1.0, 6.9, rows).round(1),
+        "PetalWidthCm": rng.uniform(0.1, 2.5, rows).round(1),
+        "Species": rng.choice(["setosa", "versicolor", "virginica"], rows),
+    })
+
+
+def json_round_trip(df):
+    X_train, X_test, y_train, y_test = train_test_split(
+        df.drop(columns=['Species']), df['Species'], test_size=0.2, random_state=42
+    )
+    split_data = {
+        "X_train": X_train.to_json(orient='split'),
+        "X_test": X_test.to_json(orient='split'),
+        "y_train": y_train.to_json(orient='split'),
+        "y_test": y_test.to_json(orient='split'),
+    }
+    X_train = pd.read_json(StringIO(split_data["X_train"]), orient='split')
+    y_train_data = json.loads(split_data["y_train"])
+    y_train = pd.DataFrame({"index": y_train_data["index"], "data": y_train_data["data"]}).set_index("index").squeeze()
+    return X_train, y_train
+
+
+def in_memory_split(df):
+    split_data = split_iris_dataset(df)
+    return split_data["X_train"], split_data["y_train"]
+
+
+def measure(name, func, df):
+    tracemalloc.start()
+    start = time.perf_counter()
+    X_train, y_train = func(df)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<18} rows={len(X_train):<9} time={elapsed:8.3f}s peak={peak / 1024 ** 2:9.1f} MiB")
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    frame = make_frame(args.rows)
+    legacy_time, legacy_peak = measure("json round-trip", json_round_trip, frame)
+    new_time, new_peak = measure("in-memory split", in_memory_split, frame)
+    print(f"speed-up x{legacy_time / new_time:.1f}, peak memory x{legacy_peak / new_peak:.1f} lower")
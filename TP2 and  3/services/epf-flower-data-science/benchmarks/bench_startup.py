@@ -0,0 +1,92 @@
+"""
+Startup and import-time profile.
+
+Builds the application in a fresh interpreter with `python -X importtime`
+and reports the time to import `src.app`, to run `get_application`, and to
+run the warmup steps, then the packages that cost the most import time
+(summed by top-level package) and the slowest modules (cumulative time,
+including what they import). Heavy dependencies still loaded at startup are
+listed at the end.
+
+Usage:
+    python benchmarks/bench_startup.py --top 15
+    python benchmarks/bench_startup.py --routes hello,metrics --preload eager
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+SERVICE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY = ("pandas", "sklearn", "scipy", "joblib", "google.cloud.firestore", "opendatasets", "pyarrow")
+
+PROBE = """
+import json, sys, time
+sys.path.append({service_dir!r})
+start = time.perf_counter()
+from src.app import get_application
+imported = time.perf_counter()
+app = get_application({routes!r})
+built = time.perf_counter()
+from src.services.warmup import warmup
+warmup.start({preload!r})
+warmup.wait()
+warmed = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - start, "build_s": built - imported, "warmup_s": warmed - built,
+    "warmup": warmup.stats(), "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` lines into (module, self seconds, cumulative seconds, depth)."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6, depth))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", help="comma-separated route groups (default: all)")
+    parser.add_argument("--preload", choices=("eager", "lazy", "background"), default="lazy")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    routes = args.routes.split(",") if args.routes else None
+    probe = PROBE.format(service_dir=SERVICE_DIR, routes=routes, preload=args.preload, heavy=HEAVY)
+    env = {**os.environ, "LOG_LEVEL": "WARNING"}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], capture_output=True, text=True,
+                            env=env, cwd=SERVICE_DIR, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(result.stderr)
+
+    print(f"import src.app   : {report['import_s'] * 1e3:8.1f} ms")
+    print(f"get_application  : {report['build_s'] * 1e3:8.1f} ms")
+    print(f"warmup ({args.preload:>10}): {report['warmup_s'] * 1e3:8.1f} ms")
+    for name, step in report["warmup"]["steps"].items():
+        print(f"  {name:<14} {step['seconds'] * 1e3:8.1f} ms {step['error'] or ''}")
+
+    by_package = defaultdict(float)
+    for name, self_s, _, _ in modules:
+        by_package[name.split(".")[0]] += self_s
+    print(f"\nimport time by top-level package (total {sum(by_package.values()) * 1e3:.1f} ms):")
+    for package, seconds in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<30} {seconds * 1e3:8.1f} ms")
+
+    print("\nslowest modules (cumulative):")
+    for name, _, cumulative, depth in sorted(modules, key=lambda item: -item[2])[:args.top]:
+        print(f"  {name:<50} {cumulative * 1e3:8.1f} ms  depth {depth}")
+
+    print(f"\nheavy dependencies loaded: {', '.join(report['heavy']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
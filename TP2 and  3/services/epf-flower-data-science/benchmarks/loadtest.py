@@ -0,0 +1,362 @@
+"""
+Load-testing harness for the API.
+
+`run` drives concurrent requests against one or more scenarios and reports,
+per scenario, throughput, p50/p95/p99 latency, errors and the memory of the
+server process. The app is either called in-process through ASGI (no
+network, load generator and app share the process) or started under
+uvicorn on localhost (`--server uvicorn`, real HTTP, `--workers` processes).
+Results are written as JSON (commit, machine, settings and numbers).
+
+`compare` reads two result files and exits with status 1 if a scenario
+regressed by more than `--max-regression` (throughput, p95/p99 latency or
+peak memory), so it can gate a CI job.
+
+Scenarios: predict (1 row), predict-batch (100 rows), load-iris-dataset,
+train-iris-model (waits for the job), hello. Unless `--no-setup` is given,
+the Iris model is trained once before the scenarios so /predict has a model.
+
+Usage:
+    python benchmarks/loadtest.py run --scenario predict --scenario load-iris-dataset \\
+        --concurrency 32 --requests 2000 --output benchmarks/results/current.json
+    python benchmarks/loadtest.py run --server uvicorn --workers 2 --duration 20
+    python benchmarks/loadtest.py compare benchmarks/results/baseline.json benchmarks/results/current.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+SERVICE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(SERVICE_DIR)
+
+import httpx
+import numpy as np
+
+# Le pipeline /train-iris-model garde la colonne Id du CSV comme variable
+ROW = [1, 5.1, 3.5, 1.4, 0.2]
+SCENARIOS: Dict[str, tuple] = {
+    "predict": ("POST", "/predict", {"data": [ROW]}),
+    "predict-batch": ("POST", "/predict", {"data": [ROW] * 100}),
+    "load-iris-dataset": ("GET", "/load-iris-dataset", None),
+    "train-iris-model": ("POST", "/train-iris-model?wait=true", None),
+    "hello": ("GET", "/hello/bench", None),
+}
+# Métriques comparées : (chemin dans le résultat, True si plus grand est meilleur)
+COMPARED = {
+    "throughput_rps": (("throughput_rps",), True),
+    "p95_ms": (("latency_ms", "p95"), False),
+    "p99_ms": (("latency_ms", "p99"), False),
+    "peak_rss_mb": (("memory_mb", "peak"), False),
+}
+
+
+def rss_mb(pid: int, children: bool = False) -> Optional[float]:
+    """Resident memory of a process (and of its children), from /proc; None where unavailable."""
+    pids = [pid]
+    if children:
+        try:
+            for entry in os.listdir("/proc"):
+                if entry.isdigit():
+                    with open(f"/proc/{entry}/stat") as f:
+                        # Le nom du processus peut contenir des espaces : on lit après la dernière parenthèse
+                        if int(f.read().rsplit(")", 1)[1].split()[1]) == pid:
+                            pids.append(int(entry))
+        except OSError:
+            pass
+    total = 0
+    for process in pids:
+        try:
+            with open(f"/proc/{process}/status") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        except (OSError, StopIteration):
+            if process == pid:
+                return None
+    return total / 1024
+
+
+class MemorySampler:
+    """Sample the RSS of the server in a background thread while a scenario runs."""
+
+    def __init__(self, pid: int, children: bool, interval: float = 0.05) -> None:
+        self.pid, self.children, self.interval = pid, children, interval
+        self.samples: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            value = rss_mb(self.pid, self.children)
+            if value is not None:
+                self.samples.append(value)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "MemorySampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self) -> Optional[dict]:
+        if not self.samples:
+            return None
+        return {"start": self.samples[0], "peak": max(self.samples), "end": self.samples[-1],
+                "mean": float(np.mean(self.samples))}
+
+
+def summarize(latencies: List[float], statuses: Dict[str, int], errors: int, elapsed: float) -> dict:
+    latencies_ms = np.asarray(latencies) * 1000
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "statuses": statuses,
+        "duration_s": elapsed,
+        "throughput_rps": count / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": float(latencies_ms.mean()) if count else None,
+            "p50": float(np.percentile(latencies_ms, 50)) if count else None,
+            "p95": float(np.percentile(latencies_ms, 95)) if count else None,
+            "p99": float(np.percentile(latencies_ms, 99)) if count else None,
+            "max": float(latencies_ms.max()) if count else None,
+        },
+    }
+
+
+async def drive(client: httpx.AsyncClient, scenario: str, concurrency: int, requests: Optional[int], duration: Optional[float]) -> dict:
+    """
+    Send the requests of a scenario from `concurrency` concurrent workers.
+
+    Stops after `requests` requests, or after `duration` seconds.
+    """
+    method, path, body = SCENARIOS[scenario]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    sent = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker() -> None:
+        nonlocal sent, errors
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if deadline is None and sent >= requests:
+                return
+            sent += 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = str(response.status_code)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, errors, time.perf_counter() - start)
+
+
+def free_port() -> int:
+    with contextlib.closing(socket.socket()) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def in_process_client(timeout: float):
+    from src.app import get_application
+
+    app = get_application()
+    # ASGITransport n'envoie pas les événements de cycle de vie : on les déclenche nous-mêmes
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=timeout) as client:
+            yield client, os.getpid(), False
+    finally:
+        await app.router.shutdown()
+
+
+@contextlib.asynccontextmanager
+async def uvicorn_client(timeout: float, workers: int):
+    port = free_port()
+    env = {**os.environ, "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING")}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=SERVICE_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+                with contextlib.suppress(httpx.HTTPError):
+                    if (await client.get("/metrics")).status_code == 200:
+                        break
+                if time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start within 60 s")
+                await asyncio.sleep(0.2)
+            yield client, server.pid, True
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=SERVICE_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    scenarios = args.scenario or ["predict", "load-iris-dataset"]
+    unknown = sorted(set(scenarios) - set(SCENARIOS))
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {unknown}; choose from {sorted(SCENARIOS)}")
+
+    factory: Callable = in_process_client if args.server == "inprocess" else uvicorn_client
+    factory_args = (args.timeout,) if args.server == "inprocess" else (args.timeout, args.workers)
+    results = {}
+    async with factory(*factory_args) as (client, pid, children):
+        if not args.no_setup:
+            response = await client.post("/train-iris-model?wait=true")
+            if response.status_code != 200:
+                raise SystemExit(f"Setup failed: POST /train-iris-model returned {response.status_code}: {response.text}")
+        for scenario in scenarios:
+            if args.warmup:
+                await drive(client, scenario, min(args.concurrency, args.warmup), args.warmup, None)
+            with MemorySampler(pid, children) as sampler:
+                result = await drive(client, scenario, args.concurrency, args.requests, args.duration)
+            result["memory_mb"] = sampler.summary()
+            results[scenario] = result
+            print_result(scenario, result)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": time.time(),
+            "server": args.server,
+            "workers": args.workers if args.server == "uvicorn" else 1,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "duration": args.duration,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def print_result(scenario: str, result: dict) -> None:
+    latency = result["latency_ms"]
+    memory = result["memory_mb"] or {}
+    print(f"{scenario:>18}: {result['requests']:>7} req {result['errors']:>5} err {result['throughput_rps']:>9.1f} req/s"
+          f"  p50 {latency['p50'] or 0:>8.2f} ms  p95 {latency['p95'] or 0:>8.2f} ms  p99 {latency['p99'] or 0:>8.2f} ms"
+          f"  peak RSS {memory.get('peak', 0):>7.1f} MB")
+
+
+def _lookup(result: dict, path: tuple) -> Optional[float]:
+    for key in path:
+        if not isinstance(result, dict) or result.get(key) is None:
+            return None
+        result = result[key]
+    return float(result)
+
+
+def compare(baseline: dict, candidate: dict, max_regression: float) -> List[dict]:
+    """
+    Compare two result files scenario by scenario.
+
+    Returns:
+        List[dict]: One row per scenario and metric, with the relative change
+        (positive means worse) and whether it exceeds `max_regression`.
+    """
+    rows = []
+    for scenario in sorted(set(baseline["results"]) & set(candidate["results"])):
+        for metric, (path, higher_is_better) in COMPARED.items():
+            before = _lookup(baseline["results"][scenario], path)
+            after = _lookup(candidate["results"][scenario], path)
+            if before is None or after is None or before == 0:
+                continue
+            change = (before - after) / before if higher_is_better else (after - before) / before
+            rows.append({"scenario": scenario, "metric": metric, "baseline": before, "candidate": after,
+                         "worse_by": change, "regression": change > max_regression})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="drive load and write the results")
+    run_parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    run_parser.add_argument("--server", choices=("inprocess", "uvicorn"), default="inprocess")
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    run_parser.add_argument("--duration", type=float, help="seconds per scenario, instead of --requests")
+    run_parser.add_argument("--warmup", type=int, default=20, help="requests sent before measuring")
+    run_parser.add_argument("--timeout", type=float, default=120.0)
+    run_parser.add_argument("--no-setup", action="store_true", help="do not train the model first")
+    run_parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>-<server>.json)")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--max-regression", type=float, default=0.10, help="allowed relative change (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = asyncio.run(run(args))
+        output = args.output or os.path.join(
+            SERVICE_DIR, "benchmarks", "results", f"{(report['meta']['commit'] or 'local')[:12]}-{args.server}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {output}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    for key in ("server", "workers", "concurrency", "cpu_count"):
+        if baseline["meta"].get(key) != candidate["meta"].get(key):
+            print(f"warning: {key} differs ({baseline['meta'].get(key)} vs {candidate['meta'].get(key)}), "
+                  f"the results are not directly comparable")
+    rows = compare(baseline, candidate, args.max_regression)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['scenario']:>18} {row['metric']:>15} {row['baseline']:>12.2f} -> {row['candidate']:>12.2f} "
+              f"({row['worse_by'] * 100:+6.1f}% worse) {flag}")
+    if any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
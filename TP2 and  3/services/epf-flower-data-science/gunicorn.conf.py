@@ -0,0 +1,73 @@
+"""
+Production server: gunicorn managing uvicorn workers.
+
+    APP_ENV=prd gunicorn main:app
+
+Settings come from the environment file `config/<APP_ENV>` of the project
+(KEY=VALUE lines, process environment wins). The app is imported and warmed
+(dataset, model, scikit-learn) once in the master before the workers are
+forked, so they share those memory pages copy-on-write. When
+MODEL_RELOAD_INTERVAL > 0, a new version of the published Iris model
+triggers a graceful reload: the master warms the new model, forks fresh
+workers and lets the old ones finish their requests. The models of the
+datasets are loaded on demand by the workers and do not trigger reloads.
+
+CPU-bound work runs in a small thread pool of each worker
+(`CPU_EXECUTOR_BACKEND=thread`, `CPU_EXECUTOR_WORKERS=2` unless set
+otherwise), so the workers use
+the model and dataset inherited from the master. Old workers are killed
+after `graceful_timeout`: the jobs they were running are taken over by the
+new workers, which look for jobs whose owner process is gone at startup
+and every `JOB_ORPHAN_CHECK_INTERVAL` seconds.
+"""
+import multiprocessing
+import os
+import signal
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.services.environment import load_environment
+
+load_environment()
+# Serveur : le travail CPU reste dans des threads de chaque worker. Un pool de processus "spawn"
+# par worker ferait workers x cœurs processus, qui rechargeraient tout au lieu de partager les
+# pages préchargées par le maître
+os.environ.setdefault("CPU_EXECUTOR_BACKEND", "thread")
+# Un worker par cœur : quelques threads suffisent à recouvrir les attentes
+os.environ.setdefault("CPU_EXECUTOR_WORKERS", "2")
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '8080')}"
+workers = os.environ.get("WEB_CONCURRENCY", "auto")
+workers = multiprocessing.cpu_count() if workers == "auto" else int(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.environ.get("WORKER_TIMEOUT", 120))
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("KEEPALIVE", 5))
+max_requests = int(os.environ.get("MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+loglevel = os.environ.get("LOG_LEVEL", "INFO").lower()
+accesslog = None
+
+
+def _warm(server):
+    # Chargé dans le maître : les workers forkés héritent des pages du dataset et du modèle
+    from src.services.warmup import warmup
+
+    if os.environ.get("PRELOAD_MODE", "lazy") != "lazy":
+        warmup.run()
+        server.log.info("Warmup finished: %s", warmup.stats())
+
+
+def when_ready(server):
+    _warm(server)
+
+    from src.services.watcher import ArtifactWatcher
+
+    ArtifactWatcher().start(lambda: os.kill(server.pid, signal.SIGHUP))
+
+
+def on_reload(server):
+    # SIGHUP : appelé avant de forker les nouveaux workers, qui partiront du nouveau modèle
+    _warm(server)
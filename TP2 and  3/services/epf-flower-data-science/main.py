@@ -1,11 +1,17 @@
 import uvicorn
 import os
 
-from src.app import get_application
+from src.services.environment import load_environment
 
+# Réglages de config/<APP_ENV>, appliqués avant l'import des services qui les lisent
+load_environment()
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.path.abspath("src/config/firebase-credentials.json")
 
+from src.app import get_application
+
 app = get_application()
 
 if __name__ == "__main__":
-    uvicorn.run("main:app",host="127.0.0.1", debug=True, reload=True, port=8080)
+    # Serveur de développement ; en production : `gunicorn main:app` (voir gunicorn.conf.py)
+    uvicorn.run("main:app", host=os.environ.get("HOST", "127.0.0.1"), debug=True, reload=True,
+                port=int(os.environ.get("PORT", 8080)))
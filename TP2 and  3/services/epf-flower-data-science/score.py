@@ -0,0 +1,59 @@
+"""
+Batch scoring of a CSV or Parquet file, larger than memory if need be.
+
+The input is read in chunks scored by a pool of worker processes (the model
+is loaded once per worker) and the predictions are appended to a CSV file.
+Interrupt it and run the same command again: it resumes after the last
+completed chunk (use --restart to start over).
+
+Usage:
+    python score.py src/data/iris/Iris.csv predictions.csv --id-column Id
+    python score.py big.parquet predictions.csv --model src/models/datasets/wine.pkl --chunk-size 100000 --workers 8
+"""
+import argparse
+import os
+import sys
+
+from src.services.environment import load_environment
+
+load_environment()
+
+from src.services.scoring import DEFAULT_CHUNK_SIZE, DEFAULT_MODEL_PATH, score_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV or Parquet file to score")
+    parser.add_argument("output", help="CSV file of predictions")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="model artifact (default: the Iris model)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU_EXECUTOR_WORKERS)")
+    parser.add_argument("--columns", help="comma-separated input columns fed to the model")
+    parser.add_argument("--id-column", help="column copied next to each prediction (default: row number)")
+    parser.add_argument("--engine", choices=("sklearn", "compiled"))
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint of a previous run")
+    args = parser.parse_args()
+
+    def progress(counters):
+        rate = counters["rows_per_second"] or 0
+        print(f"\r{counters['chunks']} chunks, {counters['rows']:,} rows, {rate:,.0f} rows/s", end="", file=sys.stderr)
+
+    try:
+        summary = score_file(
+            args.input, args.output, model_path=os.path.abspath(args.model), chunk_size=args.chunk_size,
+            workers=args.workers, columns=args.columns.split(",") if args.columns else None,
+            id_column=args.id_column, engine=args.engine, resume=not args.restart, progress=progress,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        sys.exit(f"error: {e}")
+
+    print(file=sys.stderr)
+    if summary["resumed_from_chunk"]:
+        print(f"resumed after chunk {summary['resumed_from_chunk']}")
+    rate = summary["rows_per_second"]
+    print(f"{summary['rows']:,} rows in {summary['chunks']} chunks -> {args.output}"
+          + (f" ({summary['rows_scored']:,} scored in {summary['seconds']:.1f} s, {rate:,.0f} rows/s)" if rate else " (already complete)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""ASGI middleware for Fast API."""
+import time
+from typing import Any, Callable, Dict
+
+from src.services.logs import get_logger
+from src.services.metrics import HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS, HTTP_REQUESTS
+
+UNMATCHED = "unmatched"
+
+request_log = get_logger("http")
+
+
+class MetricsMiddleware:
+    """
+    Record the latency, status and concurrency of every HTTP request.
+
+    Written as a plain ASGI middleware (no request/response objects) to keep
+    its overhead to a few microseconds. Requests are labelled by route
+    template ("/jobs/{job_id}"), not by raw path, so the number of series
+    stays bounded; the template is found from the endpoint the router stored
+    in the scope.
+    """
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+        self._routes: Dict[Any, str] = {}
+
+    def _route(self, scope: dict) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED
+        route = self._routes.get(endpoint)
+        if route is None:
+            # Table endpoint -> chemin construite au premier appel de chaque route
+            for candidate in getattr(scope.get("app"), "routes", ()):
+                if getattr(candidate, "endpoint", None) is not None:
+                    self._routes.setdefault(candidate.endpoint, candidate.path)
+            route = self._routes.setdefault(endpoint, UNMATCHED)
+        return route
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            in_flight.dec()
+            route = self._route(scope)
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(duration)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            if request_log.should_sample():
+                request_log.event("request", sample_rate=request_log.sample_rate, method=method, route=route,
+                                  status=status, duration_ms=round(duration * 1000, 3))
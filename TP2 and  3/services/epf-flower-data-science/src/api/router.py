@@ -1,18 +1,59 @@
 """API Router for Fast API."""
-from fastapi import APIRouter, FastAPI
+import importlib
+import os
+from typing import Iterable, Optional
+
+from fastapi import APIRouter
 from fastapi.responses import RedirectResponse
 
-from src.api.routes import hello, data, parameters
+# Groupes de routes : module dans src.api.routes et tag OpenAPI
+ROUTE_GROUPS = {
+    "hello": "Hello",
+    "data": "Data",
+    "datasets": "Datasets",
+    "parameters": "Parameters",
+    "tuning": "Tuning",
+    "scoring": "Scoring",
+    "jobs": "Jobs",
+    "metrics": "Monitoring",
+    "health": "Health",
+}
+# Sous-ensemble servi par ce processus, ex. "hello,data,jobs,metrics" (tous par défaut)
+API_ROUTE_GROUPS = os.environ.get("API_ROUTE_GROUPS", "")
+
 
-router = APIRouter()
+async def root():
+    return RedirectResponse(url="/docs")
 
-router.include_router(hello.router, tags=["Hello"])
-router.include_router(data.router, tags=["Data"])
-router.include_router(parameters.router, tags=["Parameters"])
 
-app = FastAPI()
-app.include_router(router)
+def build_router(groups: Optional[Iterable[str]] = None) -> APIRouter:
+    """
+    Build the API router from the selected route groups.
 
-@router.get("/", include_in_schema=False)
-async def root():
-    return RedirectResponse(url="/docs")
\ No newline at end of file
+    Each route module is imported here rather than at the import of this
+    module, so a process serving only some groups does not load the
+    dependencies of the others.
+
+    Args:
+        groups (Iterable[str]): Names of `ROUTE_GROUPS` to mount, defaults to
+            `API_ROUTE_GROUPS` or every group.
+
+    Returns:
+        APIRouter: The router to include in the application.
+
+    Raises:
+        ValueError: If a group is unknown.
+    """
+    if groups is None:
+        groups = [group.strip() for group in API_ROUTE_GROUPS.split(",") if group.strip()] or list(ROUTE_GROUPS)
+    groups = list(groups)
+    unknown = sorted(set(groups) - set(ROUTE_GROUPS))
+    if unknown:
+        raise ValueError(f"Unknown route groups: {unknown}")
+
+    router = APIRouter()
+    for group in groups:
+        module = importlib.import_module(f"src.api.routes.{group}")
+        router.include_router(module.router, tags=[ROUTE_GROUPS[group]])
+    router.add_api_route("/", root, methods=["GET"], include_in_schema=False)
+    return router
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
 import os
-import pandas as pd
-import opendatasets as od
-from fastapi.encoders import jsonable_encoder
-from src.services.data import load_iris_dataset, process_iris_dataset, split_iris_dataset, train_model, predict_with_model
-from io import StringIO
+import numpy as np
+from typing import Optional
+from src.services.data import load_iris_dataset, process_iris_dataset, split_iris_dataset, predict_array, predict_with_model, prediction_batcher, training_fingerprint, inference_engine
+from src.services.config_store import ConfigWriteError, config_store
+from src.services.dataset_cache import dataset_cache
+from src.services.downloads import FAILED as DOWNLOAD_FAILED, SKIPPED as DOWNLOAD_SKIPPED, download_manager
+from src.services.executors import run_cpu, run_io
+from src.services.jobs import FAILED, job_manager
+from src.services.model_registry import model_registry
+from src.services.payloads import BINARY_MEDIA_TYPES, JSON, decode_matrix, encode_predictions, media_type, negotiate
+from src.services.prediction_cache import prediction_cache
+from src.services.streaming import DEFAULT_CHUNK_SIZE, frame_response
+from src.services.training_cache import training_cache
 import json
 
 router = APIRouter()
@@ -13,57 +22,74 @@ router = APIRouter()
 class DatasetInfo(BaseModel):
     name: str
     url: str
+    target: Optional[str] = None
+    id_column: Optional[str] = None
+    file: Optional[str] = None
+
+    def entry(self) -> dict:
+        # Les champs optionnels ne sont écrits que s'ils sont renseignés
+        return {key: value for key, value in self.dict().items() if value is not None}
 
 class PredictionRequest(BaseModel):
     data: list
 
-@router.get("/download-dataset")
-async def download_dataset():
-    config_path = os.path.join(os.path.dirname(__file__), '../../config/config.json')
+class InferenceEngine(BaseModel):
+    engine: str
 
-    # Vérifie si le fichier config.json existe
-    if not os.path.exists(config_path):
+def read_config() -> dict:
+    # Lit la vue en cache du fichier config.json
+    try:
+        return config_store.read()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Config file not found")
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Error decoding JSON file")
 
-    # Lit le fichier config.json
+def write_config(change) -> dict:
+    # Applique la modification sous verrou puis remplace le fichier de façon atomique
     try:
-        with open(config_path) as config_file:
-            config = json.load(config_file)
+        return config_store.update(change)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Config file not found")
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Error decoding JSON file")
+    except ConfigWriteError as e:
+        raise HTTPException(status_code=500, detail=f"Error writing to config file: {str(e)}")
+
+@router.get("/download-dataset")
+async def download_dataset(response: Response, name: str = "iris", force: bool = False, wait: bool = False):
+    config = await run_io(read_config)
 
     # Vérifie si l'URL du dataset est dans le fichier JSON
-    if "iris" not in config or "url" not in config["iris"]:
+    if name not in config or "url" not in config[name]:
         raise HTTPException(status_code=400, detail="Dataset URL not found in config file")
 
-    dataset_url = config["iris"]["url"]
-    data_dir = os.path.join(os.path.dirname(__file__), '../../data')
+    # Le téléchargement tourne en arrière-plan ; les appels concurrents partagent le même transfert
+    download = await run_io(download_manager.start, name, config[name]["url"], force)
 
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
+    if not wait:
+        response.status_code = 202
+        return download.to_dict()
 
-    # Télécharger le dataset en utilisant opendatasets
-    try:
-        od.download(dataset_url, data_dir)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error downloading dataset: {str(e)}")
+    download = await run_io(download_manager.wait, name)
+    if download.status == DOWNLOAD_FAILED:
+        raise HTTPException(status_code=500, detail=f"Error downloading dataset: {download.detail}")
+    if download.status == DOWNLOAD_SKIPPED:
+        return {"message": f"Dataset already up to date: {download.detail}", **download.to_dict()}
 
-    return {"message": "Dataset downloaded successfully"}
+    return {"message": "Dataset downloaded successfully", **download.to_dict()}
 
-@router.get("/get-dataset-info")
-async def get_dataset_info():
-    config_path = os.path.join(os.path.dirname(__file__), '../../config/config.json')
+@router.get("/download-status/{name}")
+async def download_status(name: str):
+    download = download_manager.get(name)
+    if download is None:
+        raise HTTPException(status_code=404, detail="No download for this dataset")
 
-    # Vérifie si le fichier config.json existe
-    if not os.path.exists(config_path):
-        raise HTTPException(status_code=404, detail="Config file not found")
+    return download.to_dict()
 
-    # Lit le fichier config.json
-    try:
-        with open(config_path) as config_file:
-            config = json.load(config_file)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Error decoding JSON file")
+@router.get("/get-dataset-info")
+async def get_dataset_info():
+    config = await run_io(read_config)
 
     # Vérifie si les informations du dataset sont dans le fichier JSON
     if "iris" not in config:
@@ -73,133 +99,223 @@ async def get_dataset_info():
 
 @router.post("/add-dataset")
 async def add_dataset(dataset: DatasetInfo):
-    config_path = os.path.join(os.path.dirname(__file__), '../../config/config.json')
-
-    # Vérifie si le fichier config.json existe
-    if not os.path.exists(config_path):
-        raise HTTPException(status_code=404, detail="Config file not found")
-
-    # Lit le fichier config.json
-    try:
-        with open(config_path, 'r') as config_file:
-            config = json.load(config_file)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Error decoding JSON file")
-
-    # Ajoute les informations du dataset au fichier JSON
-    config[dataset.name] = {"name": dataset.name, "url": dataset.url}
-
-    # Écrit les modifications dans le fichier config.json
-    try:
-        with open(config_path, 'w') as config_file:
-            json.dump(config, config_file, indent=4)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error writing to config file: {str(e)}")
+    def add(config: dict) -> None:
+        # Ajoute les informations du dataset au fichier JSON
+        config[dataset.name] = dataset.entry()
 
+    await run_io(write_config, add)
     return {"message": "Dataset added successfully"}
 
 @router.put("/update-dataset")
 async def update_dataset(dataset: DatasetInfo):
-    config_path = os.path.join(os.path.dirname(__file__), '../../config/config.json')
-
-    # Vérifie si le fichier config.json existe
-    if not os.path.exists(config_path):
-        raise HTTPException(status_code=404, detail="Config file not found")
+    def update(config: dict) -> None:
+        # Vérifie si le dataset existe dans le fichier JSON
+        if dataset.name not in config:
+            raise HTTPException(status_code=404, detail="Dataset not found in config file")
 
-    # Lit le fichier config.json
-    try:
-        with open(config_path, 'r') as config_file:
-            config = json.load(config_file)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Error decoding JSON file")
-
-    # Vérifie si le dataset existe dans le fichier JSON
-    if dataset.name not in config:
-        raise HTTPException(status_code=404, detail="Dataset not found in config file")
-
-    # Met à jour les informations du dataset dans le fichier JSON
-    config[dataset.name] = {"name": dataset.name, "url": dataset.url}
-
-    # Écrit les modifications dans le fichier config.json
-    try:
-        with open(config_path, 'w') as config_file:
-            json.dump(config, config_file, indent=4)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error writing to config file: {str(e)}")
+        # Met à jour les informations du dataset dans le fichier JSON
+        config[dataset.name] = dataset.entry()
 
+    await run_io(write_config, update)
     return {"message": "Dataset updated successfully"}
 
+@router.get("/config-store-stats")
+async def config_store_stats():
+    return config_store.stats()
+
 @router.get("/load-iris-dataset")
-async def load_iris_dataset_endpoint():
+async def load_iris_dataset_endpoint(
+    format: str = "json",
+    limit: Optional[int] = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    columns: Optional[str] = None,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1),
+):
     try:
-        df = load_iris_dataset()
+        df = await run_io(load_iris_dataset)
     except HTTPException as e:
         raise e
 
-    # Renvoie le dataset sous forme de JSON
-    return df.to_json(orient='split')
+    # Renvoie le dataset en JSON, ou en flux NDJSON / CSV / Arrow par blocs de lignes
+    return frame_response(df, format, limit, offset, columns, chunk_size)
 
 @router.get("/process-iris-dataset")
-async def process_iris_dataset_endpoint():
+async def process_iris_dataset_endpoint(
+    format: str = "json",
+    limit: Optional[int] = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    columns: Optional[str] = None,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1),
+):
     try:
-        df = load_iris_dataset()
-        df_processed = process_iris_dataset(df)
+        df = await run_io(load_iris_dataset)
+        df_processed = await run_io(process_iris_dataset, df)
     except HTTPException as e:
         raise e
 
-    # Utiliser jsonable_encoder pour encoder les données avant de les renvoyer
-    return jsonable_encoder(df_processed.to_dict(orient='split'))
+    return frame_response(df_processed, format, limit, offset, columns, chunk_size)
 
 @router.get("/split-iris-dataset")
 async def split_iris_dataset_endpoint():
     try:
-        df = load_iris_dataset()
-        split_data = split_iris_dataset(df)
+        df = await run_io(load_iris_dataset)
+        split_data = await run_io(split_iris_dataset, df)
     except HTTPException as e:
         raise e
 
-    # Renvoie les ensembles d'entraînement et de test sous forme de JSON
-    return split_data
-
-@router.post("/train-iris-model")
-async def train_iris_model():
+    # Renvoie les ensembles d'entraînement et de test sous forme de JSON (format "split" de pandas)
+    features = {"columns": split_data["feature_names"]}
+    target = {"name": split_data["target_name"]}
+    return {
+        "X_train": {**features, "index": split_data["train_index"].tolist(), "data": split_data["X_train"].tolist()},
+        "X_test": {**features, "index": split_data["test_index"].tolist(), "data": split_data["X_test"].tolist()},
+        "y_train": {**target, "index": split_data["train_index"].tolist(), "data": split_data["y_train"].tolist()},
+        "y_test": {**target, "index": split_data["test_index"].tolist(), "data": split_data["y_test"].tolist()},
+    }
+
+@router.post("/train-iris-model", status_code=202)
+async def train_iris_model(response: Response, wait: bool = False):
+    # Les soumissions identiques (même dataset, mêmes paramètres) partagent le même job
+    job = await run_io(job_manager.submit, "train-iris-model", training_fingerprint())
+
+    if not wait:
+        return {"job_id": job.id, "status": job.status}
+
+    job = await job_manager.wait_async(job.id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+
+    response.status_code = 200
+    return {
+        "message": "Model trained and saved successfully",
+        "model_path": job.result["model_path"],
+        # True : même split et mêmes paramètres qu'un entraînement précédent, artefact réutilisé
+        "cached": job.result.get("cached", False),
+        "job_id": job.id,
+    }
+
+PREDICT_BODY = {
+    "required": True,
+    "content": {
+        JSON: {"schema": PredictionRequest.schema()},
+        **{media: {"schema": {"type": "string", "format": "binary"}} for media in BINARY_MEDIA_TYPES},
+    },
+}
+
+async def run_model(matrix: np.ndarray):
+    if len(matrix) < prediction_batcher.max_batch_size:
+        # Les petites requêtes concurrentes sont regroupées en un seul appel au modèle
+        return await prediction_batcher.submit(matrix)
+    # Un gros lot suffit à occuper le modèle : pas de file ni de copie par np.vstack
+    return await run_cpu(predict_array, matrix, engine=inference_engine())
+
+async def score_matrix(matrix: np.ndarray):
+    model_path = os.path.join(os.path.dirname(__file__), '../../models/iris_model.pkl')
+
+    # Seules les lignes absentes du cache passent par le modèle. La version vient du fichier,
+    # pas du modèle chargé : avec le backend "process", le modèle n'est chargé que dans les workers
+    version = await run_io(model_registry.digest, model_path)
+    return await prediction_cache.apredict(version, matrix, run_model)
+
+@router.post("/predict", openapi_extra={"requestBody": PREDICT_BODY})
+async def predict(request: Request):
+    """
+    Predict the species of rows of features.
+
+    The body is JSON (`{"data": [[...], ...]}`) or a binary matrix chosen by
+    Content-Type: Arrow IPC stream, NPY, or raw little-endian float32 with a
+    `<II` (rows, columns) header. Binary matrices are decoded in place,
+    without parsing the values. Predictions are returned in the first format
+    of `Accept` that the API supports, else in the format of the request.
+
+    Returns:
+        dict | Response: `{"predictions": [...]}` or the encoded predictions.
+
+    Raises:
+        HTTPException: 400 for a malformed matrix, 415 for an unsupported
+        Content-Type, 404 if the model is not trained.
+    """
+    content_type = media_type(request.headers.get("content-type"))
+    body = await request.body()
+
+    if content_type in BINARY_MEDIA_TYPES:
+        try:
+            matrix = decode_matrix(body, content_type)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ImportError:
+            raise HTTPException(status_code=415, detail="Arrow IPC format requires pyarrow")
+        predictions = await score_matrix(matrix)
+    elif content_type == JSON:
+        try:
+            data = PredictionRequest.parse_raw(body).data
+        except ValidationError as e:
+            raise RequestValidationError(e.raw_errors)
+        try:
+            matrix = np.asarray(data, dtype=np.float64)
+        except (TypeError, ValueError):
+            matrix = None
+
+        if matrix is not None and matrix.ndim == 2 and matrix.size:
+            predictions = await score_matrix(matrix)
+        else:
+            predictions = await run_cpu(predict_with_model, data, engine=inference_engine())
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported media type: {content_type}")
+
+    output = negotiate(request.headers.get("accept"), content_type)
+    if output == JSON:
+        return {"predictions": predictions.tolist() if isinstance(predictions, np.ndarray) else predictions}
     try:
-        df = load_iris_dataset()
-        df_processed = process_iris_dataset(df)
-        split_data = split_iris_dataset(df_processed)
-        print(split_data)
-        print("X_train : ", split_data["X_train"])
-        print("y_train : ", split_data["y_train"])
-
-        # Convertir les données JSON en DataFrame et Series
-        X_train = pd.read_json(StringIO(split_data["X_train"]), orient='split')
-        
-        # Charger y_train en tant que DataFrame pour pouvoir supprimer la clé 'name'
-        y_train_json = split_data["y_train"]
-        y_train_data = json.loads(y_train_json)
-        
-        # Reformater les données pour qu'elles soient conformes aux attentes de pandas
-        y_train_df = pd.DataFrame({
-            "index": y_train_data["index"],
-            "data": y_train_data["data"]
-        })
-        y_train_df.set_index("index", inplace=True)
-        
-        # Convertir y_train en Series
-        y_train = y_train_df.squeeze()
-        print("y_train : ", y_train)
-        
-        model_path = train_model(X_train, y_train)
-    except HTTPException as e:
-        raise e
-
-    return {"message": "Model trained and saved successfully", "model_path": model_path}
-
-@router.post("/predict")
-async def predict(request: PredictionRequest):
+        content, headers = encode_predictions(predictions, output)
+    except ImportError:
+        raise HTTPException(status_code=406, detail="Arrow IPC format requires pyarrow")
+    return Response(content=content, media_type=output, headers=headers)
+
+@router.get("/model-registry-stats")
+async def model_registry_stats():
+    # Compteurs du registre de modèles (hits, misses, temps de chargement) du processus de l'API ;
+    # avec CPU_EXECUTOR_BACKEND=process, les modèles sont chargés dans les workers du pool
+    return model_registry.stats()
+
+@router.get("/model-metadata")
+async def model_metadata():
+    model_path = os.path.join(os.path.dirname(__file__), '../../models/iris_model.pkl')
+
+    # En-tête de l'artefact (schéma, paramètres, métriques, hash), lu sans charger le modèle
     try:
-        predictions = predict_with_model(request.data)
-    except HTTPException as e:
-        raise e
+        return await run_io(model_registry.metadata, model_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Model file not found")
+
+@router.get("/predict-batching-stats")
+async def predict_batching_stats():
+    # Histogrammes de taille de batch et d'attente dans la file
+    return prediction_batcher.stats()
+
+@router.get("/prediction-cache-stats")
+async def prediction_cache_stats():
+    # Compteurs du cache de prédictions (hits, misses, taux de hits, invalidations)
+    return prediction_cache.stats()
+
+@router.get("/training-cache-stats")
+async def training_cache_stats():
+    # Artefacts conservés par clé d'entraînement (hits, entrées, octets, entrées supprimées)
+    return training_cache.stats()
+
+@router.get("/dataset-cache-stats")
+async def dataset_cache_stats():
+    # Compteurs du cache de datasets (hits, parsings CSV, invalidations)
+    return dataset_cache.stats()
+
+@router.put("/inference-engine")
+async def set_inference_engine(request: InferenceEngine):
+    model_path = os.path.join(os.path.dirname(__file__), '../../models/iris_model.pkl')
+
+    # "compiled" : prédiction sur les tableaux NumPy de la forêt au lieu de scikit-learn
+    try:
+        model_registry.set_engine(model_path, request.engine)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return {"predictions": predictions}
\ No newline at end of file
+    return {"message": "Inference engine updated successfully", "engine": request.engine}
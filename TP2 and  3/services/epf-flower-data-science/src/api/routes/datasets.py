@@ -0,0 +1,135 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from src.api.routes.data import PredictionRequest
+from src.services.datasets import dataset_engine, predict_model_file
+from src.services.executors import run_cpu, run_io
+from src.services.incremental import MODES as TRAINING_MODES
+from src.services.jobs import FAILED, job_manager
+from src.services.model_registry import model_registry
+from src.services.streaming import DEFAULT_CHUNK_SIZE, frame_response
+
+router = APIRouter()
+
+@router.get("/datasets")
+async def list_datasets():
+    """
+    List the datasets registered in config.json.
+
+    Returns:
+        dict: The dataset names and the engine cache counters.
+    """
+    names = await run_io(dataset_engine.names)
+    return {"datasets": names, **dataset_engine.stats()}
+
+@router.get("/datasets/{name}/schema")
+async def get_dataset_schema(name: str):
+    """
+    Get the inferred schema of a dataset (dtypes, target, id and feature columns).
+
+    Raises:
+        HTTPException: If the dataset is not registered or its file is not found.
+    """
+    schema = await run_io(dataset_engine.schema, name)
+    return schema.to_dict()
+
+@router.get("/datasets/{name}/load")
+async def load_dataset(
+    name: str,
+    format: str = "json",
+    limit: Optional[int] = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    columns: Optional[str] = None,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1),
+):
+    """
+    Get the rows of a dataset, as JSON or streamed as NDJSON / CSV / Arrow.
+    """
+    df = await run_io(dataset_engine.load, name)
+    return frame_response(df, format, limit, offset, columns, chunk_size)
+
+@router.get("/datasets/{name}/process")
+async def process_dataset(
+    name: str,
+    format: str = "json",
+    limit: Optional[int] = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    columns: Optional[str] = None,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1),
+):
+    """
+    Get a dataset after preprocessing (renamed columns, float32 features, cleaned target labels).
+    """
+    preprocessor = await run_io(dataset_engine.preprocessor, name)
+    df = await run_io(dataset_engine.load, name)
+    df_processed = await run_io(preprocessor.frame, df)
+    return frame_response(df_processed, format, limit, offset, columns, chunk_size)
+
+@router.get("/datasets/{name}/preprocessing")
+async def get_dataset_preprocessing(name: str):
+    """
+    Get the compiled preprocessing of a dataset (column mapping, features, target classes).
+    """
+    preprocessor = await run_io(dataset_engine.preprocessor, name)
+    return preprocessor.to_dict()
+
+@router.post("/datasets/{name}/train", status_code=202)
+async def train_dataset_model(name: str, response: Response, wait: bool = False, mode: str = "full"):
+    """
+    Train the model of a dataset in a background job.
+
+    Args:
+        name (str): Dataset name.
+        wait (bool): Wait for the job and return its result.
+        mode (str): "full" refits from scratch; "incremental" only adds trees
+            for the rows appended since the last training, unless they drift.
+
+    Returns:
+        dict: The job id and status, or the trained model when `wait` is set.
+    """
+    if mode not in TRAINING_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown training mode: {mode}")
+    fingerprint = await run_io(dataset_engine.fingerprint, name, mode)
+    job = await run_io(job_manager.submit, "train-dataset-model", fingerprint, {"name": name, "mode": mode})
+
+    if not wait:
+        return {"job_id": job.id, "status": job.status}
+
+    job = await job_manager.wait_async(job.id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+
+    response.status_code = 200
+    return {"message": "Model trained and saved successfully", "job_id": job.id, **job.result}
+
+@router.get("/datasets/{name}/lineage")
+async def get_dataset_lineage(name: str):
+    """
+    Get the training history of the model of a dataset (mode, new rows, trees, drift, digests).
+    """
+    return {"name": name, "lineage": await run_io(dataset_engine.lineage, name)}
+
+@router.get("/datasets/{name}/model")
+async def get_dataset_model(name: str):
+    """
+    Get the header of the model artifact of a dataset (schema, parameters, metrics, hash).
+
+    The header is read without loading the model.
+    """
+    return await run_io(dataset_engine.model_metadata, name)
+
+@router.post("/datasets/{name}/predict")
+async def predict_dataset(name: str, request: PredictionRequest):
+    """
+    Predict with the model of a dataset.
+
+    Rows are lists of feature values in schema order, or objects keyed by
+    feature name.
+    """
+    model_path = dataset_engine.model_path(name)
+    engine = model_registry.engine(model_path)
+    # Features construites ici : seuls le chemin du modèle et la matrice partent vers le pool
+    X = await run_io(dataset_engine.features, name, request.data)
+    predictions = await run_cpu(predict_model_file, model_path, X, engine=engine)
+    return {"predictions": predictions}
@@ -0,0 +1,44 @@
+import os
+
+from fastapi import APIRouter, Response
+
+from src.services.dataset_cache import dataset_cache
+from src.services.model_registry import model_registry
+from src.services.warmup import PENDING, RUNNING, warmup
+
+router = APIRouter()
+
+@router.get("/health/live")
+async def liveness():
+    """
+    Liveness probe: the worker runs its event loop.
+
+    Returns:
+        dict: The status and the pid of the worker.
+    """
+    return {"status": "alive", "pid": os.getpid()}
+
+@router.get("/health/ready")
+async def readiness(response: Response):
+    """
+    Readiness probe: the worker can serve traffic at full speed.
+
+    Not ready (503) while the startup warmup is pending or running. Once it
+    finished, `warm` tells whether every step succeeded (a model that is
+    not trained yet does not make the worker unready).
+
+    Returns:
+        dict: The warmup state and the number of datasets and models in memory.
+    """
+    state = warmup.stats()
+    ready = state["status"] not in (PENDING, RUNNING)
+    response.status_code = 200 if ready else 503
+    return {
+        "status": "ready" if ready else "starting",
+        "pid": os.getpid(),
+        "warmup": state["status"],
+        "warm": ready and all(step["error"] is None for step in state["steps"].values()),
+        "steps": state["steps"],
+        "datasets_cached": dataset_cache.stats()["entries"],
+        "models_loaded": model_registry.stats()["entries"],
+    }
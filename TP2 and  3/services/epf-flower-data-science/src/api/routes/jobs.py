@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException
+
+from src.services.executors import run_io
+from src.services.jobs import FAILED, SUCCEEDED, job_manager
+
+router = APIRouter()
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the status of a background job.
+
+    Args:
+        job_id (str): The id returned when the job was submitted.
+
+    Returns:
+        dict: The job state (status, timestamps, error).
+
+    Raises:
+        HTTPException: If no job has this id.
+    """
+    job = await run_io(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {key: value for key, value in job.to_dict().items() if key != "result"}
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Get the result of a finished job.
+
+    Args:
+        job_id (str): The id returned when the job was submitted.
+
+    Returns:
+        dict: The value returned by the job.
+
+    Raises:
+        HTTPException: If no job has this id, if it failed or if it is not finished yet.
+    """
+    job = await run_io(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=f"Job failed: {job.error}")
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+    return job.result
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Response
+
+from src.services.metrics import CONTENT_TYPE, metrics
+from src.services.warmup import warmup
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    Expose the metrics of this process in the Prometheus text format.
+
+    Returns:
+        Response: Request latencies and counts per route, in-flight requests,
+        pipeline stage durations and cache hits/misses.
+    """
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+@router.get("/warmup-stats")
+async def warmup_stats():
+    """
+    Get the state of the startup warmup.
+
+    Returns:
+        dict: The preload mode, its status (pending, running, ready, skipped),
+        its duration and the duration or error of each step.
+    """
+    return warmup.stats()
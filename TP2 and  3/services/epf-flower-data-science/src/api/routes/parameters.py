@@ -1,12 +1,11 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-import sys
-import os
-
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../../../../'))
+from typing import Optional
 
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, validator
 
-from firestore import FirestoreClient
+from src.services.executors import run_io
+from src.services import parameters as parameters_service
+from src.services import resources
 
 router = APIRouter()
 
@@ -17,9 +16,25 @@ class Parameters(BaseModel):
     Attributes:
         n_estimators (int): The number of trees in the forest.
         criterion (str): The function to measure the quality of a split.
+        n_jobs (int): Jobs fitting the trees, None to use the free cores.
+        backend (str): joblib backend of the fits ("auto", "threading", "loky", "sequential").
     """
     n_estimators: int
     criterion: str
+    n_jobs: Optional[int] = None
+    backend: Optional[str] = None
+
+    @validator("n_jobs")
+    def check_n_jobs(cls, value):
+        if value == 0:
+            raise ValueError("n_jobs must not be 0")
+        return value
+
+    @validator("backend")
+    def check_backend(cls, value):
+        if value is not None and value not in resources.BACKENDS:
+            raise ValueError(f"backend must be one of {resources.BACKENDS}")
+        return value
 
 @router.post("/create-firestore-collection")
 async def create_collection():
@@ -33,8 +48,7 @@ async def create_collection():
         HTTPException: If there is an error creating the collection.
     """
     try:
-        firestore_client = FirestoreClient()
-        firestore_client.create_parameters_collection()
+        await run_io(parameters_service.create_parameters_collection)
         return {"message": "Firestore collection created successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -44,6 +58,8 @@ async def get_parameters():
     """
     Get the parameters from the Firestore collection.
 
+    The document is served from a short-lived cache shared by all requests.
+
     Returns:
         dict: The parameters stored in the Firestore collection.
 
@@ -51,8 +67,7 @@ async def get_parameters():
         HTTPException: If there is an error retrieving the parameters.
     """
     try:
-        firestore_client = FirestoreClient()
-        parameters = firestore_client.get("parameters", "parameters")
+        parameters = await run_io(parameters_service.get_parameters)
         return parameters
     except FileExistsError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -64,6 +79,9 @@ async def update_parameters(parameters: Parameters):
     """
     Update the parameters document in the Firestore collection.
 
+    `n_jobs` and `backend`, when given, are also written to
+    `model_parameters.json` and apply to the next trainings.
+
     Args:
         parameters (Parameters): The parameters to update.
 
@@ -74,8 +92,38 @@ async def update_parameters(parameters: Parameters):
         HTTPException: If there is an error updating the parameters.
     """
     try:
-        firestore_client = FirestoreClient()
-        firestore_client.update_parameters(parameters.dict())
+        # Les champs optionnels absents ne remplacent pas les valeurs enregistrées
+        fields = parameters.dict(exclude_unset=True)
+        await run_io(parameters_service.update_parameters, fields)
+        training_fields = {name: fields[name] for name in ("n_jobs", "backend") if name in fields}
+        if training_fields:
+            await run_io(resources.apply_training_parameters, training_fields)
         return {"message": "Parameters updated successfully"}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/parameters-cache-stats")
+async def parameters_cache_stats():
+    """
+    Get the counters of the Firestore parameters cache.
+
+    Returns:
+        dict: Cache hits, Firestore reads/writes and calls saved.
+    """
+    return parameters_service.parameters_cache.stats()
+
+@router.get("/training-resources")
+async def training_resources():
+    """
+    Get the parallelism the next training would use and the training slots.
+
+    Returns:
+        dict: The `plan_training` of the current parameters and the slot counters.
+
+    Raises:
+        HTTPException: If the stored training parameters are invalid.
+    """
+    try:
+        return {"plan": await run_io(resources.current_plan), "slots": resources.training_slots.stats()}
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel, Field
+
+from src.services.executors import run_io
+from src.services.jobs import FAILED, job_manager
+from src.services.scoring import check_output, data_path, scores_path
+
+router = APIRouter()
+
+class ScoringRequest(BaseModel):
+    """
+    Pydantic model for a batch-scoring job.
+
+    Attributes:
+        input (str): CSV or Parquet file to score, relative to the data folder.
+        output (str): CSV file of predictions, relative to the data folder and
+            inside its `scores/` folder; an existing file is only overwritten by a rerun of a scoring.
+        chunk_size (int): Rows read and scored at a time.
+        workers (int): Worker processes, defaults to the CPU executor size,
+            capped at the usable cores.
+        columns (List[str]): Input columns fed to the model, defaults to the model's.
+        id_column (str): Column copied to the output next to each prediction.
+    """
+    input: str
+    output: str
+    chunk_size: Optional[int] = Field(None, ge=1)
+    workers: Optional[int] = Field(None, ge=1)
+    columns: Optional[List[str]] = None
+    id_column: Optional[str] = None
+
+@router.post("/score-file", status_code=202)
+async def score_file(request: ScoringRequest, response: Response, wait: bool = False):
+    """
+    Score a file with the Iris model in a background job.
+
+    The file is streamed in chunks scored by a process pool and the
+    predictions are appended to the output with a checkpoint per chunk: a
+    job interrupted by a restart resumes after its last completed chunk.
+
+    Args:
+        request (ScoringRequest): The files and options of the run.
+        wait (bool): Wait for the job and return its result.
+
+    Returns:
+        dict: The job id and status, or the rows scored and rows per second when `wait` is set.
+
+    Raises:
+        HTTPException: If a path leaves its folder or the output may not be
+        written (400), the input does not exist (404) or the job fails.
+    """
+    try:
+        input_path, output_path = data_path(request.input), scores_path(request.output)
+        check_output(input_path, output_path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not os.path.isfile(input_path):
+        raise HTTPException(status_code=404, detail="Input file not found")
+
+    # Le même fichier vers la même sortie : même job
+    params = request.dict()
+    fingerprint = hashlib.sha256(f"score;{json.dumps(params, sort_keys=True)}".encode()).hexdigest()
+    job = await run_io(job_manager.submit, "score-file", fingerprint, params)
+
+    if not wait:
+        return {"job_id": job.id, "status": job.status}
+
+    job = await job_manager.wait_async(job.id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+
+    response.status_code = 200
+    return {"job_id": job.id, **job.result}
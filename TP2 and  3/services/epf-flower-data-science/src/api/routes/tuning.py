@@ -0,0 +1,91 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel, Field
+
+from src.services.data import training_fingerprint
+from src.services.datasets import dataset_engine
+from src.services.executors import run_io
+from src.services.jobs import FAILED, job_manager
+from src.services.tuning import IRIS_DATASET, tuner, validate_search
+
+router = APIRouter()
+
+class TuneRequest(BaseModel):
+    """
+    Pydantic model for a hyperparameter search.
+
+    Attributes:
+        dataset (str): Name of the dataset to tune on.
+        param_grid (Dict[str, List[Any]]): Values to try for each RandomForestClassifier parameter.
+        strategy (str): "grid" or "halving" (successive halving).
+        cv (int): Number of cross-validation folds.
+        factor (int): Halving factor.
+        min_rows (int): Rows of the first halving round.
+        apply (bool): Write the best parameters to model_parameters.json (off by default).
+        sync_firestore (bool): Also update n_estimators/criterion in Firestore.
+    """
+    dataset: str = "iris"
+    param_grid: Dict[str, List[Any]]
+    strategy: str = "grid"
+    cv: int = Field(3, ge=2)
+    factor: int = Field(3, ge=2)
+    min_rows: Optional[int] = Field(None, ge=2)
+    apply: bool = False
+    sync_firestore: bool = False
+
+@router.post("/tune", status_code=202)
+async def tune(request: TuneRequest, response: Response, wait: bool = False):
+    """
+    Search the best forest parameters in a background job.
+
+    Fold scores are cached by parameter hash, so repeating a search only
+    fits the folds it has never scored.
+
+    Args:
+        request (TuneRequest): The search to run.
+        wait (bool): Wait for the job and return its result.
+
+    Returns:
+        dict: The job id and status, or the search result when `wait` is set.
+
+    Raises:
+        HTTPException: If the search is invalid or fails.
+    """
+    try:
+        validate_search(request.param_grid, request.strategy)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Même requête sur les mêmes données et paramètres de base : même job
+    params = request.dict()
+    if request.dataset == IRIS_DATASET:
+        dataset_fingerprint = await run_io(training_fingerprint)
+    else:
+        dataset_fingerprint = await run_io(dataset_engine.fingerprint, request.dataset)
+    fingerprint = hashlib.sha256(
+        f"tune;{dataset_fingerprint};{json.dumps(params, sort_keys=True, default=str)}".encode()
+    ).hexdigest()
+    job = await run_io(job_manager.submit, "tune-model", fingerprint, params)
+
+    if not wait:
+        return {"job_id": job.id, "status": job.status}
+
+    job = await job_manager.wait_async(job.id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+
+    response.status_code = 200
+    return {"job_id": job.id, **job.result}
+
+@router.get("/tune-cache-stats")
+async def tune_cache_stats():
+    """
+    Get the counters of the fold score cache.
+
+    Returns:
+        dict: Fold scores served from cache (hits) and fitted (misses).
+    """
+    return tuner.stats()
@@ -1,10 +1,32 @@
+import functools
+from typing import Iterable, Optional
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
-from src.api.router import router
+from src.api.middleware import MetricsMiddleware
+from src.api.router import build_router
+from src.services.downloads import download_manager
+from src.services.executors import shutdown_executors
+from src.services.jobs import job_manager
+from src.services.logs import configure_logging
+from src.services.parameters import close_firestore_client
+from src.services.warmup import warmup
+
+
+def get_application(route_groups: Optional[Iterable[str]] = None, preload: Optional[str] = None) -> FastAPI:
+    """
+    Build the application.
 
+    Args:
+        route_groups (Iterable[str]): Route groups to mount (see `ROUTE_GROUPS`), defaults to all.
+        preload (str): Warmup mode at startup, "eager", "background" or "lazy";
+            defaults to `PRELOAD_MODE`.
 
-def get_application() -> FastAPI:
+    Returns:
+        FastAPI: The application.
+    """
+    configure_logging()
     application = FastAPI(
         title="epf-flower-data-science",
         description="""Fast API""",
@@ -19,6 +41,14 @@ def get_application() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Ajouté en dernier : englobe les autres middlewares, la latence mesurée est celle vue par le client
+    application.add_middleware(MetricsMiddleware)
 
-    application.include_router(router)
+    application.include_router(build_router(route_groups))
+    application.add_event_handler("startup", job_manager.start)
+    application.add_event_handler("startup", functools.partial(warmup.start, preload))
+    application.add_event_handler("shutdown", job_manager.shutdown)
+    application.add_event_handler("shutdown", download_manager.shutdown)
+    application.add_event_handler("shutdown", shutdown_executors)
+    application.add_event_handler("shutdown", close_firestore_client)
     return application
@@ -0,0 +1,272 @@
+import bz2
+import hashlib
+import io
+import json
+import lzma
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.services.compiled_forest import CompiledForest
+
+DEFAULT_FORMAT = os.environ.get("MODEL_ARTIFACT_FORMAT", "packed")
+DEFAULT_COMPRESSION = os.environ.get("MODEL_ARTIFACT_COMPRESSION", "zlib")
+DEFAULT_COMPRESSION_LEVEL = int(os.environ.get("MODEL_ARTIFACT_COMPRESSION_LEVEL", 3))
+FORMATS = ("packed", "pickle")
+
+MAGIC = b"FLWRART1"
+FORMAT_VERSION = 1
+# Les tableaux commencent sur une frontière de 64 octets : vues NumPy alignées sur le mmap
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sQ")
+
+_COMPRESSORS = {
+    "none": (lambda data, level: data, lambda data: data),
+    "zlib": (lambda data, level: zlib.compress(data, level), zlib.decompress),
+    "lzma": (lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+    "bz2": (lambda data, level: bz2.compress(data, max(1, level)), bz2.decompress),
+}
+COMPRESSIONS = tuple(_COMPRESSORS)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _describe(model: Any, metadata: Optional[dict]) -> dict:
+    metadata = dict(metadata or {})
+    schema = {
+        "n_features": int(getattr(model, "n_features_in_", 0)),
+        "classes": np.asarray(model.classes_).tolist(),
+        **metadata.pop("schema", {}),
+    }
+    if hasattr(model, "feature_names_in_"):
+        schema.setdefault("feature_names", model.feature_names_in_.tolist())
+    metrics = dict(metadata.pop("metrics", {}))
+    if getattr(model, "oob_score", False) and hasattr(model, "oob_score_"):
+        metrics.setdefault("oob_score", float(model.oob_score_))
+    return {
+        "estimator": f"{type(model).__module__}.{type(model).__name__}",
+        "schema": schema,
+        "params": json.loads(json.dumps(model.get_params(), default=str)),
+        "metrics": metrics,
+        **metadata,
+    }
+
+
+def dump_artifact(
+    model: Any,
+    metadata: Optional[dict] = None,
+    compression: str = DEFAULT_COMPRESSION,
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+) -> bytes:
+    """
+    Serialize a fitted forest to the packed artifact format.
+
+    Layout: an 8-byte magic and the header length, a JSON header, then
+    64-byte aligned sections: the node arrays of the compiled forest, stored
+    raw so readers can memory-map them, and the pickled estimator, compressed
+    with `compression`.
+
+    Args:
+        model (Any): The fitted RandomForestClassifier.
+        metadata (dict): Extra header fields; "schema" and "metrics" are
+            merged with the values read from the model.
+        compression (str): "none", "zlib", "lzma" or "bz2", for the estimator section.
+        level (int): Compression level.
+
+    Returns:
+        bytes: The artifact content.
+
+    Raises:
+        ValueError: If the compression is unknown.
+    """
+    if compression not in _COMPRESSORS:
+        raise ValueError(f"Unknown artifact compression: {compression}")
+
+    import joblib
+
+    forest = CompiledForest.from_sklearn(model)
+    arrays = {name: np.ascontiguousarray(values) for name, values in forest.arrays().items() if name != "classes"}
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    pickled = buffer.getvalue()
+    estimator = _COMPRESSORS[compression][0](pickled, level)
+
+    # Les offsets sont relatifs à la fin de l'en-tête, dont la taille n'est pas encore connue
+    sections, blobs, offset = {}, [], 0
+    for name, values in arrays.items():
+        offset = _align(offset)
+        sections[name] = {"offset": offset, "nbytes": values.nbytes, "dtype": values.dtype.str, "shape": list(values.shape)}
+        blobs.append((offset, values.tobytes()))
+        offset += values.nbytes
+    offset = _align(offset)
+    sections["estimator"] = {"offset": offset, "nbytes": len(estimator), "raw_nbytes": len(pickled), "compression": compression}
+    blobs.append((offset, estimator))
+    body = bytearray(offset + len(estimator))
+    for start, blob in blobs:
+        body[start:start + len(blob)] = blob
+
+    header = {
+        "format": FORMAT_VERSION,
+        "created_at": time.time(),
+        **_describe(model, metadata),
+        "forest": {"n_features": forest.n_features, "max_depth": forest.max_depth, "n_trees": len(forest.roots),
+                   "n_nodes": len(forest.feature)},
+        "sha256": hashlib.sha256(body).hexdigest(),
+        "sections": sections,
+    }
+    encoded = json.dumps(header, separators=(",", ":")).encode()
+    encoded += b" " * (_align(_PREFIX.size + len(encoded)) - _PREFIX.size - len(encoded))
+    return _PREFIX.pack(MAGIC, len(encoded)) + encoded + bytes(body)
+
+
+def is_packed(prefix: bytes) -> bool:
+    return prefix[:len(MAGIC)] == MAGIC
+
+
+def read_header(path: str) -> dict:
+    """
+    Read the metadata header of an artifact without loading the model.
+
+    Args:
+        path (str): Path of the artifact.
+
+    Returns:
+        dict: The header (schema, params, metrics, sha256, sections...).
+
+    Raises:
+        FileNotFoundError: If the artifact does not exist.
+        ValueError: If the file is not a packed artifact.
+    """
+    with open(path, "rb") as f:
+        return _read_header(f)
+
+
+def _read_header(f) -> dict:
+    prefix = f.read(_PREFIX.size)
+    if len(prefix) < _PREFIX.size or not is_packed(prefix):
+        raise ValueError("Not a packed model artifact")
+    _, length = _PREFIX.unpack(prefix)
+    header = json.loads(f.read(length))
+    header["body_offset"] = _PREFIX.size + length
+    return header
+
+
+class ModelArtifact:
+    """
+    A model artifact opened for serving.
+
+    The header is read eagerly. The node arrays of a packed artifact are
+    NumPy views on a read-only memory map of the file, so every worker
+    serving the same file shares their pages; the estimator is only
+    unpickled the first time `estimator` is accessed (scikit-learn engine,
+    incremental training). Legacy joblib pickles are wrapped with
+    `from_estimator`.
+    """
+
+    def __init__(self, header: dict, estimator: Any = None, buffer: Optional[mmap.mmap] = None) -> None:
+        self.header = header
+        self._estimator = estimator
+        self._buffer = buffer
+        self._forest: Optional[CompiledForest] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: str, estimator: Any = None) -> "ModelArtifact":
+        """
+        Open a packed artifact, or load a legacy joblib pickle.
+
+        Args:
+            path (str): Path of the artifact.
+            estimator (Any): The estimator stored in the artifact, when the
+                caller already has it in memory (right after saving it).
+
+        Raises:
+            FileNotFoundError: If the artifact does not exist.
+        """
+        with open(path, "rb") as f:
+            if not is_packed(f.read(len(MAGIC))):
+                f.seek(0)
+                if estimator is None:
+                    import joblib
+                    estimator = joblib.load(f)
+                return cls.from_estimator(estimator)
+            f.seek(0)
+            header = _read_header(f)
+            # Le mapping reste valide après fermeture du fichier, et même après son remplacement
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(header, estimator=estimator, buffer=buffer)
+
+    @classmethod
+    def from_estimator(cls, model: Any, metadata: Optional[dict] = None) -> "ModelArtifact":
+        return cls({"format": None, **_describe(model, metadata)}, estimator=model)
+
+    @property
+    def packed(self) -> bool:
+        return self._buffer is not None
+
+    def _section(self, name: str) -> dict:
+        return self.header["sections"][name]
+
+    def _array(self, name: str) -> np.ndarray:
+        section = self._section(name)
+        offset = self.header["body_offset"] + section["offset"]
+        count = int(np.prod(section["shape"], dtype=np.int64))
+        return np.frombuffer(self._buffer, dtype=np.dtype(section["dtype"]), count=count, offset=offset).reshape(section["shape"])
+
+    @property
+    def estimator(self) -> Any:
+        """The scikit-learn estimator, unpickled on first access."""
+        if self._estimator is None:
+            with self._lock:
+                if self._estimator is None:
+                    # joblib n'est importé que si l'estimateur est réellement demandé
+                    import joblib
+
+                    section = self._section("estimator")
+                    start = self.header["body_offset"] + section["offset"]
+                    payload = _COMPRESSORS[section["compression"]][1](self._buffer[start:start + section["nbytes"]])
+                    self._estimator = joblib.load(io.BytesIO(payload))
+        return self._estimator
+
+    @property
+    def forest(self) -> CompiledForest:
+        """The compiled forest, on the mapped arrays of a packed artifact."""
+        if self._forest is None:
+            with self._lock:
+                if self._forest is None:
+                    if self.packed:
+                        self._forest = CompiledForest.from_arrays(
+                            {name: self._array(name) for name in self.header["sections"] if name != "estimator"},
+                            classes=np.asarray(self.header["schema"]["classes"]),
+                            n_features=self.header["forest"]["n_features"],
+                            max_depth=self.header["forest"]["max_depth"],
+                        )
+                    else:
+                        self._forest = CompiledForest.from_sklearn(self._estimator)
+        return self._forest
+
+    def verify(self) -> bool:
+        """Check the content of a packed artifact against the hash of its header."""
+        if not self.packed:
+            return True
+        return hashlib.sha256(memoryview(self._buffer)[self.header["body_offset"]:]).hexdigest() == self.header["sha256"]
+
+    @property
+    def estimator_nbytes(self) -> int:
+        """Memory of the estimator unpickled from a packed artifact (size of its pickle), 0 until it is."""
+        if not self.packed or self._estimator is None:
+            return 0
+        section = self._section("estimator")
+        return section.get("raw_nbytes", section["nbytes"])
+
+    @property
+    def loaded(self) -> Dict[str, bool]:
+        return {"estimator": self._estimator is not None, "forest": self._forest is not None}
@@ -0,0 +1,170 @@
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+from src.services.executors import CPU_WORKERS, run_in
+from src.services.utils import Histogram
+
+DEFAULT_MAX_BATCH_SIZE = int(os.environ.get("PREDICT_MAX_BATCH_SIZE", 256))
+DEFAULT_MAX_WAIT_MS = float(os.environ.get("PREDICT_MAX_WAIT_MS", 2))
+# Lots envoyés au modèle en même temps : un par worker du pool CPU
+DEFAULT_MAX_IN_FLIGHT = int(os.environ.get("PREDICT_MAX_IN_FLIGHT", CPU_WORKERS))
+
+
+@dataclass
+class _PendingRequest:
+    matrix: np.ndarray
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class PredictionBatcher:
+    """
+    Merge concurrent prediction requests into a single model call.
+
+    Requests are queued on the event loop. The first request of a batch waits
+    at most `max_wait_ms` for others to join, until `max_batch_size` rows are
+    collected. The merged matrix is scored once, off the event loop, and each
+    caller receives the slice matching its own rows. Up to `max_in_flight`
+    batches are scored at the same time, one per worker of the CPU pool by
+    default, while the next batch is being collected.
+
+    `predict_fn` runs in the executor named by `executor_kind` (see
+    `src.services.executors`), so it must be picklable for the "cpu" kind.
+    `context`, if given, is called on the event loop for each batch and its
+    result is passed to `predict_fn` as keyword arguments.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], list],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        executor_kind: str = "cpu",
+        context: Optional[Callable[[], Dict]] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> None:
+        self.predict_fn = predict_fn
+        self.executor_kind = executor_kind
+        self.context = context
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_in_flight = max(1, max_in_flight)
+        self.batch_size_histogram = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024])
+        self.queue_wait_histogram = Histogram([0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1])
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._arrived: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    async def submit(self, matrix: np.ndarray) -> list:
+        """
+        Queue a 2D matrix of features and wait for its predictions.
+
+        Args:
+            matrix (np.ndarray): The rows to score.
+
+        Returns:
+            list: One prediction per row of `matrix`.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Nouvelle boucle (ex : TestClient) : on repart d'une file vide
+            self._loop, self._queue, self._worker = loop, asyncio.Queue(), None
+            self._arrived, self._slots = asyncio.Event(), asyncio.Semaphore(self.max_in_flight)
+            self._in_flight = set()
+
+        future = loop.create_future()
+        self._queue.put_nowait(_PendingRequest(matrix, future, loop.time()))
+        self._arrived.set()
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._drain())
+        return await future
+
+    async def _drain(self) -> None:
+        # Le worker s'arrête dès que la file est vide, submit le relance au besoin
+        loop = asyncio.get_running_loop()
+        while not self._queue.empty():
+            # Un lot part dès qu'un worker est libre ; les autres lots continuent en parallèle
+            await self._slots.acquire()
+            task = loop.create_task(self._dispatch(await self._collect()))
+            self._in_flight.add(task)
+            task.add_done_callback(self._dispatched)
+
+    def _dispatched(self, task: asyncio.Task) -> None:
+        self._in_flight.discard(task)
+        self._slots.release()
+
+    async def _collect(self) -> List[_PendingRequest]:
+        loop = asyncio.get_running_loop()
+        batch = [self._queue.get_nowait()]
+        rows = len(batch[0].matrix)
+        deadline = loop.time() + self.max_wait_ms / 1000
+        while rows < self.max_batch_size:
+            if self._queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                # Attente d'une arrivée, pas de get() annulable : un élément retiré ne peut pas être perdu
+                self._arrived.clear()
+                try:
+                    await asyncio.wait_for(self._arrived.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            pending = self._queue.get_nowait()
+            batch.append(pending)
+            rows += len(pending.matrix)
+        return batch
+
+    async def _dispatch(self, batch: List[_PendingRequest]) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        for pending in batch:
+            self.queue_wait_histogram.observe(now - pending.enqueued_at)
+
+        # Les requêtes avec un nombre de colonnes différent ne peuvent pas être empilées
+        groups = {}
+        for pending in batch:
+            groups.setdefault(pending.matrix.shape[1], []).append(pending)
+
+        kwargs = self.context() if self.context else {}
+        for group in groups.values():
+            self.batch_size_histogram.observe(sum(len(pending.matrix) for pending in group))
+            try:
+                merged = np.vstack([pending.matrix for pending in group])
+                predictions = await run_in(self.executor_kind, self.predict_fn, merged, **kwargs)
+            except Exception as e:
+                for pending in group:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                continue
+
+            start = 0
+            for pending in group:
+                stop = start + len(pending.matrix)
+                if not pending.future.done():
+                    pending.future.set_result(predictions[start:stop])
+                start = stop
+
+    def stats(self) -> dict:
+        """
+        Return the batching configuration and histograms.
+
+        Returns:
+            dict: Max batch size, max wait, batches in flight and their limit,
+            batch size and queue wait histograms.
+        """
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "in_flight": len(self._in_flight),
+            "max_in_flight": self.max_in_flight,
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "queue_wait_seconds": self.queue_wait_histogram.snapshot(),
+        }
@@ -0,0 +1,170 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class CompiledForest:
+    """
+    A fitted RandomForestClassifier flattened into NumPy node arrays.
+
+    The nodes of every tree are concatenated into shared arrays (feature,
+    threshold, children, leaf probabilities). Prediction walks all trees for
+    all rows at once, one depth level per step, then averages the leaf
+    probabilities in estimator order with the same float32 inputs and float64
+    arithmetic as scikit-learn, so the predictions are identical.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        missing_left: np.ndarray,
+        leaf_proba: np.ndarray,
+        roots: np.ndarray,
+        classes: np.ndarray,
+        n_features: int,
+        max_depth: int,
+        children: Optional[np.ndarray] = None,
+    ) -> None:
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.classes = classes
+        self.n_features = n_features
+        self.max_depth = max_depth
+        # children[2 * node] : fils gauche, children[2 * node + 1] : fils droit
+        self._children = np.stack([left, right], axis=1).ravel() if children is None else children
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], classes: np.ndarray, n_features: int, max_depth: int) -> "CompiledForest":
+        """
+        Rebuild a compiled forest from the arrays returned by `arrays`.
+
+        The arrays are used as is (no copy), e.g. views on a memory-mapped artifact.
+        """
+        return cls(
+            feature=arrays["feature"],
+            threshold=arrays["threshold"],
+            left=arrays["left"],
+            right=arrays["right"],
+            missing_left=arrays["missing_left"],
+            leaf_proba=arrays["leaf_proba"],
+            roots=arrays["roots"],
+            classes=classes,
+            n_features=n_features,
+            max_depth=max_depth,
+            children=arrays.get("children"),
+        )
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "CompiledForest":
+        """
+        Compile a fitted scikit-learn RandomForestClassifier.
+
+        Args:
+            model (RandomForestClassifier): The fitted forest (single output).
+
+        Returns:
+            CompiledForest: The compiled forest.
+
+        Raises:
+            ValueError: If the model has several outputs.
+        """
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output forests can be compiled")
+
+        features, thresholds, lefts, rights, missing, probas, roots = [], [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.int64) + offset
+            is_leaf = tree.children_left == -1
+            # Une feuille pointe sur elle-même : parcourir plus loin ne la quitte pas
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            thresholds.append(tree.threshold.astype(np.float64))
+            missing.append(np.asarray(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count)), dtype=bool))
+
+            # Même normalisation que DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            probas.append(value / normalizer)
+
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            missing_left=np.concatenate(missing),
+            leaf_proba=np.concatenate(probas),
+            roots=np.asarray(roots, dtype=np.int64),
+            classes=np.asarray(model.classes_),
+            n_features=int(model.n_features_in_),
+            max_depth=int(max_depth),
+        )
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Return the leaf reached by each row in each tree.
+
+        Args:
+            X (np.ndarray): Matrix of shape (n_rows, n_features).
+
+        Returns:
+            np.ndarray: Global node ids of shape (n_trees, n_rows).
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[-1]} features, but the forest expects {self.n_features}")
+
+        # Indices plats : une seule lecture de X et une seule des enfants par niveau
+        X_flat = X.ravel()
+        row_offsets = (np.arange(X.shape[0], dtype=np.int64) * self.n_features)[np.newaxis, :]
+        has_nan = bool(np.isnan(X_flat).any())
+        nodes = np.repeat(self.roots[:, np.newaxis], X.shape[0], axis=1)
+        for _ in range(self.max_depth):
+            values = X_flat[row_offsets + self.feature[nodes]]
+            thresholds = self.threshold[nodes]
+            if has_nan:
+                go_right = ~((values <= thresholds) | (np.isnan(values) & self.missing_left[nodes]))
+            else:
+                go_right = values > thresholds
+            nodes = self._children[2 * nodes + go_right]
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+        # La réduction sur l'axe des arbres additionne dans l'ordre des arbres, comme
+        # scikit-learn, ce qui donne exactement les mêmes probabilités
+        proba = self.leaf_proba[leaves].sum(axis=0)
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Return the node arrays, e.g. to persist them."""
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "missing_left": self.missing_left,
+            "leaf_proba": self.leaf_proba,
+            "roots": self.roots,
+            "children": self._children,
+            "classes": self.classes,
+        }
@@ -0,0 +1,167 @@
+import copy
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+from src.services.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows : seul le verrou du processus est utilisé
+    fcntl = None
+
+
+class ConfigWriteError(Exception):
+    """Raised when the new version of a config file cannot be written."""
+
+
+class ConfigStore:
+    """
+    Cached, concurrency-safe access to a JSON config file.
+
+    Reads are served from an in-memory copy until the file's mtime or size
+    changes. Updates are serialized with a thread lock plus an exclusive
+    file lock (`<path>.lock`, on POSIX) so writers in other processes are
+    serialized too; each update re-reads the current file, applies the
+    change and replaces the file atomically (write to a temporary file,
+    then rename), so readers never see a partially written file.
+    Subscribers are called with the new config after every update.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.abspath(path)
+        self._lock = threading.RLock()
+        self._cached: Optional[Tuple[Tuple[int, int], dict]] = None
+        self._subscribers: List[Callable[[dict], None]] = []
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.reads = 0
+        self.writes = 0
+
+    def _version(self) -> Tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(self.path)
+        version = self._version()
+        if self._cached is not None and self._cached[0] == version:
+            self.hits += 1
+            return self._cached[1]
+        with open(self.path) as config_file:
+            config = json.load(config_file)
+        self.reads += 1
+        self._cached = (version, config)
+        return config
+
+    def read(self) -> dict:
+        """
+        Get the current config.
+
+        Returns:
+            dict: A copy of the config, safe to modify.
+
+        Raises:
+            FileNotFoundError: If the config file does not exist.
+            json.JSONDecodeError: If the file is not valid JSON.
+        """
+        with self._lock:
+            return copy.deepcopy(self._load())
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def update(self, change: Callable[[dict], None]) -> dict:
+        """
+        Apply `change` to the config and write it back atomically.
+
+        Args:
+            change (Callable[[dict], None]): Modifies the config in place. It may
+                raise to abort the update, in which case nothing is written.
+
+        Returns:
+            dict: A copy of the new config.
+
+        Raises:
+            FileNotFoundError: If the config file does not exist.
+            json.JSONDecodeError: If the file is not valid JSON.
+            ConfigWriteError: If the new config cannot be written.
+        """
+        with self._lock, self._file_lock():
+            config = copy.deepcopy(self._load())
+            change(config)
+
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w") as tmp_file:
+                    json.dump(config, tmp_file, indent=4)
+                    tmp_file.flush()
+                    os.fsync(tmp_file.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise ConfigWriteError(str(e)) from e
+
+            self.writes += 1
+            self._cached = (self._version(), config)
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            callback(copy.deepcopy(config))
+        return copy.deepcopy(config)
+
+    def subscribe(self, callback: Callable[[dict], None]) -> Callable[[], None]:
+        """
+        Call `callback` with the new config after each update.
+
+        Returns:
+            Callable[[], None]: A function that removes the subscription.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    def clear(self) -> None:
+        """Drop the cached copy and reset the counters; the next read goes back to the file."""
+        with self._lock:
+            self._cached = None
+            self._reset_counters()
+
+    def stats(self) -> dict:
+        """
+        Return the store counters.
+
+        Returns:
+            dict: Reads served from memory, file parses, writes and subscribers.
+        """
+        with self._lock:
+            return {
+                "path": self.path,
+                "hits": self.hits,
+                "reads": self.reads,
+                "writes": self.writes,
+                "subscribers": len(self._subscribers),
+            }
+
+
+config_store = ConfigStore(os.path.join(os.path.dirname(__file__), '../config/config.json'))
+model_parameters_store = ConfigStore(os.path.join(os.path.dirname(__file__), '../config/model_parameters.json'))
+
+metrics.register_cache("config", config_store.stats, misses="reads")
+metrics.register_cache("model_parameters", model_parameters_store.stats, misses="reads")
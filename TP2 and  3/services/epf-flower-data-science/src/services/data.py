@@ -1,15 +1,31 @@
 import os
+from typing import List, Optional, Sequence, Tuple, TypedDict
+import numpy as np
 import pandas as pd
 from fastapi import HTTPException
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-import joblib
+import importlib
 import json
+import hashlib
+
+from src.services.batching import PredictionBatcher
+from src.services.dataset_cache import dataset_cache
+from src.services.executors import call_in
+from src.services.jobs import job_manager
+from src.services.metrics import metrics, stage
+from src.services.model_registry import model_registry
+from src.services.preprocessing import clean_labels
+from src.services.resources import fit_in_parallel, training_slots
+from src.services.training_cache import training_cache, training_key
+from src.services.warmup import warmup
 
 def load_iris_dataset() -> pd.DataFrame:
     """
     Load the Iris dataset from a CSV file.
 
+    The file is parsed once and then served from the dataset cache until it
+    changes on disk. The returned frame is shared and must not be modified
+    in place.
+
     Returns:
         pd.DataFrame: The loaded Iris dataset.
 
@@ -23,9 +39,10 @@ def load_iris_dataset() -> pd.DataFrame:
     if not os.path.exists(dataset_path):
         raise HTTPException(status_code=404, detail="Dataset file not found")
 
-    # Charge le dataset
+    # Charge le dataset (depuis le cache si le fichier n'a pas changé)
     try:
-        df = pd.read_csv(dataset_path)
+        with stage("load"):
+            df = dataset_cache.get(dataset_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading dataset: {str(e)}")
 
@@ -41,102 +58,422 @@ def process_iris_dataset(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: The processed Iris dataset.
     """
-    # Renommer les colonnes contenant "iris"
+    # Renommer les colonnes contenant "iris" (une seule table de correspondance, sans copie des colonnes)
     try:
-        df_processed = df.rename(columns=lambda x: x.replace('iris-', ''))
-        # Enlever "iris-" dans les noms des espèces
-        df_processed['Species'] = df_processed['Species'].str.replace('iris-', '', case=False)
+        with stage("process"):
+            df_processed = df.rename(columns={column: column.replace('iris-', '') for column in df.columns}, copy=False)
+            # Enlever "iris-" dans les noms des espèces : une fois par espèce, pas une fois par ligne
+            df_processed['Species'] = clean_labels(df_processed['Species'].to_numpy(), 'iris-')
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing dataset: {str(e)}")
 
     return df_processed
 
-def split_iris_dataset(df: pd.DataFrame) -> dict:
+class DatasetSplit(TypedDict):
     """
-    Split the Iris dataset into training and testing sets.
+    Training and testing sets kept in memory as NumPy arrays.
+
+    `train_index` and `test_index` hold the row labels of the original
+    frame, so the sets can still be rendered like a pandas split.
+    """
+    feature_names: List[str]
+    target_name: str
+    train_index: np.ndarray
+    test_index: np.ndarray
+    X_train: np.ndarray
+    X_test: np.ndarray
+    y_train: np.ndarray
+    y_test: np.ndarray
+
+def split_arrays(X: np.ndarray, y: np.ndarray, index: np.ndarray, feature_names: List[str], target_name: str) -> DatasetSplit:
+    """
+    Split a feature matrix and its target into training and testing sets.
+
+    Only row positions are shuffled, with the same permutation as
+    `train_test_split(X, y, test_size=0.2, random_state=42)`.
 
     Args:
-        df (pd.DataFrame): The Iris dataset to split.
+        X (np.ndarray): The feature matrix.
+        y (np.ndarray): The target.
+        index (np.ndarray): The row labels.
+        feature_names (List[str]): The names of the columns of X.
+        target_name (str): The name of the target.
 
     Returns:
-        dict: A dictionary containing the training and testing sets.
+        DatasetSplit: The training and testing sets.
+    """
+    # scikit-learn est importé à la première utilisation : il coûte plus d'une seconde au démarrage
+    from sklearn.model_selection import train_test_split
+
+    with stage("split"):
+        try:
+            train_positions, test_positions = train_test_split(np.arange(len(X)), test_size=0.2, random_state=42)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error processing dataset: {str(e)}")
+
+        return DatasetSplit(
+            feature_names=list(feature_names),
+            target_name=target_name,
+            train_index=index[train_positions],
+            test_index=index[test_positions],
+            X_train=X[train_positions],
+            X_test=X[test_positions],
+            y_train=y[train_positions],
+            y_test=y[test_positions],
+        )
+
+def split_frame(df: pd.DataFrame, feature_names: List[str], target_name: str) -> DatasetSplit:
+    """
+    Split a dataset into training and testing sets.
+
+    The feature matrix is extracted once and the sets are taken from it,
+    without any serialization.
+
+    Args:
+        df (pd.DataFrame): The dataset to split.
+        feature_names (List[str]): The feature columns.
+        target_name (str): The target column.
+
+    Returns:
+        DatasetSplit: The training and testing sets.
     """
     try:
-        X = df.drop(columns=['Species'])
-        y = df['Species']
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        X = df[feature_names].to_numpy()
+        y = df[target_name].to_numpy()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing dataset: {str(e)}")
 
-    return {
-        "X_train": X_train.to_json(orient='split'),
-        "X_test": X_test.to_json(orient='split'),
-        "y_train": y_train.to_json(orient='split'),
-        "y_test": y_test.to_json(orient='split')
-    }
+    return split_arrays(X, y, df.index.to_numpy(), feature_names, target_name)
 
-def train_model(X_train: pd.DataFrame, y_train: pd.Series) -> str:
+def split_iris_dataset(df: pd.DataFrame) -> DatasetSplit:
     """
-    Train a RandomForest model on the Iris dataset.
+    Split the Iris dataset into training and testing sets.
 
     Args:
-        X_train (pd.DataFrame): The training features.
-        y_train (pd.Series): The training labels.
+        df (pd.DataFrame): The Iris dataset to split.
 
     Returns:
-        str: The path to the saved model file.
+        DatasetSplit: The training and testing sets.
+    """
+    return split_frame(df, [column for column in df.columns if column != 'Species'], 'Species')
+
+def load_model_parameters() -> dict:
+    """
+    Load the RandomForestClassifier parameters from `model_parameters.json`.
+
+    Returns:
+        dict: The keyword arguments of the estimator.
 
     Raises:
-        HTTPException: If there is an error loading model parameters or saving the model.
+        HTTPException: If the parameters file cannot be read.
     """
-    # Charger les paramètres du modèle depuis le fichier JSON
     config_path = os.path.join(os.path.dirname(__file__), '../config/model_parameters.json')
     try:
         with open(config_path, 'r') as config_file:
-            model_params = json.load(config_file)["RandomForestClassifier"]
+            return json.load(config_file)["RandomForestClassifier"]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading model parameters: {str(e)}")
 
-    # Initialiser le modèle avec les paramètres chargés
-    model = RandomForestClassifier(**model_params)
-    model.fit(X_train, y_train)
+def evaluate_model(model, X_test: np.ndarray, y_test: np.ndarray, classes: Optional[Sequence] = None) -> dict:
+    """
+    Compute the metrics stored in the header of a model artifact.
+
+    Args:
+        model: The fitted model, predicting labels.
+        X_test (np.ndarray): Held-out features.
+        y_test (np.ndarray): Held-out labels, or integer codes into `classes`.
+        classes (Sequence): Labels of the codes in `y_test`.
+
+    Returns:
+        dict: The holdout accuracy and size.
+    """
+    if len(y_test) == 0:
+        return {"holdout_rows": 0}
+    expected = np.asarray(classes)[y_test] if classes is not None else np.asarray(y_test)
+    return {"holdout_accuracy": float(np.mean(model.predict(X_test) == expected)), "holdout_rows": int(len(y_test))}
+
+def fit_model(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    model_path: str,
+    classes: Optional[Sequence] = None,
+    metadata: Optional[dict] = None,
+    holdout: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    params: Optional[dict] = None,
+) -> str:
+    """
+    Train a RandomForest model and save it to `model_path`.
+
+    Args:
+        X_train (np.ndarray): The training features.
+        y_train (np.ndarray): The training labels, or integer codes into `classes`.
+        model_path (str): Destination of the model artifact.
+        classes (Sequence): Labels of the codes in `y_train`; the saved model
+            then predicts labels instead of codes.
+        metadata (dict): Extra fields of the artifact header (e.g. "schema").
+        holdout (Tuple[np.ndarray, np.ndarray]): Held-out rows, scored into
+            the "metrics" of the header.
+        params (dict): Estimator parameters, defaults to `load_model_parameters()`.
+
+    Returns:
+        str: The path to the saved model file.
+
+    Raises:
+        HTTPException: If there is an error loading model parameters or saving the model.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    # Initialiser le modèle avec les paramètres chargés ; n_jobs est choisi selon les cœurs libres
+    params = dict(params if params is not None else load_model_parameters())
+    n_jobs = params.pop("n_jobs", None)
+    model = RandomForestClassifier(**params)
+    try:
+        with stage("fit"):
+            plan = fit_in_parallel(model, X_train, y_train, n_jobs)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=f"Invalid training parameters: {str(e)}")
+    if classes is not None:
+        # Le modèle est entraîné sur des codes entiers : il renvoie les libellés correspondants
+        model.classes_ = np.asarray(classes)[model.classes_]
 
-    model_dir = os.path.join(os.path.dirname(__file__), '../models')
-    if not os.path.exists(model_dir):
-        os.makedirs(model_dir)
+    metadata = dict(metadata or {})
+    metrics = {"train_rows": int(len(y_train)), **metadata.get("metrics", {})}
+    if holdout is not None:
+        metrics.update(evaluate_model(model, *holdout, classes))
+    metadata["metrics"] = metrics
+    metadata["resources"] = {"n_jobs": plan["n_jobs"], "backend": plan["backend"]}
 
-    model_path = os.path.join(model_dir, 'iris_model.pkl')
-    joblib.dump(model, model_path)
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    # Écriture atomique + publication dans le registre pour les prédictions suivantes
+    with stage("dump"):
+        model_registry.save(model, model_path, metadata)
 
     return model_path
 
-def predict_with_model(data: list) -> list:
+def train_model(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    params: Optional[dict] = None,
+    feature_names: Optional[List[str]] = None,
+    target_name: str = 'Species',
+) -> str:
     """
-    Make predictions using the trained model.
+    Train a RandomForest model on the Iris dataset.
+
+    The feature names and the target are written in the schema of the
+    artifact header, so batch scoring picks the right input columns.
 
     Args:
-        data (list): The input data for making predictions.
+        X_train (np.ndarray): The training features.
+        y_train (np.ndarray): The training labels.
+        params (dict): Estimator parameters, defaults to `load_model_parameters()`.
+        feature_names (List[str]): The names of the columns of X_train.
+        target_name (str): The name of the target.
 
     Returns:
-        list: The predicted labels.
+        str: The path to the saved model file.
 
     Raises:
-        HTTPException: If the model file is not found or if there is an error making predictions.
+        HTTPException: If there is an error loading model parameters or saving the model.
+    """
+    model_path = os.path.join(os.path.dirname(__file__), '../models/iris_model.pkl')
+    return fit_model(X_train, y_train, model_path, metadata=iris_metadata(feature_names, target_name), params=params)
+
+def iris_metadata(feature_names: Optional[List[str]], target_name: str = 'Species') -> dict:
+    """
+    Header fields of the Iris model artifact.
+
+    Returns:
+        dict: The "schema" section, with the target and the feature names when known.
+    """
+    schema = {"target": target_name}
+    if feature_names:
+        schema["feature_names"] = list(feature_names)
+    return {"schema": schema}
+
+def training_fingerprint() -> str:
+    """
+    Identify the inputs of a training run.
+
+    The fingerprint is built from the size and modification time of the
+    dataset and of the model parameters file, so two submissions made while
+    neither file changed get the same value.
+
+    Returns:
+        str: The hexadecimal fingerprint.
+    """
+    digest = hashlib.sha256()
+    for path in (
+        os.path.join(os.path.dirname(__file__), '../data/iris/Iris.csv'),
+        os.path.join(os.path.dirname(__file__), '../config/model_parameters.json'),
+    ):
+        try:
+            stat = os.stat(path)
+            digest.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except FileNotFoundError:
+            digest.update(f"{os.path.abspath(path)}:missing;".encode())
+    return digest.hexdigest()
+
+def run_training_pipeline(params: dict = None) -> dict:
     """
+    Run the full load -> process -> split -> fit -> dump pipeline.
+
+    The training split and the estimator parameters are looked up in the
+    training cache first: if a model was already trained on the same
+    inputs, its artifact is published again instead of refitting. Otherwise
+    the fit runs in the CPU executor and the new artifact is cached. Used as
+    the task of the "train-iris-model" jobs.
+
+    Args:
+        params (dict): Job parameters (unused).
+
+    Returns:
+        dict: The path of the saved model, its training key and whether it came from the cache.
+    """
+    df = load_iris_dataset()
+    df_processed = process_iris_dataset(df)
+    split_data = split_iris_dataset(df_processed)
+
+    model_params = load_model_parameters()
+    # Le schéma fait partie de l'artefact : il entre dans la clé du cache
+    metadata = iris_metadata(split_data["feature_names"], split_data["target_name"])
+    key = training_key(split_data["X_train"], split_data["y_train"], model_params, metadata)
     model_path = os.path.join(os.path.dirname(__file__), '../models/iris_model.pkl')
+    if training_cache.restore(key, model_path):
+        return {"model_path": model_path, "training_key": key, "cached": True}
+
+    # Au plus TRAINING_MAX_CONCURRENT entraînements à la fois ; la réutilisation du cache n'attend pas
+    with training_slots.slot():
+        model_path = call_in(
+            "cpu", train_model, split_data["X_train"], split_data["y_train"], model_params,
+            split_data["feature_names"], split_data["target_name"],
+        )
+    training_cache.store(key, model_path)
+    return {"model_path": model_path, "training_key": key, "cached": False}
+
+def inference_engine() -> str:
+    """
+    Get the inference engine selected for the Iris model in this process.
 
-    if not os.path.exists(model_path):
+    Returns:
+        str: "sklearn" or "compiled".
+    """
+    return model_registry.engine(os.path.join(os.path.dirname(__file__), '../models/iris_model.pkl'))
+
+def get_model(engine: str = None):
+    """
+    Get the current trained model from the model registry.
+
+    Args:
+        engine (str): "sklearn" or "compiled", defaults to the engine selected for the model.
+
+    Returns:
+        The object used to make predictions: the fitted model or its compiled forest.
+
+    Raises:
+        HTTPException: If the model file is not found or cannot be loaded.
+    """
+    model_path = os.path.join(os.path.dirname(__file__), '../models/iris_model.pkl')
+
+    try:
+        return model_registry.predictor(model_registry.get(model_path), engine)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Model file not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading model: {str(e)}")
+
+def predict_array(X, engine: str = None) -> np.ndarray:
+    """
+    Make predictions for a matrix of features with a single model call.
+
+    Args:
+        X (np.ndarray | pd.DataFrame): The rows to score.
+        engine (str): Inference engine, defaults to the engine selected for the model.
+
+    Returns:
+        np.ndarray: The predicted labels.
+
+    Raises:
+        HTTPException: If the model file is not found or if there is an error making predictions.
+    """
+    model = get_model(engine)
 
     try:
-        model = joblib.load(model_path)
+        with stage("predict"):
+            return model.predict(X)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error making predictions: {str(e)}")
+
+def predict_batch(X, engine: str = None) -> list:
+    """
+    Make predictions for a matrix of features, as a list of labels (see `predict_array`).
+    """
+    return predict_array(X, engine).tolist()
+
+def order_features(frame: pd.DataFrame) -> np.ndarray:
+    """
+    Put the columns of rows given as objects in the order the model was trained on.
+
+    The model is fitted on bare arrays: the feature names stored in its
+    artifact header give the column order.
+
+    Args:
+        frame (pd.DataFrame): Rows keyed by feature name.
+
+    Returns:
+        np.ndarray: The features, in training order (the frame as is if the artifact records no names).
+
+    Raises:
+        HTTPException: If the model file is not found or a feature is missing from the rows.
+    """
+    model_path = os.path.join(os.path.dirname(__file__), '../models/iris_model.pkl')
+    try:
+        feature_names = model_registry.get(model_path).metadata.get("schema", {}).get("feature_names")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Model file not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading model: {str(e)}")
+    if not feature_names:
+        return frame
+
+    missing = [name for name in feature_names if name not in frame.columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing features: {missing}")
+    return frame[feature_names].to_numpy()
+
+def predict_with_model(data: list, engine: str = None) -> list:
+    """
+    Make predictions using the trained model.
 
+    Args:
+        data (list): The input data for making predictions.
+        engine (str): Inference engine, defaults to the engine selected for the model.
+
+    Returns:
+        list: The predicted labels.
+
+    Raises:
+        HTTPException: If the model file is not found or if there is an error making predictions.
+    """
     try:
         data_df = pd.DataFrame(data)
-        predictions = model.predict(data_df)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error making predictions: {str(e)}")
 
-    return predictions.tolist()
\ No newline at end of file
+    if not isinstance(data_df.columns, pd.RangeIndex):
+        # Lignes données comme objets : l'ordre des clés ne compte pas
+        data_df = order_features(data_df)
+    return predict_batch(data_df, engine)
+
+# Le moteur est choisi dans le processus principal, puis transmis aux workers
+prediction_batcher = PredictionBatcher(predict_batch, context=lambda: {"engine": inference_engine()})
+metrics.register_histogram("predict_batch_size", "Rows per batched model call.", prediction_batcher.batch_size_histogram)
+metrics.register_histogram(
+    "predict_queue_wait_seconds", "Time spent by predictions waiting for a batch.", prediction_batcher.queue_wait_histogram
+)
+
+job_manager.register("train-iris-model", run_training_pipeline)
+
+warmup.register("sklearn", lambda: (importlib.import_module("sklearn.ensemble"), importlib.import_module("sklearn.model_selection")))
+warmup.register("iris_dataset", load_iris_dataset)
+warmup.register("iris_model", get_model)
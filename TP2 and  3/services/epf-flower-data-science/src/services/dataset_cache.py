@@ -0,0 +1,231 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.services.metrics import metrics
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "DATASET_CACHE_DIR", os.path.join(os.path.dirname(__file__), '../data/.cache')
+)
+# Dossiers d'entrée `<nom>-<sha1>` ; les autres sous-dossiers (training, tuning) ne sont jamais supprimés
+ENTRY_DIR_PATTERN = re.compile(r"^.+-[0-9a-f]{12}$")
+
+
+class DatasetCache:
+    """
+    Parse each CSV once and serve the same read-only DataFrame to every caller.
+
+    The first parse of a file is converted to a columnar on-disk format: one
+    `.npy` file per column (string columns stored as categorical codes) plus
+    a `meta.json` describing them. Later loads, including from other worker
+    processes, memory-map those arrays instead of parsing the CSV again.
+    Both layers are invalidated when the size or mtime of the CSV changes.
+    Each time a new columnar copy is written, the copies whose CSV no longer
+    exists are deleted from the cache directory.
+
+    The returned frames share memory between callers and must not be
+    modified in place.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._frames: Dict[str, Tuple[Tuple[int, int], pd.DataFrame]] = {}
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.parses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def _path_lock(self, path: str) -> threading.Lock:
+        with self._lock:
+            return self._path_locks.setdefault(path, threading.Lock())
+
+    def _lookup(self, path: str, version: Tuple[int, int]):
+        entry = self._frames.get(path)
+        if entry is None:
+            return None
+        if entry[0] != version:
+            del self._frames[path]
+            self.invalidations += 1
+            return None
+        return entry[1]
+
+    def get(self, path: str) -> pd.DataFrame:
+        """
+        Get the DataFrame for a CSV file.
+
+        Args:
+            path (str): Path of the CSV file.
+
+        Returns:
+            pd.DataFrame: The shared, read-only frame.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        version = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            df = self._lookup(path, version)
+            if df is not None:
+                self.hits += 1
+                return df
+
+        with self._path_lock(path):
+            with self._lock:
+                df = self._lookup(path, version)
+                if df is not None:
+                    self.hits += 1
+                    return df
+                self.misses += 1
+
+            columns_dir = self._columns_dir(path)
+            try:
+                df = self._read_columns(columns_dir, version)
+                self.disk_hits += 1
+            except Exception:
+                df = pd.read_csv(path)
+                self.parses += 1
+                try:
+                    self._write_columns(columns_dir, path, version, df)
+                    df = self._read_columns(columns_dir, version)
+                except Exception:
+                    # Le cache disque est optionnel : on garde le DataFrame parsé
+                    pass
+                else:
+                    self.evict_stale()
+
+            with self._lock:
+                self._frames[path] = (version, df)
+            return df
+
+    def _columns_dir(self, path: str) -> str:
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{name}-{hashlib.sha1(path.encode()).hexdigest()[:12]}")
+
+    def _write_columns(self, columns_dir: str, path: str, version: Tuple[int, int], df: pd.DataFrame) -> None:
+        os.makedirs(columns_dir, exist_ok=True)
+        token = f"{version[0]}-{version[1]}"
+        columns = []
+        for position, column in enumerate(df.columns):
+            series = df[column]
+            entry = {"name": column, "file": f"{token}-{position}.npy"}
+            if series.dtype == object or isinstance(series.dtype, pd.CategoricalDtype):
+                categorical = pd.Categorical(series)
+                entry["categories"] = categorical.categories.tolist()
+                values = categorical.codes
+            else:
+                values = series.to_numpy()
+            self._replace(os.path.join(columns_dir, entry["file"]), lambda f: np.save(f, values))
+            columns.append(entry)
+
+        meta = {"source": path, "source_size": version[0], "source_mtime_ns": version[1], "columns": columns}
+        self._replace(os.path.join(columns_dir, "meta.json"), lambda f: f.write(json.dumps(meta).encode()))
+
+        # Supprime les colonnes des versions précédentes
+        for stale in glob.glob(os.path.join(columns_dir, "*.npy")):
+            if not os.path.basename(stale).startswith(f"{token}-"):
+                os.remove(stale)
+
+    def evict_stale(self) -> int:
+        """
+        Delete the columnar copies whose source CSV no longer exists.
+
+        Copies written before the source path was recorded in `meta.json`
+        are deleted too; they are rebuilt on their next load.
+
+        Returns:
+            int: Number of cache entries deleted.
+        """
+        try:
+            with os.scandir(self.cache_dir) as scan:
+                names = [entry.name for entry in scan if entry.is_dir() and ENTRY_DIR_PATTERN.match(entry.name)]
+        except FileNotFoundError:
+            return 0
+
+        evicted = 0
+        for name in names:
+            columns_dir = os.path.join(self.cache_dir, name)
+            try:
+                with open(os.path.join(columns_dir, "meta.json")) as meta_file:
+                    source = json.load(meta_file).get("source")
+            except FileNotFoundError:
+                # Entrée en cours d'écriture par un autre processus
+                continue
+            except ValueError:
+                source = None
+            if source and os.path.exists(source) and self._columns_dir(source) == columns_dir:
+                continue
+            shutil.rmtree(columns_dir, ignore_errors=True)
+            evicted += 1
+
+        with self._lock:
+            self.evictions += evicted
+        return evicted
+
+    @staticmethod
+    def _replace(path: str, write) -> None:
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as tmp_file:
+            write(tmp_file)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_columns(columns_dir: str, version: Tuple[int, int]) -> pd.DataFrame:
+        with open(os.path.join(columns_dir, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        if (meta["source_size"], meta["source_mtime_ns"]) != version:
+            raise ValueError("Columnar cache is stale")
+
+        data = {}
+        for entry in meta["columns"]:
+            values = np.load(os.path.join(columns_dir, entry["file"]), mmap_mode="r")
+            if "categories" in entry:
+                values = pd.Categorical.from_codes(values, entry["categories"])
+            data[entry["name"]] = values
+        return pd.DataFrame(data, copy=False)
+
+    def clear(self) -> None:
+        """Drop the in-memory frames and reset the counters (the disk cache is kept)."""
+        with self._lock:
+            self._frames.clear()
+            self._reset_counters()
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: Hits, misses, disk hits, CSV parses, invalidations, evicted disk
+            entries and cached files.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "parses": self.parses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "entries": len(self._frames),
+                "cache_dir": os.path.abspath(self.cache_dir),
+            }
+
+
+dataset_cache = DatasetCache()
+metrics.register_cache("dataset", dataset_cache.stats)
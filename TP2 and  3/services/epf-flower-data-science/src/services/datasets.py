@@ -0,0 +1,424 @@
+import glob
+import hashlib
+import json
+import os
+import posixpath
+import re
+import threading
+import urllib.parse
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from src.services.config_store import ConfigStore, config_store
+from src.services.data import DatasetSplit, split_arrays
+from src.services.dataset_cache import dataset_cache
+from src.services.executors import call_in
+from src.services.incremental import FULL, MODES, read_lineage, train_incremental
+from src.services.jobs import job_manager
+from src.services.metrics import metrics, stage
+from src.services.model_registry import model_registry
+from src.services.preprocessing import PreprocessingSpec, Preprocessor, compile_preprocessor
+from src.services.resources import training_slots
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), '../data')
+DEFAULT_MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models/datasets')
+MODEL_PARAMETERS_PATH = os.path.join(os.path.dirname(__file__), '../config/model_parameters.json')
+_VALID_NAME = re.compile(r"^[A-Za-z0-9][\w.-]*$")
+
+
+@dataclass(frozen=True)
+class DatasetSchema:
+    """
+    Layout of a registered dataset, inferred once per version of its file.
+
+    Attributes:
+        name (str): Dataset name, as in config.json.
+        path (str): Absolute path of the CSV file.
+        version (Tuple[int, int]): Size and mtime of the file the schema was inferred from.
+        dtypes (Dict[str, str]): Column names and pandas dtypes, in file order.
+        target (str): Column to predict.
+        id_column (str): Row identifier column, excluded from the features.
+        feature_names (List[str]): Numeric columns used as features.
+        n_rows (int): Number of rows.
+    """
+    name: str
+    path: str
+    version: Tuple[int, int]
+    dtypes: Dict[str, str]
+    target: str
+    id_column: Optional[str]
+    feature_names: List[str]
+    n_rows: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _looks_like_id(column: str, series: pd.Series) -> bool:
+    lowered = column.lower()
+    named_like_id = lowered == "id" or lowered.endswith("_id")
+    return named_like_id and pd.api.types.is_integer_dtype(series) and series.is_unique
+
+
+def infer_schema(
+    name: str,
+    path: str,
+    version: Tuple[int, int],
+    df: pd.DataFrame,
+    target: Optional[str] = None,
+    id_column: Optional[str] = None,
+) -> DatasetSchema:
+    """
+    Infer the target, identifier and feature columns of a dataset.
+
+    Without an explicit target, the last non-numeric column is used (or the
+    last column if every column is numeric). A unique integer column named
+    "id" or "*_id" is treated as a row identifier.
+
+    Raises:
+        ValueError: If the configured target or id column is not in the file.
+    """
+    columns = list(df.columns)
+    if not columns:
+        raise ValueError("Dataset has no columns")
+    for column in (target, id_column):
+        if column is not None and column not in columns:
+            raise ValueError(f"Column not found in dataset: {column}")
+
+    if target is None:
+        non_numeric = [column for column in columns if not pd.api.types.is_numeric_dtype(df[column])]
+        target = non_numeric[-1] if non_numeric else columns[-1]
+    if id_column is None:
+        id_column = next((c for c in columns if c != target and _looks_like_id(c, df[c])), None)
+
+    feature_names = [
+        column for column in columns
+        if column not in (target, id_column) and pd.api.types.is_numeric_dtype(df[column])
+    ]
+    return DatasetSchema(
+        name=name,
+        path=path,
+        version=version,
+        dtypes={column: str(df[column].dtype) for column in columns},
+        target=target,
+        id_column=id_column,
+        feature_names=feature_names,
+        n_rows=len(df),
+    )
+
+
+class DatasetEngine:
+    """
+    Load, split, train and predict for any dataset registered in config.json.
+
+    Datasets are addressed by name. The CSV of a dataset is the `file` of its
+    config entry (relative to the data directory) or the first CSV found in
+    `<data_dir>/<name>/` or in the folder of its Kaggle slug. Frames are
+    served by the shared dataset cache (keyed by path), schemas are cached
+    per dataset until its file or config entry changes, and each dataset has
+    its own model artifact `<models_dir>/<name>.pkl` in the model registry.
+
+    The `preprocessing` field of a config entry is compiled once per schema
+    into a `Preprocessor`; its output (float32 features, integer target
+    codes) is cached with the schema and used for training, and the same
+    preprocessor builds the input of predictions.
+    """
+
+    def __init__(
+        self,
+        store: ConfigStore = config_store,
+        data_dir: str = DEFAULT_DATA_DIR,
+        models_dir: str = DEFAULT_MODELS_DIR,
+    ) -> None:
+        self.store = store
+        self.data_dir = data_dir
+        self.models_dir = models_dir
+        self._lock = threading.Lock()
+        self._schemas: Dict[str, Tuple[dict, DatasetSchema]] = {}
+        self._processed: Dict[str, Tuple[DatasetSchema, Preprocessor, np.ndarray, np.ndarray]] = {}
+        self._reset_counters()
+        # Une entrée modifiée dans config.json invalide le schéma du dataset
+        store.subscribe(self._on_config_change)
+
+    def _reset_counters(self) -> None:
+        self.schema_hits = 0
+        self.schema_inferences = 0
+        self.preprocessor_compilations = 0
+
+    def _on_config_change(self, config: dict) -> None:
+        with self._lock:
+            for name in list(self._schemas):
+                if config.get(name) != self._schemas[name][0]:
+                    del self._schemas[name]
+                    self._processed.pop(name, None)
+
+    def entry(self, name: str) -> dict:
+        """
+        Get the config entry of a dataset.
+
+        Raises:
+            HTTPException: If the name is invalid, the config cannot be read or
+                the dataset is not registered.
+        """
+        if not _VALID_NAME.match(name):
+            raise HTTPException(status_code=400, detail="Invalid dataset name")
+        try:
+            config = self.store.read()
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Config file not found")
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Error decoding JSON file")
+        if name not in config:
+            raise HTTPException(status_code=404, detail="Dataset not found in config file")
+        return config[name]
+
+    def names(self) -> List[str]:
+        return [name for name in self.store.read() if _VALID_NAME.match(name)]
+
+    def path(self, name: str, entry: Optional[dict] = None) -> str:
+        """
+        Get the CSV file of a dataset.
+
+        Raises:
+            HTTPException: If the dataset is not registered or its file is not found.
+        """
+        entry = entry if entry is not None else self.entry(name)
+        if entry.get("file"):
+            candidates = [os.path.join(self.data_dir, entry["file"])]
+        else:
+            folders = [name]
+            if entry.get("url"):
+                folders.append(posixpath.basename(urllib.parse.urlparse(entry["url"]).path.rstrip("/")))
+            candidates = [
+                path for folder in folders if folder
+                for path in sorted(glob.glob(os.path.join(self.data_dir, glob.escape(folder), "*.csv")))
+            ]
+        for path in candidates:
+            if os.path.isfile(path):
+                return os.path.abspath(path)
+        raise HTTPException(status_code=404, detail="Dataset file not found")
+
+    def load(self, name: str) -> pd.DataFrame:
+        """Get the shared, read-only frame of a dataset."""
+        path = self.path(name)
+        try:
+            with stage("load"):
+                return dataset_cache.get(path)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error loading dataset: {str(e)}")
+
+    def schema(self, name: str) -> DatasetSchema:
+        """
+        Get the schema of a dataset, inferring it on first use.
+
+        Raises:
+            HTTPException: If the dataset cannot be loaded or its configured
+                columns are not in the file.
+        """
+        entry = self.entry(name)
+        path = self.path(name, entry)
+        stat = os.stat(path)
+        version = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._schemas.get(name)
+            if cached is not None and cached[0] == entry and cached[1].path == path and cached[1].version == version:
+                self.schema_hits += 1
+                return cached[1]
+
+        df = self.load(name)
+        try:
+            schema = infer_schema(name, path, version, df, entry.get("target"), entry.get("id_column"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        with self._lock:
+            self._schemas[name] = (entry, schema)
+            self.schema_inferences += 1
+        return schema
+
+    def processed(self, name: str) -> Tuple[Preprocessor, np.ndarray, np.ndarray]:
+        """
+        Get the compiled preprocessor of a dataset and its output.
+
+        Returns:
+            Tuple[Preprocessor, np.ndarray, np.ndarray]: The preprocessor, the
+            feature matrix and the target codes, computed once per schema.
+
+        Raises:
+            HTTPException: If the dataset cannot be loaded or preprocessed.
+        """
+        schema = self.schema(name)
+        with self._lock:
+            cached = self._processed.get(name)
+            if cached is not None and cached[0] is schema:
+                return cached[1:]
+
+        df = self.load(name)
+        spec = PreprocessingSpec.from_entry(name, self.entry(name))
+        try:
+            preprocessor = compile_preprocessor(df, schema.feature_names, schema.target, spec)
+            X, y = preprocessor.transform(df)
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=500, detail=f"Error processing dataset: {str(e)}")
+        with self._lock:
+            self._processed[name] = (schema, preprocessor, X, y)
+            self.preprocessor_compilations += 1
+        return preprocessor, X, y
+
+    def preprocessor(self, name: str) -> Preprocessor:
+        return self.processed(name)[0]
+
+    def split(self, name: str) -> DatasetSplit:
+        preprocessor, X, y = self.processed(name)
+        return split_arrays(X, y, self.load(name).index.to_numpy(), preprocessor.feature_names, preprocessor.target_name)
+
+    def model_path(self, name: str) -> str:
+        if not _VALID_NAME.match(name):
+            raise HTTPException(status_code=400, detail="Invalid dataset name")
+        return os.path.join(self.models_dir, f"{name}.pkl")
+
+    def fingerprint(self, name: str, mode: str = FULL) -> str:
+        """Identify a training run of `name` by the versions of its file and of the model parameters."""
+        digest = hashlib.sha256(f"{name};{mode};".encode())
+        for path in (self.path(name), MODEL_PARAMETERS_PATH):
+            try:
+                stat = os.stat(path)
+                digest.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+            except FileNotFoundError:
+                digest.update(f"{os.path.abspath(path)}:missing;".encode())
+        return digest.hexdigest()
+
+    def train(self, name: str, mode: str = FULL) -> dict:
+        """
+        Train the model of a dataset; the fit runs in the CPU executor.
+
+        Args:
+            name (str): Dataset name.
+            mode (str): "full" refits from scratch, "incremental" adds trees
+                for the rows appended since the last training (see `train_incremental`).
+
+        Returns:
+            dict: The dataset name, model path, feature names and lineage entry of the run.
+        """
+        if mode not in MODES:
+            raise HTTPException(status_code=400, detail=f"Unknown training mode: {mode}")
+        preprocessor, X, y = self.processed(name)
+        model_path = self.model_path(name)
+        metadata = {"dataset": name, "schema": {"feature_names": preprocessor.feature_names, "target": preprocessor.target_name}}
+        with training_slots.slot():
+            entry = call_in("cpu", train_incremental, X, y, model_path, preprocessor.classes, mode, metadata=metadata)
+        return {"name": name, "model_path": model_path, "feature_names": preprocessor.feature_names, "lineage": entry}
+
+    def model_metadata(self, name: str) -> dict:
+        """
+        Return the header of the model artifact of a dataset, without loading the model.
+
+        Raises:
+            HTTPException: If the dataset has no trained model.
+        """
+        try:
+            return model_registry.metadata(self.model_path(name))
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Model file not found")
+
+    def lineage(self, name: str) -> List[dict]:
+        """Return the training history of the model of a dataset, oldest first."""
+        return read_lineage(self.model_path(name))
+
+    def features(self, name: str, data: list) -> np.ndarray:
+        """
+        Build the feature matrix of rows to predict with the model of a dataset.
+
+        Args:
+            name (str): Dataset name.
+            data (list): Rows as lists of feature values (in schema order) or
+                as objects keyed by source or processed feature name.
+
+        Returns:
+            np.ndarray: The features, with the columns, order and dtype used at training.
+
+        Raises:
+            HTTPException: If the rows do not match the schema.
+        """
+        # Même transformation qu'à l'entraînement : colonnes, ordre et dtype des features
+        try:
+            return self.preprocessor(name).features(data)
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid input rows: {str(e)}")
+
+    def predict(self, name: str, data: list, engine: Optional[str] = None) -> list:
+        """
+        Predict with the model of a dataset.
+
+        Args:
+            name (str): Dataset name.
+            data (list): Rows as lists of feature values (in schema order) or
+                as objects keyed by source or processed feature name.
+            engine (str): Inference engine, defaults to the one selected for the model.
+
+        Returns:
+            list: The predicted labels.
+
+        Raises:
+            HTTPException: If the model is missing or the rows do not match the schema.
+        """
+        return predict_model_file(self.model_path(name), self.features(name, data), engine)
+
+    def clear(self) -> None:
+        """Drop the cached schemas and reset the counters."""
+        with self._lock:
+            self._schemas.clear()
+            self._processed.clear()
+            self._reset_counters()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "schema_hits": self.schema_hits,
+                "schema_inferences": self.schema_inferences,
+                "preprocessor_compilations": self.preprocessor_compilations,
+                "schemas": sorted(self._schemas),
+            }
+
+
+def predict_model_file(model_path: str, X: np.ndarray, engine: Optional[str] = None) -> list:
+    """
+    Predict a feature matrix with the model stored at `model_path`.
+
+    A module-level function of picklable arguments, so the route can run it
+    in the process pool; the features are built beforehand (`DatasetEngine.features`).
+
+    Args:
+        model_path (str): Path of the model artifact.
+        X (np.ndarray): The features, in schema order.
+        engine (str): Inference engine, defaults to the one selected for the model.
+
+    Returns:
+        list: The predicted labels.
+
+    Raises:
+        HTTPException: If the model is missing or cannot be loaded, or the prediction fails.
+    """
+    try:
+        model = model_registry.predictor(model_registry.get(model_path), engine)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Model file not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading model: {str(e)}")
+
+    try:
+        with stage("predict"):
+            return model.predict(X).tolist()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error making predictions: {str(e)}")
+
+
+dataset_engine = DatasetEngine()
+metrics.register_cache("dataset_schema", dataset_engine.stats, hits="schema_hits", misses="schema_inferences")
+
+job_manager.register(
+    "train-dataset-model", lambda params: dataset_engine.train(params["name"], params.get("mode", FULL))
+)
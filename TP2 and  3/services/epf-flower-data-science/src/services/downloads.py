@@ -0,0 +1,258 @@
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional
+
+from src.services.logs import get_logger
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), '../data')
+DEFAULT_WORKERS = int(os.environ.get("DOWNLOAD_WORKERS", 2))
+CHUNK_SIZE = 64 * 1024
+
+download_log = get_logger("downloads")
+MANIFEST_NAME = ".download.json"
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+SKIPPED = "skipped"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+@dataclass
+class Download:
+    """
+    State of the download of one dataset.
+
+    Attributes:
+        name (str): Dataset name, as in config.json.
+        url (str): Source URL.
+        status (str): One of queued, running, succeeded, skipped, failed.
+        detail (str): Why the download was skipped, or the error once failed.
+        bytes_done (int): Bytes received so far, including a resumed prefix.
+        total_bytes (int): Expected size when the server announces it.
+        etag (str): ETag of the downloaded content.
+        sha256 (str): Hash of the downloaded content.
+    """
+    name: str
+    url: str
+    status: str = QUEUED
+    detail: Optional[str] = None
+    path: Optional[str] = None
+    bytes_done: int = 0
+    total_bytes: Optional[int] = None
+    resumed_from: int = 0
+    etag: Optional[str] = None
+    sha256: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["progress"] = self.bytes_done / self.total_bytes if self.total_bytes else None
+        return data
+
+
+def _is_kaggle(url: str) -> bool:
+    return urllib.parse.urlparse(url).netloc.endswith("kaggle.com")
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path: str, data: dict) -> None:
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class DownloadManager:
+    """
+    Download datasets in the background, at most one transfer per dataset.
+
+    Starting a download while one is queued or running for the same dataset
+    returns that download (single flight). Kaggle URLs go through
+    opendatasets and are skipped when the dataset folder is already filled.
+    Other HTTP(S) URLs are fetched directly into `<data_dir>/<name>/`:
+    the ETag and SHA-256 of the last transfer are kept in a manifest, a
+    conditional request skips unchanged content, an interrupted transfer
+    resumes from its `.part` file with a Range request, and content with the
+    same hash leaves the existing file untouched.
+    """
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, max_workers: int = DEFAULT_WORKERS) -> None:
+        self.data_dir = data_dir
+        self.max_workers = max_workers
+        self._downloads: Dict[str, Download] = {}
+        self._done_events: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def start(self, name: str, url: str, force: bool = False) -> Download:
+        """
+        Start downloading a dataset, or join the download already in progress.
+
+        Args:
+            name (str): Dataset name.
+            url (str): Source URL.
+            force (bool): Download again even if the data is already present.
+
+        Returns:
+            Download: The queued or running download.
+        """
+        with self._lock:
+            download = self._downloads.get(name)
+            if download is not None and download.status in ACTIVE_STATUSES:
+                return download
+            download = Download(name=name, url=url)
+            self._downloads[name] = download
+            self._done_events[name] = threading.Event()
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="download")
+            self._pool.submit(self._run, download, force, self._done_events[name])
+        return download
+
+    def get(self, name: str) -> Optional[Download]:
+        with self._lock:
+            return self._downloads.get(name)
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> Optional[Download]:
+        """Block until the current download of `name` is finished and return it."""
+        with self._lock:
+            event = self._done_events.get(name)
+        if event is not None:
+            event.wait(timeout)
+        return self.get(name)
+
+    def _run(self, download: Download, force: bool, done: threading.Event) -> None:
+        download.status, download.started_at = RUNNING, time.time()
+        try:
+            if _is_kaggle(download.url):
+                self._download_kaggle(download, force)
+            else:
+                self._download_http(download, force)
+        except Exception as e:
+            download.status, download.detail = FAILED, str(e)
+        download.finished_at = time.time()
+        download_log.event(
+            "download_finished", level=logging.WARNING if download.status == FAILED else logging.INFO,
+            name=download.name, status=download.status, detail=download.detail, bytes=download.bytes_done,
+        )
+        done.set()
+
+    def _download_kaggle(self, download: Download, force: bool) -> None:
+        # Le dossier créé par opendatasets porte le nom du dataset Kaggle
+        slug = posixpath.basename(urllib.parse.urlparse(download.url).path.rstrip("/"))
+        target = os.path.join(self.data_dir, slug)
+        download.path = os.path.abspath(target)
+        if not force and os.path.isdir(target) and os.listdir(target):
+            download.status, download.detail = SKIPPED, "Dataset already downloaded"
+            return
+
+        import opendatasets as od
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        od.download(download.url, self.data_dir, force=force)
+        download.status = SUCCEEDED
+
+    def _download_http(self, download: Download, force: bool) -> None:
+        target_dir = os.path.join(self.data_dir, download.name)
+        os.makedirs(target_dir, exist_ok=True)
+        filename = posixpath.basename(urllib.parse.urlparse(download.url).path) or download.name
+        path = os.path.join(target_dir, filename)
+        part_path = f"{path}.part"
+        manifest_path = os.path.join(target_dir, MANIFEST_NAME)
+        partial_path = f"{part_path}.json"
+        download.path = os.path.abspath(path)
+
+        manifest = _read_json(manifest_path)
+        if manifest.get("url") != download.url or not os.path.exists(path):
+            manifest = {}
+
+        headers = {}
+        if not force and manifest.get("etag"):
+            headers["If-None-Match"] = manifest["etag"]
+
+        # Reprend un transfert interrompu si la même ressource est toujours servie
+        partial = _read_json(partial_path)
+        offset = 0
+        if os.path.exists(part_path) and partial.get("url") == download.url:
+            offset = os.path.getsize(part_path)
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                if partial.get("etag"):
+                    headers["If-Range"] = partial["etag"]
+
+        request = urllib.request.Request(download.url, headers=headers)
+        try:
+            response = urllib.request.urlopen(request, timeout=30)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                download.status, download.detail = SKIPPED, "ETag unchanged"
+                download.etag, download.sha256 = manifest.get("etag"), manifest.get("sha256")
+                return
+            if e.code != 416:
+                raise
+            # Plage invalide : le fichier partiel ne correspond plus, on repart de zéro
+            os.remove(part_path)
+            headers.pop("Range", None)
+            headers.pop("If-Range", None)
+            response = urllib.request.urlopen(urllib.request.Request(download.url, headers=headers), timeout=30)
+
+        with response:
+            if response.status != 206:
+                offset = 0
+            download.etag = response.headers.get("ETag")
+            length = response.headers.get("Content-Length")
+            download.total_bytes = offset + int(length) if length is not None else None
+            download.resumed_from = download.bytes_done = offset
+            _write_json(partial_path, {"url": download.url, "etag": download.etag})
+
+            with open(part_path, "ab" if offset else "wb") as part_file:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    part_file.write(chunk)
+                    download.bytes_done += len(chunk)
+
+        download.sha256 = _sha256(part_path)
+        if not force and download.sha256 == manifest.get("sha256"):
+            # Même contenu : le fichier existant (et les caches qui en dépendent) reste valide
+            os.remove(part_path)
+            download.status, download.detail = SKIPPED, "Content hash unchanged"
+        else:
+            os.replace(part_path, path)
+            download.status = SUCCEEDED
+        os.remove(partial_path)
+        _write_json(manifest_path, {"url": download.url, "etag": download.etag, "sha256": download.sha256, "file": filename})
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+download_manager = DownloadManager()
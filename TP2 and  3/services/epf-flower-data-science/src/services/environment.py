@@ -0,0 +1,61 @@
+import os
+from typing import Dict, Optional
+
+DEFAULT_CONFIG_DIR = os.path.join(os.path.dirname(__file__), '../../../../config')
+ENVIRONMENTS = ("local", "dev", "uat", "prd")
+
+
+def parse_env_file(path: str) -> Dict[str, str]:
+    """
+    Read a `KEY=VALUE` file (blank lines and `#` comments ignored, values may be quoted).
+
+    Raises:
+        ValueError: If a line is not an assignment.
+    """
+    values = {}
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, sep, value = line.partition("=")
+            key = key.strip()
+            if not sep or not key:
+                raise ValueError(f"{path}:{number}: expected KEY=VALUE, got {line!r}")
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+                value = value[1:-1]
+            values[key] = value
+    return values
+
+
+def load_environment(name: Optional[str] = None, config_dir: Optional[str] = None) -> Dict[str, str]:
+    """
+    Apply the settings of a deployment environment to `os.environ`.
+
+    Must run before the `src` modules are imported, as they read their
+    settings at import time. Variables already set in the process
+    environment win over the file.
+
+    Args:
+        name (str): "local", "dev", "uat" or "prd", defaults to `APP_ENV` or "local".
+        config_dir (str): Folder of the environment files, defaults to
+            `CONFIG_DIR` or the `config` folder of the project.
+
+    Returns:
+        Dict[str, str]: The settings read from the file.
+
+    Raises:
+        ValueError: If the environment is unknown or its file is malformed.
+    """
+    name = name or os.environ.get("APP_ENV", "local")
+    if name not in ENVIRONMENTS:
+        raise ValueError(f"Unknown environment: {name}")
+    config_dir = config_dir or os.environ.get("CONFIG_DIR", DEFAULT_CONFIG_DIR)
+    path = os.path.join(config_dir, name)
+
+    values = parse_env_file(path) if os.path.exists(path) else {}
+    for key, value in values.items():
+        os.environ.setdefault(key, value)
+    os.environ["APP_ENV"] = name
+    return values
@@ -0,0 +1,155 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from src.services.metrics import capture_stages, record_stages
+
+IO_WORKERS = int(os.environ.get("IO_EXECUTOR_WORKERS", 16))
+CPU_WORKERS = int(os.environ.get("CPU_EXECUTOR_WORKERS", os.cpu_count() or 1))
+CPU_BACKEND = os.environ.get("CPU_EXECUTOR_BACKEND", "process")
+CPU_START_METHOD = os.environ.get("CPU_EXECUTOR_START_METHOD", "spawn")
+
+_executors: Dict[str, Executor] = {}
+_lock = threading.Lock()
+
+
+class _RemoteHTTPError(Exception):
+    """Picklable stand-in for an HTTPException raised inside a worker process."""
+
+    def __init__(self, status_code: int, detail: Any) -> None:
+        super().__init__(status_code, detail)
+
+
+class _WorkerResult:
+    """Value returned by a call made in another process, with the pipeline stages it timed."""
+
+    def __init__(self, value: Any, stages: list) -> None:
+        self.value = value
+        self.stages = stages
+
+
+def _invoke(func: Callable, args: tuple, kwargs: dict, caller_pid: Optional[int] = None) -> Any:
+    try:
+        if caller_pid is None or caller_pid == os.getpid():
+            return func(*args, **kwargs)
+        # Les métriques d'un worker ne sont pas visibles du processus principal : on les renvoie
+        with capture_stages() as stages:
+            value = func(*args, **kwargs)
+        return _WorkerResult(value, stages)
+    except HTTPException as e:
+        # HTTPException ne se sérialise pas entre processus
+        raise _RemoteHTTPError(e.status_code, e.detail)
+
+
+def _unwrap(result: Any) -> Any:
+    if isinstance(result, _WorkerResult):
+        record_stages(result.stages)
+        return result.value
+    return result
+
+
+def _create_executor(kind: str) -> Executor:
+    if kind == "io":
+        return ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+    if kind == "cpu":
+        if CPU_BACKEND == "thread":
+            return ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu")
+        return ProcessPoolExecutor(
+            max_workers=CPU_WORKERS,
+            mp_context=multiprocessing.get_context(CPU_START_METHOD),
+        )
+    raise ValueError(f"Unknown executor kind: {kind}")
+
+
+def get_executor(kind: str) -> Executor:
+    """
+    Get the executor used for a kind of work, creating it on first use.
+
+    Args:
+        kind (str): "io" for blocking I/O (thread pool) or "cpu" for
+            CPU-bound work (process pool by default).
+
+    Returns:
+        Executor: The executor for this kind of work.
+    """
+    with _lock:
+        if kind not in _executors:
+            _executors[kind] = _create_executor(kind)
+        return _executors[kind]
+
+
+def set_executor(kind: str, executor: Executor) -> None:
+    """
+    Replace the executor used for a kind of work.
+
+    The previous executor is shut down without waiting for pending work.
+
+    Args:
+        kind (str): "io" or "cpu".
+        executor (Executor): The executor to use from now on.
+    """
+    with _lock:
+        previous = _executors.pop(kind, None)
+        _executors[kind] = executor
+    if previous is not None and previous is not executor:
+        previous.shutdown(wait=False)
+
+
+def shutdown_executors() -> None:
+    """Shut down every executor created so far."""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+
+def call_in(kind: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run `func` in the executor for `kind` and block until it returns.
+
+    Meant for code that already runs outside the event loop, such as job
+    worker threads.
+
+    Raises:
+        HTTPException: If `func` raised one, even from another process.
+    """
+    future = get_executor(kind).submit(_invoke, func, args, kwargs, os.getpid())
+    try:
+        return _unwrap(future.result())
+    except _RemoteHTTPError as e:
+        raise HTTPException(status_code=e.args[0], detail=e.args[1])
+
+
+async def run_in(kind: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run `func` in the executor for `kind` without blocking the event loop.
+
+    Functions sent to a process pool must be importable module-level
+    functions and their arguments picklable.
+
+    Raises:
+        HTTPException: If `func` raised one, even from another process.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(_invoke, func, args, kwargs, os.getpid())
+    try:
+        return _unwrap(await loop.run_in_executor(get_executor(kind), call))
+    except _RemoteHTTPError as e:
+        raise HTTPException(status_code=e.args[0], detail=e.args[1])
+
+
+async def run_io(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run blocking I/O (file reads, joblib.dump, downloads) in the thread pool."""
+    return await run_in("io", func, *args, **kwargs)
+
+
+async def run_cpu(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run CPU-bound work (fit, predict) in the CPU executor."""
+    return await run_in("cpu", func, *args, **kwargs)
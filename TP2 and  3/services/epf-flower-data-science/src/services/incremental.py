@@ -0,0 +1,220 @@
+import copy
+import json
+import math
+import os
+import threading
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.services.data import evaluate_model, fit_model, load_model_parameters
+from src.services.metrics import stage
+from src.services.model_registry import model_registry
+from src.services.resources import fit_in_parallel
+
+DEFAULT_DRIFT_THRESHOLD = float(os.environ.get("INCREMENTAL_DRIFT_THRESHOLD", 0.1))
+# Au-delà de ce multiple du nombre d'arbres configuré, on réentraîne tout
+DEFAULT_MAX_TREES_FACTOR = float(os.environ.get("INCREMENTAL_MAX_TREES_FACTOR", 4))
+TEST_FRACTION = 5
+
+FULL = "full"
+INCREMENTAL = "incremental"
+UNCHANGED = "unchanged"
+MODES = (FULL, INCREMENTAL)
+
+
+def row_fingerprints(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Hash each row of features and target into a 64-bit fingerprint.
+
+    Args:
+        X (np.ndarray): The feature matrix.
+        y (np.ndarray): The target codes.
+
+    Returns:
+        np.ndarray: One uint64 per row; equal rows have equal fingerprints.
+    """
+    # Chaque ligne (octets des features + code de la cible) est hachée comme une seule valeur
+    features = np.ascontiguousarray(X).view(np.uint8).reshape(len(X), -1)
+    target = np.ascontiguousarray(y, dtype=np.int64).view(np.uint8).reshape(len(y), -1)
+    rows = np.ascontiguousarray(np.concatenate([features, target], axis=1))
+    return pd.util.hash_array(rows.view(np.dtype((np.void, rows.shape[1]))).ravel())
+
+
+def holdout_mask(fingerprints: np.ndarray) -> np.ndarray:
+    """
+    Select the test rows (one in `TEST_FRACTION`) from their fingerprints.
+
+    Unlike a shuffled split, a row keeps its side of the split when rows are
+    appended to the dataset, so "new" rows are really new to the model.
+    """
+    return fingerprints % TEST_FRACTION == 0
+
+
+def lineage_path(model_path: str) -> str:
+    return f"{model_path}.lineage.json"
+
+
+def rows_path(model_path: str) -> str:
+    return f"{model_path}.rows.npy"
+
+
+def read_lineage(model_path: str) -> List[dict]:
+    """Return the training history of a model artifact, oldest first."""
+    try:
+        with open(lineage_path(model_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def _replace(path: str, write) -> None:
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as tmp_file:
+        write(tmp_file)
+    os.replace(tmp_path, path)
+
+
+def _record(model_path: str, fingerprints: np.ndarray, entry: dict) -> dict:
+    lineage = read_lineage(model_path)
+    entry = {"version": len(lineage) + 1, "parent": lineage[-1]["digest"] if lineage else None, **entry}
+    _replace(rows_path(model_path), lambda f: np.save(f, np.unique(fingerprints)))
+    _replace(lineage_path(model_path), lambda f: f.write(json.dumps(lineage + [entry], indent=2).encode()))
+    return entry
+
+
+def _replay_sample(y: np.ndarray, size: int, codes: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    # Échantillon d'anciennes lignes contenant au moins une ligne de chaque classe du modèle
+    positions = [rng.choice(np.flatnonzero(y == code)) for code in codes if (y == code).any()]
+    if size > len(positions):
+        positions.extend(rng.choice(len(y), min(size, len(y)) - len(positions), replace=False))
+    return np.unique(np.asarray(positions, dtype=np.int64))
+
+
+def _model_codes(model, classes: Optional[Sequence]) -> np.ndarray:
+    # Les modèles entraînés sur des codes exposent des libellés : on retrouve leurs codes
+    if classes is None:
+        return model.classes_
+    positions = {label: code for code, label in enumerate(classes)}
+    return np.asarray([positions.get(label, -1) for label in model.classes_.tolist()])
+
+
+def train_incremental(
+    X: np.ndarray,
+    y: np.ndarray,
+    model_path: str,
+    classes: Optional[Sequence] = None,
+    mode: str = INCREMENTAL,
+    drift_threshold: float = DEFAULT_DRIFT_THRESHOLD,
+    max_trees_factor: float = DEFAULT_MAX_TREES_FACTOR,
+    metadata: Optional[dict] = None,
+) -> dict:
+    """
+    Update the model of a dataset with the rows added since its last training.
+
+    The rows the current artifact was trained on are identified by their
+    fingerprints (saved next to it). If there is no artifact, if `mode` is
+    "full", if the current model's error rate on the new rows is above
+    `drift_threshold`, if the new rows bring an unknown class, or if the
+    forest would grow beyond `max_trees_factor` times the configured
+    `n_estimators`, the model is refit from scratch. Otherwise trees are
+    added with `warm_start`, in proportion to the share of new rows, and are
+    trained on the new rows plus a replay sample of old rows. Every run is
+    appended to the lineage file of the artifact.
+
+    Args:
+        X (np.ndarray): Features of the whole dataset.
+        y (np.ndarray): Target codes of the whole dataset.
+        model_path (str): The model artifact.
+        classes (Sequence): Labels of the target codes.
+        mode (str): "incremental" or "full".
+        drift_threshold (float): Error rate on new rows that triggers a refit.
+        max_trees_factor (float): Bound on the forest size, relative to `n_estimators`.
+        metadata (dict): Extra fields of the artifact header; the holdout
+            metrics and lineage version are added to it.
+
+    Returns:
+        dict: The lineage entry of this run.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown training mode: {mode}")
+    start = time.perf_counter()
+    fingerprints = row_fingerprints(X, y)
+    train = ~holdout_mask(fingerprints)
+    X_train, y_train, train_fingerprints = X[train], y[train], fingerprints[train]
+    holdout = (X[~train], y[~train])
+    metadata = {**(metadata or {}), "version": len(read_lineage(model_path)) + 1}
+    params = load_model_parameters()
+
+    previous, known = None, None
+    if mode == INCREMENTAL and os.path.exists(model_path) and os.path.exists(rows_path(model_path)):
+        previous = model_registry.get(model_path).model
+        known = np.load(rows_path(model_path))
+
+    reason = "requested" if mode == FULL else "no previous model"
+    new = np.ones(len(y_train), dtype=bool)
+    drift = None
+    if previous is not None:
+        new = ~np.isin(train_fingerprints, known)
+        if not new.any():
+            return _record(model_path, train_fingerprints, {
+                "mode": UNCHANGED, "rows": int(len(y_train)), "new_rows": 0, "trees_added": 0,
+                "n_estimators": int(previous.n_estimators), "drift": 0.0,
+                "digest": model_registry.get(model_path).version.digest,
+                "trained_at": time.time(), "duration": time.perf_counter() - start,
+            })
+
+        codes = _model_codes(previous, classes)
+        predicted = previous.predict(X_train[new])
+        expected = np.asarray(classes)[y_train[new]] if classes is not None else y_train[new]
+        drift = float(np.mean(predicted != expected))
+        trees_added = max(1, math.ceil(params["n_estimators"] * new.sum() / len(y_train)))
+        if drift > drift_threshold:
+            reason = f"drift {drift:.3f} above {drift_threshold}"
+        elif (codes == -1).any() or not np.isin(y_train[new], codes).all():
+            reason = "new class"
+        elif previous.n_estimators + trees_added > max_trees_factor * params["n_estimators"]:
+            reason = "forest size limit"
+        else:
+            reason = None
+
+    if previous is None or reason is not None:
+        fit_model(X_train, y_train, model_path, classes, {**metadata, "mode": FULL}, holdout)
+        loaded = model_registry.get(model_path)
+        return _record(model_path, train_fingerprints, {
+            "mode": FULL, "reason": reason, "rows": int(len(y_train)), "new_rows": int(new.sum()),
+            "trees_added": int(loaded.model.n_estimators), "n_estimators": int(loaded.model.n_estimators),
+            "drift": drift, "digest": loaded.version.digest, "metrics": loaded.metadata["metrics"],
+            "trained_at": time.time(), "duration": time.perf_counter() - start,
+        })
+
+    # Nouveaux arbres entraînés sur les nouvelles lignes + un échantillon des anciennes
+    rng = np.random.default_rng(len(known))
+    old_positions = np.flatnonzero(~new)
+    replay = old_positions[_replay_sample(y_train[old_positions], int(new.sum()), codes, rng)]
+    fit_positions = np.concatenate([np.flatnonzero(new), replay])
+
+    # Copie : le modèle en mémoire continue de servir les prédictions pendant l'entraînement
+    model = copy.deepcopy(previous)
+    labels = model.classes_
+    model.classes_ = codes
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + trees_added)
+    with stage("fit"):
+        fit_in_parallel(model, X_train[fit_positions], y_train[fit_positions], params.get("n_jobs"))
+    if not np.array_equal(model.classes_, codes):
+        # Une classe du modèle manque aux lignes d'entraînement : les arbres ne sont pas combinables
+        return train_incremental(X, y, model_path, classes, FULL, drift_threshold, max_trees_factor, metadata)
+    model.classes_ = labels
+    model.set_params(warm_start=False)
+
+    metrics = {"train_rows": int(len(y_train)), **evaluate_model(model, *holdout, classes)}
+    with stage("dump"):
+        loaded = model_registry.save(model, model_path, {**metadata, "mode": INCREMENTAL, "metrics": metrics})
+    return _record(model_path, train_fingerprints, {
+        "mode": INCREMENTAL, "reason": None, "rows": int(len(y_train)), "new_rows": int(new.sum()),
+        "trees_added": int(trees_added), "n_estimators": int(model.n_estimators),
+        "drift": drift, "digest": loaded.version.digest, "metrics": metrics,
+        "trained_at": time.time(), "duration": time.perf_counter() - start,
+    })
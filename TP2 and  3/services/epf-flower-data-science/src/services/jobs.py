@@ -0,0 +1,335 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.services.logs import get_logger
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "JOB_STORE_PATH", os.path.join(os.path.dirname(__file__), '../data/jobs.sqlite')
+)
+DEFAULT_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+# Secondes entre deux recherches de jobs orphelins (processus propriétaire disparu) ; 0 : au démarrage seulement
+ORPHAN_CHECK_INTERVAL = float(os.environ.get("JOB_ORPHAN_CHECK_INTERVAL", 30))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+job_log = get_logger("jobs")
+
+
+def process_id() -> str:
+    """Identity of this process as a job owner: host name and pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def owner_alive(owner: Optional[str]) -> bool:
+    """
+    Tell whether the process that owns a job may still run it.
+
+    Jobs without an owner (written before owners were recorded) count as
+    orphans; owners on another host are assumed alive.
+    """
+    if not owner:
+        return False
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+@dataclass
+class Job:
+    """
+    A unit of background work and its current state.
+
+    Attributes:
+        id (str): Unique job id.
+        kind (str): Name of the registered task that runs the job.
+        fingerprint (str): Identity of the work; active jobs with the same
+            fingerprint are merged.
+        params (dict): JSON-serializable arguments of the task.
+        status (str): One of queued, running, succeeded, failed.
+        result (dict): Value returned by the task once succeeded.
+        error (str): Error message once failed.
+        owner (str): `process_id` of the process running or queuing the job.
+    """
+    id: str
+    kind: str
+    fingerprint: str
+    params: dict = field(default_factory=dict)
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    owner: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class JobStore:
+    """SQLite-backed persistence of job states."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT, fingerprint TEXT, "
+                "status TEXT, payload TEXT)"
+            )
+            self._initialized = True
+        return connection
+
+    def save(self, job: Job) -> None:
+        with self._lock, closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO jobs (id, kind, fingerprint, status, payload) VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.kind, job.fingerprint, job.status, json.dumps(job.to_dict())),
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock, closing(self._connect()) as connection:
+            row = connection.execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(**json.loads(row[0])) if row else None
+
+    def unfinished(self) -> List[Job]:
+        with self._lock, closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT payload FROM jobs WHERE status IN (?, ?)", ACTIVE_STATUSES
+            ).fetchall()
+        return [Job(**json.loads(row[0])) for row in rows]
+
+    def claim(self, job: Job, owner: str) -> bool:
+        """
+        Take over an unfinished job, atomically: only one process wins.
+
+        Returns:
+            bool: True if the job still had the owner `job.owner` and now belongs to `owner`.
+        """
+        with self._lock, closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET payload = json_set(payload, '$.owner', ?) "
+                "WHERE id = ? AND status IN (?, ?) AND json_extract(payload, '$.owner') IS ?",
+                (owner, job.id, *ACTIVE_STATUSES, job.owner),
+            )
+            return cursor.rowcount == 1
+
+
+class JobManager:
+    """
+    Run registered tasks in a bounded pool of worker threads.
+
+    Submitting work whose fingerprint matches a queued or running job
+    returns that job instead of starting a duplicate run. Every state change
+    is written to the store with the process that owns the job, and `resume`
+    re-queues the unfinished jobs whose owner is gone: a previous run of the
+    server, or a worker killed at the end of a graceful reload. Several
+    workers may resume at once, a job is claimed by only one of them.
+    """
+
+    def __init__(self, store_path: str = DEFAULT_STORE_PATH, max_workers: int = DEFAULT_WORKERS) -> None:
+        self.store = JobStore(store_path)
+        self.max_workers = max_workers
+        self._tasks: Dict[str, Callable[[dict], dict]] = {}
+        self._active: Dict[str, Job] = {}
+        self._done_events: Dict[str, threading.Event] = {}
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.resume_on_startup = True
+
+    def register(self, kind: str, task: Callable[[dict], dict]) -> None:
+        """
+        Register the function that runs jobs of a given kind.
+
+        Args:
+            kind (str): Name of the job kind.
+            task (Callable[[dict], dict]): Receives the job params, returns its result.
+        """
+        self._tasks[kind] = task
+
+    def submit(self, kind: str, fingerprint: str, params: Optional[dict] = None) -> Job:
+        """
+        Queue a job, or return the active job with the same fingerprint.
+
+        Args:
+            kind (str): Registered job kind.
+            fingerprint (str): Identity of the work to deduplicate on.
+            params (dict): Arguments passed to the task.
+
+        Returns:
+            Job: The queued or merged job.
+        """
+        if kind not in self._tasks:
+            raise ValueError(f"Unknown job kind: {kind}")
+        with self._lock:
+            job = self._active.get(fingerprint)
+            if job is not None:
+                return job
+            job = Job(id=uuid.uuid4().hex, kind=kind, fingerprint=fingerprint, params=params or {}, owner=process_id())
+            self._enqueue(job)
+        return job
+
+    def _enqueue(self, job: Job) -> None:
+        self._active[job.fingerprint] = job
+        self._done_events[job.id] = threading.Event()
+        self.store.save(job)
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._pool.submit(self._run, job)
+
+    def _run(self, job: Job) -> None:
+        job.status, job.started_at = RUNNING, time.time()
+        self.store.save(job)
+        try:
+            job.result = self._tasks[job.kind](job.params)
+            job.status = SUCCEEDED
+        except Exception as e:
+            job.error = str(getattr(e, "detail", None) or e)
+            job.status = FAILED
+        job.finished_at = time.time()
+        job_log.event(
+            "job_finished", level=logging.INFO if job.status == SUCCEEDED else logging.ERROR,
+            job_id=job.id, kind=job.kind, status=job.status, error=job.error,
+            duration_ms=round((job.finished_at - job.started_at) * 1000, 3),
+        )
+        self.store.save(job)
+        with self._lock:
+            if self._active.get(job.fingerprint) is job:
+                del self._active[job.fingerprint]
+            event = self._done_events.pop(job.id, None)
+            waiters = self._waiters.pop(job.id, [])
+        if event is not None:
+            event.set()
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future, job)
+            except RuntimeError:
+                # Boucle d'événements déjà fermée : plus personne n'attend
+                pass
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return the job with this id, from memory if active, else from the store."""
+        with self._lock:
+            for job in self._active.values():
+                if job.id == job_id:
+                    return job
+        return self.store.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Block until the job is finished (or `timeout` expires) and return it."""
+        with self._lock:
+            event = self._done_events.get(job_id)
+        if event is not None:
+            event.wait(timeout)
+        return self.get(job_id)
+
+    async def wait_async(self, job_id: str) -> Optional[Job]:
+        """
+        Wait for the job from a coroutine and return it.
+
+        The job thread completes a future of the event loop when the job
+        finishes, so no thread is held while waiting (unlike `wait`).
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if job_id in self._done_events:
+                future = loop.create_future()
+                self._waiters.setdefault(job_id, []).append((loop, future))
+            else:
+                future = None
+        if future is None:
+            # Déjà terminé (ou inconnu) : lu dans le store, hors de la boucle
+            return await loop.run_in_executor(None, self.get, job_id)
+        return await future
+
+    def resume(self) -> int:
+        """
+        Re-queue the unfinished jobs whose owner process is gone.
+
+        Returns:
+            int: The number of jobs taken over by this process.
+        """
+        if not self.resume_on_startup:
+            return 0
+        owner, resumed = process_id(), 0
+        with self._lock:
+            for job in self.store.unfinished():
+                if job.kind not in self._tasks or job.fingerprint in self._active or owner_alive(job.owner):
+                    continue
+                if not self.store.claim(job, owner):
+                    # Repris par un autre worker entre-temps
+                    continue
+                job_log.event("job_resumed", job_id=job.id, kind=job.kind, previous_owner=job.owner)
+                job.status, job.started_at, job.owner = QUEUED, None, owner
+                self._enqueue(job)
+                resumed += 1
+        return resumed
+
+    def start(self, interval: float = ORPHAN_CHECK_INTERVAL) -> None:
+        """
+        Resume orphaned jobs now, then every `interval` seconds from a daemon thread.
+
+        The periodic check picks up the jobs of workers that stopped after
+        this one started, e.g. the old workers of a reload, killed after
+        their graceful timeout.
+        """
+        self.resume()
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.resume()
+                except Exception:
+                    job_log.event("job_resume_failed", level=logging.ERROR, exc_info=True)
+
+        self._watcher = threading.Thread(target=run, name="job-orphans", daemon=True)
+        self._watcher.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        self._stop.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+def _resolve(future: asyncio.Future, job: Job) -> None:
+    if not future.done():
+        future.set_result(job)
+
+
+job_manager = JobManager()
@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import random
+import sys
+from typing import Any, Optional
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+# Part des événements fréquents (requêtes, étapes) réellement écrits
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", 0.01))
+ROOT_LOGGER = "flower"
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as one JSON object per line: time, level, logger, event and fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class StructuredLogger:
+    """
+    Logger writing events with key/value fields instead of formatted text.
+
+    `sampled` is meant for hot paths: it only writes a random `sample_rate`
+    share of the events, and checks the level before building anything.
+    """
+
+    def __init__(self, name: str, sample_rate: float = LOG_SAMPLE_RATE) -> None:
+        self.logger = logging.getLogger(f"{ROOT_LOGGER}.{name}")
+        self.sample_rate = sample_rate
+
+    def event(self, event: str, level: int = logging.INFO, exc_info: bool = False, **fields: Any) -> None:
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+    def should_sample(self) -> bool:
+        """Draw whether the next hot-path event is written; lets callers skip building its fields."""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def sampled(self, event: str, level: int = logging.INFO, **fields: Any) -> None:
+        if self.should_sample():
+            self.event(event, level, sample_rate=self.sample_rate, **fields)
+
+    def warning(self, event: str, **fields: Any) -> None:
+        self.event(event, logging.WARNING, **fields)
+
+    def error(self, event: str, exc_info: bool = False, **fields: Any) -> None:
+        self.event(event, logging.ERROR, exc_info, **fields)
+
+
+def get_logger(name: str, sample_rate: Optional[float] = None) -> StructuredLogger:
+    """
+    Get a structured logger under the application logger.
+
+    Args:
+        name (str): Name of the component, e.g. "http" or "jobs".
+        sample_rate (float): Share of `sampled` events written, defaults to `LOG_SAMPLE_RATE`.
+    """
+    return StructuredLogger(name, LOG_SAMPLE_RATE if sample_rate is None else sample_rate)
+
+
+def configure_logging(level: str = LOG_LEVEL) -> None:
+    """Write the application logs as JSON lines on stderr (once per process)."""
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(level)
+    if not any(isinstance(handler.formatter, JsonFormatter) for handler in logger.handlers):
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter())
+        logger.addHandler(handler)
+    logger.propagate = False
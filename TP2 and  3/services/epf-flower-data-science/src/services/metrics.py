@@ -0,0 +1,260 @@
+import contextlib
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.services.logs import get_logger
+from src.services.utils import Histogram
+
+NAMESPACE = os.environ.get("METRICS_NAMESPACE", "flower")
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+stage_log = get_logger("stages")
+_capture = threading.local()
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Gauge(Counter):
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+
+class MetricFamily:
+    """
+    A named metric and its children, one per combination of label values.
+
+    Children are created on first use; looking up an existing child takes
+    no lock, so hot paths can call `labels` on every request.
+    """
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Tuple[str, ...], factory: Callable[[], Any]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = labelnames
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Any:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def children(self) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock:
+            return [(dict(zip(self.labelnames, values)), child) for values, child in self._children.items()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _render_histogram(lines: List[str], name: str, labels: Dict[str, Any], snapshot: dict) -> None:
+    for bound, count in snapshot["buckets"].items():
+        lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(snapshot['sum'])}")
+    lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics, rendered in the Prometheus text format.
+
+    Besides the counters, gauges and histograms updated by the code, the
+    registry reads at scrape time the counters the caches already keep
+    (`register_cache`) and histograms owned by other components
+    (`register_histogram`), so those cost nothing on the hot path.
+    """
+
+    def __init__(self, namespace: str = NAMESPACE) -> None:
+        self.namespace = namespace
+        self._families: Dict[str, MetricFamily] = {}
+        self._caches: Dict[str, Tuple[Callable[[], dict], str, str]] = {}
+        self._histograms: Dict[str, Tuple[str, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def _family(self, name: str, documentation: str, kind: str, labelnames: Iterable[str], factory: Callable[[], Any]) -> MetricFamily:
+        name = f"{self.namespace}_{name}"
+        with self._lock:
+            if name not in self._families:
+                self._families[name] = MetricFamily(name, documentation, kind, tuple(labelnames), factory)
+            return self._families[name]
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> MetricFamily:
+        return self._family(name, documentation, "counter", labelnames, Counter)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> MetricFamily:
+        return self._family(name, documentation, "gauge", labelnames, Gauge)
+
+    def histogram(self, name: str, documentation: str, buckets: Iterable[float], labelnames: Iterable[str] = ()) -> MetricFamily:
+        buckets = tuple(buckets)
+        return self._family(name, documentation, "histogram", labelnames, lambda: Histogram(buckets))
+
+    def register_cache(self, cache: str, stats: Callable[[], dict], hits: str = "hits", misses: str = "misses") -> None:
+        """
+        Export the hit and miss counters of a cache.
+
+        Args:
+            cache (str): Value of the "cache" label.
+            stats (Callable[[], dict]): The `stats` method of the cache.
+            hits (str): Key of the hit counter in the stats.
+            misses (str): Key of the miss counter in the stats.
+        """
+        with self._lock:
+            self._caches[cache] = (stats, hits, misses)
+
+    def register_histogram(self, name: str, documentation: str, histogram: Histogram) -> None:
+        """Export a histogram owned by another component."""
+        with self._lock:
+            self._histograms[f"{self.namespace}_{name}"] = (documentation, histogram)
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition, one sample per line.
+        """
+        with self._lock:
+            families = list(self._families.values())
+            caches = dict(self._caches)
+            histograms = dict(self._histograms)
+
+        lines: List[str] = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, child in family.children():
+                if family.kind == "histogram":
+                    _render_histogram(lines, family.name, labels, child.snapshot())
+                else:
+                    lines.append(f"{family.name}{_format_labels(labels)} {_format_value(child.value)}")
+
+        for name, (documentation, histogram) in histograms.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} histogram")
+            _render_histogram(lines, name, {}, histogram.snapshot())
+
+        counts = {"hits": [], "misses": []}
+        for cache, (stats, hits, misses) in caches.items():
+            values = stats()
+            counts["hits"].append((cache, values.get(hits, 0)))
+            counts["misses"].append((cache, values.get(misses, 0)))
+        for kind, samples in counts.items():
+            name = f"{self.namespace}_cache_{kind}_total"
+            lines.append(f"# HELP {name} Cache {kind}, read from the stats of each cache.")
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(f"{name}{_format_labels({'cache': cache})} {_format_value(value)}" for cache, value in samples)
+
+        name = f"{self.namespace}_cache_hit_ratio"
+        lines.append(f"# HELP {name} Share of cache lookups that were hits.")
+        lines.append(f"# TYPE {name} gauge")
+        for (cache, hits), (_, misses) in zip(counts["hits"], counts["misses"]):
+            lines.append(f"{name}{_format_labels({'cache': cache})} {_format_value(hits / (hits + misses) if hits + misses else 0)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop the values of the metrics updated by the code (registrations are kept)."""
+        with self._lock:
+            families = list(self._families.values())
+        for family in families:
+            family.clear()
+
+
+metrics = MetricsRegistry()
+
+HTTP_REQUESTS = metrics.counter("http_requests_total", "HTTP requests by route, method and status.", ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", LATENCY_BUCKETS, ("method", "route")
+)
+HTTP_IN_FLIGHT = metrics.gauge("http_requests_in_flight", "HTTP requests being served.", ("method",))
+STAGE_SECONDS = metrics.histogram("stage_duration_seconds", "Duration of the pipeline stages.", STAGE_BUCKETS, ("stage",))
+STAGE_ERRORS = metrics.counter("stage_errors_total", "Pipeline stages that raised.", ("stage",))
+
+
+def observe_stage(name: str, duration: float, failed: bool = False) -> None:
+    """Record one run of a pipeline stage."""
+    STAGE_SECONDS.labels(name).observe(duration)
+    if failed:
+        STAGE_ERRORS.labels(name).inc()
+    captured = getattr(_capture, "observations", None)
+    if captured is not None:
+        captured.append((name, duration, failed))
+    if stage_log.should_sample():
+        stage_log.event("stage", sample_rate=stage_log.sample_rate, stage=name,
+                        duration_ms=round(duration * 1000, 3), failed=failed)
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a stage of the pipeline (load, process, split, fit, dump, model_load, predict).
+
+    Usage:
+        with stage("fit"):
+            model.fit(X, y)
+    """
+    start = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        observe_stage(name, time.perf_counter() - start, failed)
+
+
+@contextlib.contextmanager
+def capture_stages() -> Iterator[List[Tuple[str, float, bool]]]:
+    """
+    Collect the stages observed by this thread, e.g. in a worker process, to replay them with `record_stages`.
+    """
+    previous = getattr(_capture, "observations", None)
+    _capture.observations = observations = []
+    try:
+        yield observations
+    finally:
+        _capture.observations = previous
+
+
+def record_stages(observations: Optional[List[Tuple[str, float, bool]]]) -> None:
+    """Add stages observed in another process to this process' histograms."""
+    for name, duration, failed in observations or ():
+        STAGE_SECONDS.labels(name).observe(duration)
+        if failed:
+            STAGE_ERRORS.labels(name).inc()
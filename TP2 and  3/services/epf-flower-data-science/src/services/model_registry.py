@@ -0,0 +1,398 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from src.services.artifacts import (
+    DEFAULT_COMPRESSION, DEFAULT_FORMAT, FORMATS, MAGIC, ModelArtifact, dump_artifact, is_packed, read_header,
+)
+from src.services.compiled_forest import CompiledForest
+from src.services.metrics import metrics, observe_stage
+
+DEFAULT_MAX_BYTES = int(os.environ.get("MODEL_REGISTRY_MAX_BYTES", 512 * 1024 * 1024))
+DEFAULT_ENGINE = os.environ.get("INFERENCE_ENGINE", "sklearn")
+ENGINES = ("sklearn", "compiled")
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    """
+    Identity of a model artifact on disk.
+
+    Attributes:
+        path (str): Absolute path of the artifact.
+        mtime_ns (int): Modification time of the file when it was loaded.
+        size (int): Size of the file in bytes.
+        digest (str): SHA-256 of the file content.
+    """
+    path: str
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    A model held in memory by the registry.
+
+    Callers keep a reference to the instance for the whole duration of a
+    prediction, so a concurrent hot-swap never changes the model under them.
+    """
+    version: ModelVersion
+    artifact: ModelArtifact
+    nbytes: int
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes counted against the registry budget: the file, plus the estimator once unpickled from a packed artifact."""
+        return self.nbytes + self.artifact.estimator_nbytes
+
+    @property
+    def model(self) -> Any:
+        """The scikit-learn estimator (unpickled on first access for packed artifacts)."""
+        return self.artifact.estimator
+
+    @property
+    def metadata(self) -> dict:
+        return self.artifact.header
+
+
+class ModelRegistry:
+    """
+    In-process cache of unpickled models, keyed by path and file version.
+
+    A model is reloaded only when the mtime/size of its file changes and the
+    content hash differs from the version already in memory. Packed
+    artifacts (see `src.services.artifacts`) are opened by reading their
+    header and memory-mapping the file; legacy joblib pickles are unpickled. Old versions are
+    evicted (least recently used first) once the total size goes over
+    `max_bytes`; the current version of each path is never evicted. The
+    size of a version is its file size, plus the estimator of a packed
+    artifact once it has been unpickled (see `LoadedModel.memory_bytes`).
+
+    Each path also has an inference engine: "sklearn" predicts with the
+    unpickled estimator, "compiled" with a `CompiledForest`, on the mapped
+    arrays of a packed artifact or built lazily from the estimator (once per
+    version).
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._entries: "OrderedDict[ModelVersion, LoadedModel]" = OrderedDict()
+        self._current: Dict[str, ModelVersion] = {}
+        self._compiled: Dict[ModelVersion, CompiledForest] = {}
+        self._engines: Dict[str, str] = {}
+        self._digests: Dict[str, Tuple[int, int, str]] = {}
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_time_total = 0.0
+        self.load_time_last = 0.0
+
+    def _path_lock(self, path: str) -> threading.Lock:
+        with self._lock:
+            return self._path_locks.setdefault(path, threading.Lock())
+
+    def _lookup(self, path: str, stat: os.stat_result) -> Optional[LoadedModel]:
+        version = self._current.get(path)
+        if version is None or (version.mtime_ns, version.size) != (stat.st_mtime_ns, stat.st_size):
+            return None
+        self._entries.move_to_end(version)
+        return self._entries[version]
+
+    def get(self, path: str) -> LoadedModel:
+        """
+        Return the current version of the model stored at `path`.
+
+        Args:
+            path (str): Path of the model artifact.
+
+        Returns:
+            LoadedModel: The in-memory model and its version.
+
+        Raises:
+            FileNotFoundError: If the artifact does not exist.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            loaded = self._lookup(path, stat)
+            if loaded is not None:
+                self.hits += 1
+                return loaded
+
+        # Un seul chargement par fichier, même si plusieurs requêtes arrivent en même temps
+        with self._path_lock(path):
+            stat = os.stat(path)
+            with self._lock:
+                loaded = self._lookup(path, stat)
+                if loaded is not None:
+                    self.hits += 1
+                    return loaded
+                self.misses += 1
+
+            start = time.perf_counter()
+            with open(path, "rb") as model_file:
+                if is_packed(model_file.read(len(MAGIC))):
+                    # Artefact compact : seul l'en-tête est lu, les tableaux sont mappés
+                    artifact, payload = ModelArtifact.open(path), None
+                    digest = artifact.header["sha256"]
+                else:
+                    model_file.seek(0)
+                    artifact, payload = None, model_file.read()
+                    digest = hashlib.sha256(payload).hexdigest()
+            version = ModelVersion(path, stat.st_mtime_ns, stat.st_size, digest)
+            with self._lock:
+                previous = self._entries.get(self._current.get(path))
+            if previous is not None and previous.version.digest == version.digest:
+                # Fichier touché mais contenu identique : pas besoin de le désérialiser
+                artifact = previous.artifact
+            else:
+                if artifact is None:
+                    import joblib
+                    artifact = ModelArtifact.from_estimator(joblib.load(io.BytesIO(payload)))
+                load_time = time.perf_counter() - start
+                with self._lock:
+                    self.load_time_last = load_time
+                    self.load_time_total += load_time
+                    self.loads += 1
+                observe_stage("model_load", load_time)
+            return self._register(version, artifact, stat.st_size)
+
+    def digest(self, path: str) -> Optional[str]:
+        """
+        Return the content digest of the artifact at `path`, without loading the model.
+
+        The digest is the one of the loaded version when the file has not
+        changed, else the SHA-256 of the header of a packed artifact, else
+        the hash of the file for a legacy pickle. It is kept per (mtime,
+        size) of the file, so the file is read once per version, in every
+        process (including the API process, where the process backend of
+        the CPU executor never loads the model).
+
+        Returns:
+            str: The hexadecimal digest, or None if the artifact is missing.
+        """
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            loaded = self._lookup(path, stat)
+            if loaded is not None:
+                return loaded.version.digest
+            cached = self._digests.get(path)
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                return cached[2]
+
+        try:
+            digest = read_header(path)["sha256"]
+        except ValueError:
+            hasher = hashlib.sha256()
+            with open(path, "rb") as model_file:
+                for block in iter(lambda: model_file.read(1024 * 1024), b""):
+                    hasher.update(block)
+            digest = hasher.hexdigest()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def save(
+        self,
+        model: Any,
+        path: str,
+        metadata: Optional[dict] = None,
+        artifact_format: str = DEFAULT_FORMAT,
+        compression: str = DEFAULT_COMPRESSION,
+    ) -> LoadedModel:
+        """
+        Persist a model and make it the current version of `path`.
+
+        The artifact is written to a temporary file and renamed over the
+        previous one, so readers never see a partially written file.
+
+        Args:
+            model (Any): The fitted model.
+            path (str): Destination of the artifact.
+            metadata (dict): Header fields of a packed artifact ("schema", "metrics"...).
+            artifact_format (str): "packed" or "pickle" (plain joblib dump).
+            compression (str): Compression of the estimator in a packed artifact.
+
+        Returns:
+            LoadedModel: The newly published model.
+
+        Raises:
+            ValueError: If the format or the compression is unknown.
+        """
+        if artifact_format not in FORMATS:
+            raise ValueError(f"Unknown artifact format: {artifact_format}")
+        path = os.path.abspath(path)
+        if artifact_format == "packed":
+            payload = dump_artifact(model, metadata, compression)
+        else:
+            import joblib
+            buffer = io.BytesIO()
+            joblib.dump(model, buffer)
+            payload = buffer.getvalue()
+
+        with self._path_lock(path):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as model_file:
+                model_file.write(payload)
+            if artifact_format == "packed":
+                # Mappé avant le renommage : ce processus sert les mêmes pages que les autres workers
+                artifact = ModelArtifact.open(tmp_path, estimator=model)
+                digest = artifact.header["sha256"]
+            else:
+                artifact = ModelArtifact.from_estimator(model, metadata)
+                digest = hashlib.sha256(payload).hexdigest()
+            os.replace(tmp_path, path)
+            stat = os.stat(path)
+            version = ModelVersion(path, stat.st_mtime_ns, stat.st_size, digest)
+            return self._register(version, artifact, len(payload))
+
+    def metadata(self, path: str) -> dict:
+        """
+        Return the header of the artifact at `path`.
+
+        A packed artifact's header is read from the file without loading the
+        model; a legacy pickle has to be loaded to be described.
+
+        Raises:
+            FileNotFoundError: If the artifact does not exist.
+        """
+        try:
+            header = read_header(path)
+        except ValueError:
+            header = self.get(path).metadata
+        return {key: value for key, value in header.items() if key not in ("sections", "body_offset")}
+
+    def _register(self, version: ModelVersion, artifact: ModelArtifact, nbytes: int) -> LoadedModel:
+        loaded = LoadedModel(version=version, artifact=artifact, nbytes=nbytes)
+        with self._lock:
+            self._entries[version] = loaded
+            self._entries.move_to_end(version)
+            self._current[version.path] = version
+            self._evict()
+        return loaded
+
+    def _evict(self) -> None:
+        current = set(self._current.values())
+        for version in list(self._entries):
+            if self.total_bytes() <= self.max_bytes:
+                break
+            if version not in current:
+                del self._entries[version]
+                self._compiled.pop(version, None)
+                self.evictions += 1
+
+    def set_engine(self, path: str, engine: str) -> None:
+        """
+        Select the inference engine used for the model stored at `path`.
+
+        Args:
+            path (str): Path of the model artifact.
+            engine (str): "sklearn" or "compiled".
+
+        Raises:
+            ValueError: If the engine is unknown.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown inference engine: {engine}")
+        with self._lock:
+            self._engines[os.path.abspath(path)] = engine
+
+    def engine(self, path: str) -> str:
+        """Return the inference engine selected for `path`."""
+        with self._lock:
+            return self._engines.get(os.path.abspath(path), DEFAULT_ENGINE)
+
+    def predictor(self, loaded: LoadedModel, engine: Optional[str] = None) -> Any:
+        """
+        Return the object whose `predict` scores rows for this model version.
+
+        Args:
+            loaded (LoadedModel): A model returned by `get` or `save`.
+            engine (str): Engine to use, defaults to the one selected for its path.
+
+        Returns:
+            The estimator itself, or its compiled forest.
+        """
+        engine = engine or self.engine(loaded.version.path)
+        if engine != "compiled":
+            materialized = loaded.artifact.loaded["estimator"]
+            model = loaded.model
+            if not materialized and loaded.artifact.packed:
+                # L'estimateur désérialisé compte maintenant dans le budget
+                with self._lock:
+                    self._evict()
+            return model
+        with self._lock:
+            compiled = self._compiled.get(loaded.version)
+        if compiled is None:
+            compiled = loaded.artifact.forest
+            with self._lock:
+                if loaded.version in self._entries:
+                    self._compiled[loaded.version] = compiled
+        return compiled
+
+    def total_bytes(self) -> int:
+        return sum(entry.memory_bytes for entry in self._entries.values())
+
+    def clear(self) -> None:
+        """Drop every cached model and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._current.clear()
+            self._compiled.clear()
+            self._engines.clear()
+            self._digests.clear()
+            self._reset_counters()
+
+    def stats(self) -> dict:
+        """
+        Return the registry counters.
+
+        The counters are those of this process only. With the process
+        backend of the CPU executor (`CPU_EXECUTOR_BACKEND=process`), models
+        are loaded and used in the pool workers, so the registry of the API
+        process mostly stays empty; "pid" tells which process answered.
+
+        Returns:
+            dict: Hits, misses, loads, evictions, load times and memory usage.
+        """
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "load_time_total": self.load_time_total,
+                "load_time_last": self.load_time_last,
+                "entries": len(self._entries),
+                "bytes": self.total_bytes(),
+                "max_bytes": self.max_bytes,
+                "compiled": len(self._compiled),
+                "packed": sum(entry.artifact.packed for entry in self._entries.values()),
+                "estimators_loaded": sum(entry.artifact.loaded["estimator"] for entry in self._entries.values()),
+                "engines": dict(self._engines),
+            }
+
+
+model_registry = ModelRegistry()
+metrics.register_cache("model_registry", model_registry.stats)
@@ -0,0 +1,188 @@
+import copy
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# Le module `firestore` est à la racine du TP ; il n'est importé qu'à la création du client
+# (google-cloud-firestore coûte ~0,3 s au démarrage de chaque worker)
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../../'))
+
+from src.services.metrics import metrics
+
+DEFAULT_TTL = float(os.environ.get("PARAMETERS_CACHE_TTL", 30))
+
+_client: Optional[Any] = None
+_client_lock = threading.Lock()
+_client_creations = 0
+_client_reuses = 0
+
+
+def get_firestore_client() -> Any:
+    """
+    Get the process-wide Firestore client, creating it on first use.
+
+    Credential discovery and the gRPC channel are set up once per process
+    instead of once per request.
+
+    Returns:
+        FirestoreClient: The shared client.
+    """
+    global _client, _client_creations, _client_reuses
+    with _client_lock:
+        if _client is None:
+            import firestore
+            _client = firestore.FirestoreClient()
+            _client_creations += 1
+        else:
+            _client_reuses += 1
+        return _client
+
+
+def set_firestore_client(client: Any) -> None:
+    """
+    Replace the shared Firestore client (e.g. with an in-memory stand-in).
+
+    Args:
+        client (Any): An object with the `FirestoreClient` interface, or None
+            to create a real client on next use.
+    """
+    global _client, _client_reuses
+    with _client_lock:
+        _client = client
+        _client_reuses = 0
+    parameters_cache.clear()
+
+
+def close_firestore_client() -> None:
+    """Close the shared Firestore client, if one was created."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None and hasattr(client, "close"):
+        client.close()
+
+
+class ParametersCache:
+    """
+    Read-through cache with a time-to-live in front of `FirestoreClient.get`.
+
+    Writes made through this service update the cached document
+    (write-through), so a read right after an update never hits Firestore.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._documents: Dict[Tuple[str, str], Tuple[float, dict]] = {}
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.backend_reads = 0
+        self.backend_writes = 0
+
+    def get(self, collection_name: str, document_id: str) -> dict:
+        """
+        Get a document, from the cache while it is fresh.
+
+        Raises:
+            FileExistsError: If the document does not exist.
+        """
+        key = (collection_name, document_id)
+        with self._lock:
+            entry = self._documents.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+            self.backend_reads += 1
+
+        document = get_firestore_client().get(collection_name, document_id)
+        self.put(collection_name, document_id, document)
+        return copy.deepcopy(document)
+
+    def put(self, collection_name: str, document_id: str, document: dict) -> None:
+        with self._lock:
+            self._documents[(collection_name, document_id)] = (time.monotonic() + self.ttl, copy.deepcopy(document))
+
+    def merge(self, collection_name: str, document_id: str, fields: dict) -> None:
+        """Record a write of `fields` made to Firestore (merged into the cached document)."""
+        key = (collection_name, document_id)
+        with self._lock:
+            self.backend_writes += 1
+            entry = self._documents.get(key)
+            if entry is not None:
+                # Le document est fusionné côté Firestore : on fait de même en cache
+                self._documents[key] = (time.monotonic() + self.ttl, {**entry[1], **copy.deepcopy(fields)})
+
+    def invalidate(self, collection_name: str, document_id: str, written: bool = False) -> None:
+        """Drop a cached document; `written` records that Firestore was written to (e.g. the document was replaced)."""
+        with self._lock:
+            self._documents.pop((collection_name, document_id), None)
+            if written:
+                self.backend_writes += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._documents.clear()
+            self._reset_counters()
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: Hits, misses, Firestore reads and writes, and the calls
+            saved: document reads served from the cache, and client
+            constructions avoided by reusing the shared client.
+        """
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "backend_reads": self.backend_reads,
+                "backend_writes": self.backend_writes,
+                "backend_reads_saved": self.hits,
+                "client_constructions_saved": _client_reuses,
+                "backend_calls_saved": self.hits + _client_reuses,
+                "client_creations": _client_creations,
+            }
+
+
+parameters_cache = ParametersCache()
+metrics.register_cache("parameters", parameters_cache.stats)
+
+
+def get_parameters() -> dict:
+    """
+    Get the model parameters stored in Firestore.
+
+    Returns:
+        dict: The "parameters" document.
+
+    Raises:
+        FileExistsError: If the document does not exist.
+    """
+    return parameters_cache.get("parameters", "parameters")
+
+
+def update_parameters(parameters: dict) -> None:
+    """
+    Update the model parameters in Firestore and in the cache.
+
+    Args:
+        parameters (dict): The fields to update.
+    """
+    get_firestore_client().update_parameters(parameters)
+    parameters_cache.merge("parameters", "parameters", parameters)
+
+
+def create_parameters_collection() -> None:
+    """Create the "parameters" document with the default values."""
+    get_firestore_client().create_parameters_collection()
+    # Document remplacé par les valeurs par défaut : relu à la prochaine demande
+    parameters_cache.invalidate("parameters", "parameters", written=True)
@@ -0,0 +1,147 @@
+import io
+import json
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+JSON = "application/json"
+ARROW = "application/vnd.apache.arrow.stream"
+NPY = "application/x-npy"
+# Matrice brute : en-tête <II (lignes, colonnes) puis les valeurs float32 little-endian, ligne par ligne
+RAW_FLOAT32 = "application/x-float32"
+BINARY_MEDIA_TYPES = (ARROW, NPY, RAW_FLOAT32)
+
+RAW_HEADER = struct.Struct("<II")
+CLASSES_HEADER = "X-Prediction-Classes"
+
+
+def media_type(content_type: Optional[str]) -> str:
+    """Media type of a Content-Type or Accept value, without parameters ("application/json; charset=utf-8" -> "application/json")."""
+    return (content_type or JSON).split(";", 1)[0].strip().lower() or JSON
+
+
+def negotiate(accept: Optional[str], request_type: str) -> str:
+    """
+    Pick the format of the predictions.
+
+    The first media type of `Accept` that the API can write wins (JSON or a
+    binary format); otherwise the predictions are returned in the format of
+    the request.
+    """
+    for candidate in (accept or "").split(","):
+        candidate = media_type(candidate)
+        if candidate in BINARY_MEDIA_TYPES or candidate == JSON:
+            return candidate
+    return request_type
+
+
+def _check_matrix(matrix: np.ndarray) -> np.ndarray:
+    if matrix.ndim != 2 or not matrix.size:
+        raise ValueError(f"Expected a non-empty 2D matrix, got shape {matrix.shape}")
+    if matrix.dtype.kind not in "fiu":
+        raise ValueError(f"Expected numeric features, got dtype {matrix.dtype}")
+    return matrix
+
+
+def decode_raw(body: bytes) -> np.ndarray:
+    if len(body) < RAW_HEADER.size:
+        raise ValueError("Raw float32 body is shorter than its shape header")
+    rows, columns = RAW_HEADER.unpack_from(body)
+    if len(body) != RAW_HEADER.size + rows * columns * 4:
+        raise ValueError(f"Raw float32 body does not hold {rows}x{columns} values")
+    return np.frombuffer(body, dtype="<f4", count=rows * columns, offset=RAW_HEADER.size).reshape(rows, columns)
+
+
+def decode_npy(body: bytes) -> np.ndarray:
+    buffer = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(buffer)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(buffer)
+    except ValueError as e:
+        raise ValueError(f"Invalid NPY body: {e}")
+    if dtype.hasobject:
+        raise ValueError("NPY arrays of Python objects are not accepted")
+    count = int(np.prod(shape))
+    if len(body) - buffer.tell() != count * dtype.itemsize:
+        raise ValueError(f"NPY body does not hold an array of shape {shape}")
+    return np.frombuffer(body, dtype=dtype, count=count, offset=buffer.tell()).reshape(shape, order="F" if fortran_order else "C")
+
+
+def decode_arrow(body: bytes) -> np.ndarray:
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Invalid Arrow IPC stream: {e}")
+    if table.num_columns == 1 and pa.types.is_fixed_size_list(table.schema.field(0).type):
+        # Une colonne de listes de taille fixe : les valeurs sont déjà rangées ligne par ligne
+        column = table.column(0)
+        width = column.type.list_size
+        if column.null_count:
+            raise ValueError("Arrow feature rows must not be null")
+        chunks = [chunk.flatten().to_numpy(zero_copy_only=False) for chunk in column.chunks]
+        values = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+        return values.reshape(-1, width)
+    # Une colonne par variable : passage du format colonne au format ligne, donc une copie
+    if not all(pa.types.is_integer(field.type) or pa.types.is_floating(field.type) for field in table.schema):
+        raise ValueError("Arrow feature columns must be numeric")
+    return np.column_stack([column.to_numpy() for column in table.columns]) if table.num_columns else np.empty((0, 0))
+
+
+DECODERS = {RAW_FLOAT32: decode_raw, NPY: decode_npy, ARROW: decode_arrow}
+
+
+def decode_matrix(body: bytes, content_type: str) -> np.ndarray:
+    """
+    Decode a binary request body into a feature matrix.
+
+    Raw float32, NPY and single-chunk fixed-size-list Arrow bodies are viewed
+    in place (`np.frombuffer`), without copying or parsing the values.
+
+    Args:
+        body (bytes): The request body.
+        content_type (str): One of `BINARY_MEDIA_TYPES`.
+
+    Returns:
+        np.ndarray: A read-only matrix of shape (n_rows, n_features).
+
+    Raises:
+        ValueError: If the body is malformed or is not a numeric 2D matrix.
+    """
+    return _check_matrix(DECODERS[content_type](body))
+
+
+def encode_predictions(predictions: np.ndarray, content_type: str) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Encode predictions in a binary format.
+
+    NPY and Arrow carry the labels themselves. The raw float32 format can only
+    hold numbers: the body is the (n_rows, 1) matrix of label codes and the
+    `X-Prediction-Classes` header lists the labels of the codes.
+
+    Returns:
+        Tuple[bytes, Dict[str, str]]: The body and the extra response headers.
+    """
+    predictions = np.asarray(predictions)
+    if content_type == NPY:
+        if predictions.dtype.hasobject:
+            # Libellés en objets Python (modèle entraîné sur un DataFrame) : NPY exige un dtype fixe
+            predictions = predictions.astype(str)
+        buffer = io.BytesIO()
+        np.save(buffer, predictions, allow_pickle=False)
+        return buffer.getvalue(), {}
+    if content_type == ARROW:
+        import pyarrow as pa
+
+        table = pa.table({"prediction": pa.array(predictions)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), {}
+
+    classes, codes = np.unique(predictions, return_inverse=True)
+    body = RAW_HEADER.pack(len(codes), 1) + codes.astype("<f4").tobytes()
+    return body, {CLASSES_HEADER: json.dumps(classes.tolist())}
@@ -0,0 +1,168 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.services.metrics import metrics
+
+# 0 désactive le cache
+DEFAULT_MAX_ENTRIES = int(os.environ.get("PREDICTION_CACHE_SIZE", 65536))
+# Au-delà, une requête va directement au modèle : la recherche ligne par ligne (sur la boucle
+# d'événements) coûterait plus qu'elle ne ferait gagner, et les gros lots videraient le cache
+DEFAULT_MAX_ROWS = int(os.environ.get("PREDICTION_CACHE_MAX_ROWS", 1024))
+
+
+class PredictionCache:
+    """
+    Least-recently-used cache of predictions, keyed by model version and row.
+
+    A row is keyed by the bytes of its float32 values, the precision the
+    forests compare features at: two rows with the same key always get the
+    same prediction. Each lookup splits a matrix into cached rows and misses;
+    only the distinct missing rows are scored. The cache holds predictions
+    of a single model version (its content digest) and is emptied as soon as
+    it is used with another one, e.g. after a retraining.
+
+    Matrices of more than `max_rows` rows bypass the cache: the cache is
+    meant for the small, repeated requests, and the lookup of a bulk matrix
+    (a Python loop over its rows) would stall the event loop it runs on.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_rows: int = DEFAULT_MAX_ROWS) -> None:
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bypassed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _bypass(self, version: Optional[str], matrix: np.ndarray) -> bool:
+        if version is None or not self.enabled:
+            return True
+        if len(matrix) > self.max_rows:
+            with self._lock:
+                self.bypassed += 1
+            return True
+        return False
+
+    @staticmethod
+    def _keys(matrix: np.ndarray) -> List[bytes]:
+        # + 0 ramène -0.0 à 0.0 : les deux donnent la même prédiction
+        rows = np.ascontiguousarray(matrix, dtype=np.float32) + np.float32(0)
+        data, width = rows.tobytes(), rows.shape[1] * rows.itemsize
+        return [data[start:start + width] for start in range(0, len(data), width)]
+
+    def _lookup(self, version: str, matrix: np.ndarray) -> Tuple[List[Any], Dict[bytes, List[int]]]:
+        keys = self._keys(matrix)
+        results: List[Any] = [None] * len(keys)
+        missing: Dict[bytes, List[int]] = {}
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = version
+            for position, key in enumerate(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    results[position] = self._entries[key]
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(position)
+                    self.misses += 1
+        return results, missing
+
+    def _store(self, version: str, results: List[Any], missing: Dict[bytes, List[int]], predictions: Sequence) -> List[Any]:
+        predictions = predictions.tolist() if isinstance(predictions, np.ndarray) else list(predictions)
+        with self._lock:
+            keep = version == self._version
+            for (key, positions), prediction in zip(missing.items(), predictions):
+                for position in positions:
+                    results[position] = prediction
+                if keep:
+                    self._entries[key] = prediction
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return results
+
+    @staticmethod
+    def _rows(matrix: np.ndarray, missing: Dict[bytes, List[int]]) -> np.ndarray:
+        # Une ligne par clé manquante, dans l'ordre de `missing`
+        return matrix[[positions[0] for positions in missing.values()]]
+
+    def predict(self, version: Optional[str], matrix: np.ndarray, score: Callable[[np.ndarray], Sequence]) -> Sequence:
+        """
+        Predict a matrix, scoring only the rows that are not cached.
+
+        Args:
+            version (str): Identity of the model (content digest), None to bypass the cache.
+            matrix (np.ndarray): The rows to predict, shape (n_rows, n_features);
+                scored directly if it has more than `max_rows` rows.
+            score (Callable[[np.ndarray], Sequence]): Scores the missing rows.
+
+        Returns:
+            Sequence: One prediction per row of `matrix`.
+        """
+        if self._bypass(version, matrix):
+            return score(matrix)
+        results, missing = self._lookup(version, matrix)
+        if not missing:
+            return results
+        return self._store(version, results, missing, score(self._rows(matrix, missing)))
+
+    async def apredict(self, version: Optional[str], matrix: np.ndarray, score: Callable[[np.ndarray], Awaitable[Sequence]]) -> Sequence:
+        """Same as `predict`, with a coroutine function scoring the missing rows."""
+        if self._bypass(version, matrix):
+            return await score(matrix)
+        results, missing = self._lookup(version, matrix)
+        if not missing:
+            return results
+        return self._store(version, results, missing, await score(self._rows(matrix, missing)))
+
+    def clear(self) -> None:
+        """Drop every cached prediction and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self._reset_counters()
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: Hits, misses, hit ratio, evictions, invalidations, requests
+            bypassed for their size, and size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "bypassed": self.bypassed,
+                "max_rows": self.max_rows,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "model_version": self._version,
+            }
+
+
+prediction_cache = PredictionCache()
+metrics.register_cache("predictions", prediction_cache.stats)
@@ -0,0 +1,209 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def clean_labels(values: Any, prefix: Optional[str]) -> np.ndarray:
+    """
+    Remove `prefix` (case-insensitive) from string labels.
+
+    The labels are factorized first, so the string operation runs once per
+    distinct label instead of once per row.
+
+    Args:
+        values (array-like): The labels.
+        prefix (str): The text to remove, or None to keep the labels.
+
+    Returns:
+        np.ndarray: The cleaned labels, one per row.
+    """
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+    uniques = np.asarray(uniques, dtype=object)
+    if prefix:
+        pattern = re.compile(re.escape(prefix), re.IGNORECASE)
+        uniques = np.asarray([pattern.sub("", u) if isinstance(u, str) else u for u in uniques], dtype=object)
+    cleaned = uniques.take(codes) if len(uniques) else np.empty(len(codes), dtype=object)
+    cleaned[codes == -1] = None
+    return cleaned
+
+
+@dataclass(frozen=True)
+class PreprocessingSpec:
+    """
+    Declarative preprocessing of a dataset, from the `preprocessing` field of
+    its config entry.
+
+    Attributes:
+        rename (Tuple[Tuple[str, str], ...]): Column renames, applied after the prefix removal.
+        strip_prefix (str): Removed from column names and target labels
+            (defaults to "<dataset name>-", e.g. "iris-").
+        dtype (str): Dtype of the feature matrix.
+        encode_target (bool): Encode the target as integer codes.
+    """
+    rename: Tuple[Tuple[str, str], ...] = ()
+    strip_prefix: Optional[str] = None
+    dtype: str = "float32"
+    encode_target: bool = True
+
+    @classmethod
+    def from_entry(cls, name: str, entry: dict) -> "PreprocessingSpec":
+        options = entry.get("preprocessing") or {}
+        return cls(
+            rename=tuple(sorted((options.get("rename") or {}).items())),
+            strip_prefix=options.get("strip_prefix", f"{name}-"),
+            dtype=options.get("dtype", "float32"),
+            encode_target=options.get("encode_target", True),
+        )
+
+
+@dataclass(frozen=True)
+class Preprocessor:
+    """
+    A preprocessing spec compiled for one dataset schema.
+
+    Column names, feature order and target classes are resolved once, so
+    `transform` is a single pass over the feature columns into a
+    preallocated matrix plus one factorization of the target. `features`
+    applies the same column mapping and dtype to prediction input.
+
+    Attributes:
+        columns (Dict[str, str]): Output name of every source column.
+        source_features (List[str]): Feature columns of the source file.
+        feature_names (List[str]): Output names of the features, in matrix order.
+        target_source (str): Target column of the source file.
+        target_name (str): Output name of the target.
+        classes (Tuple): Cleaned target labels; code i stands for classes[i].
+        dtype (str): Dtype of the feature matrix.
+    """
+    columns: Dict[str, str]
+    source_features: List[str]
+    feature_names: List[str]
+    target_source: str
+    target_name: str
+    classes: Optional[Tuple[Any, ...]]
+    dtype: str
+    strip_prefix: Optional[str] = None
+    _label_codes: Dict[Any, int] = field(default_factory=dict, repr=False, compare=False)
+
+    def transform(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build the feature matrix and the target of a source frame.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The features (n_rows, n_features) in
+            `dtype`, and the target as integer codes (or cleaned labels when
+            the target is not encoded).
+
+        Raises:
+            ValueError: If a target label is not one of the compiled classes.
+        """
+        X = np.empty((len(df), len(self.source_features)), dtype=self.dtype)
+        for position, column in enumerate(self.source_features):
+            X[:, position] = df[column].to_numpy()
+
+        if self.classes is None:
+            return X, clean_labels(df[self.target_source].to_numpy(), self.strip_prefix)
+
+        codes, uniques = pd.factorize(df[self.target_source], use_na_sentinel=True)
+        lookup = np.asarray([self._label_codes.get(label, -1) for label in uniques] + [-1], dtype=np.int32)
+        y = lookup[codes]
+        if (y == -1).any():
+            raise ValueError("Target has labels that are not in the compiled classes")
+        return X, y
+
+    def features(self, data: list) -> np.ndarray:
+        """
+        Build the feature matrix of prediction input.
+
+        Args:
+            data (list): Rows as lists of feature values (in `feature_names`
+                order) or as objects keyed by source or output column name.
+
+        Returns:
+            np.ndarray: Matrix of shape (n_rows, n_features) in `dtype`.
+
+        Raises:
+            ValueError: If the rows do not have the expected features.
+        """
+        if data and isinstance(data[0], dict):
+            frame = pd.DataFrame(data).rename(columns=self.columns)
+            missing = [name for name in self.feature_names if name not in frame.columns]
+            if missing:
+                raise ValueError(f"Missing features: {missing}")
+            X = frame[self.feature_names].to_numpy(dtype=self.dtype)
+        else:
+            X = np.asarray(data, dtype=self.dtype)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected rows of {len(self.feature_names)} features: {self.feature_names}")
+        return X
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Map target codes back to their labels."""
+        if self.classes is None:
+            return np.asarray(codes)
+        return np.asarray(self.classes, dtype=object).take(np.asarray(codes, dtype=np.int64))
+
+    def frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return the processed dataset as a frame (features and decoded target)."""
+        X, y = self.transform(df)
+        data = {name: X[:, position] for position, name in enumerate(self.feature_names)}
+        data[self.target_name] = self.decode(y)
+        return pd.DataFrame(data, index=df.index, copy=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "columns": self.columns,
+            "feature_names": self.feature_names,
+            "target_name": self.target_name,
+            "classes": list(self.classes) if self.classes is not None else None,
+            "dtype": self.dtype,
+        }
+
+
+def compile_preprocessor(
+    df: pd.DataFrame,
+    source_features: List[str],
+    target: str,
+    spec: PreprocessingSpec,
+) -> Preprocessor:
+    """
+    Compile a preprocessing spec for a dataset.
+
+    Args:
+        df (pd.DataFrame): The source frame, used to find the target classes.
+        source_features (List[str]): Feature columns, in matrix order.
+        target (str): Target column.
+        spec (PreprocessingSpec): The preprocessing to apply.
+
+    Returns:
+        Preprocessor: The compiled preprocessing.
+    """
+    renames = dict(spec.rename)
+    columns = {}
+    for column in df.columns:
+        name = column.replace(spec.strip_prefix, "") if spec.strip_prefix else column
+        columns[column] = renames.get(name, renames.get(column, name))
+
+    classes, label_codes = None, {}
+    if spec.encode_target:
+        uniques = pd.unique(df[target].dropna())
+        cleaned = clean_labels(uniques, spec.strip_prefix)
+        # Même ordre de classes que scikit-learn (np.unique) : les codes restent compatibles
+        classes = tuple(sorted(set(cleaned.tolist())))
+        positions = {label: code for code, label in enumerate(classes)}
+        label_codes = {raw: positions[label] for raw, label in zip(uniques.tolist(), cleaned.tolist())}
+
+    return Preprocessor(
+        columns=columns,
+        source_features=list(source_features),
+        feature_names=[columns[column] for column in source_features],
+        target_source=target,
+        target_name=columns[target],
+        classes=classes,
+        dtype=spec.dtype,
+        strip_prefix=spec.strip_prefix,
+        _label_codes=label_codes,
+    )
@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+
+from src.services.config_store import model_parameters_store
+
+# Cœurs laissés au service des prédictions pendant un entraînement
+RESERVED_CORES = int(os.environ.get("TRAINING_RESERVED_CORES", 1))
+MAX_CONCURRENT_TRAININGS = int(os.environ.get("TRAINING_MAX_CONCURRENT", 1))
+BACKENDS = ("auto", "threading", "loky", "sequential")
+
+
+def available_cores() -> int:
+    """Cores this process may run on (CPU affinity, else the core count)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def usable_cores() -> int:
+    """Cores available for training and batch work: the available ones minus `TRAINING_RESERVED_CORES` (at least 1)."""
+    return max(1, available_cores() - RESERVED_CORES)
+
+
+def busy_cores() -> float:
+    """Cores already busy, from the 1-minute load average (0 where it is unavailable)."""
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return 0.0
+
+
+def load_training_parameters() -> dict:
+    """
+    Load the training resource settings of `model_parameters.json`.
+
+    Returns:
+        dict: `n_jobs` of the RandomForestClassifier section (None for
+        automatic) and the joblib `backend` of the Training section ("auto" if unset).
+    """
+    try:
+        config = model_parameters_store.read()
+    except (FileNotFoundError, ValueError):
+        config = {}
+    return {
+        "n_jobs": config.get("RandomForestClassifier", {}).get("n_jobs"),
+        "backend": config.get("Training", {}).get("backend") or "auto",
+    }
+
+
+def apply_training_parameters(parameters: dict) -> None:
+    """
+    Write the training resource settings to `model_parameters.json`, used by every training.
+
+    Args:
+        parameters (dict): `n_jobs` (RandomForestClassifier section, None for
+            automatic) and/or `backend` (Training section).
+    """
+    def change(config: dict) -> None:
+        if "n_jobs" in parameters:
+            config["RandomForestClassifier"]["n_jobs"] = parameters["n_jobs"]
+        if "backend" in parameters:
+            config.setdefault("Training", {})["backend"] = parameters["backend"]
+
+    model_parameters_store.update(change)
+
+
+def plan_training(n_jobs: Optional[int] = None, backend: Optional[str] = None) -> dict:
+    """
+    Choose the parallelism of a forest fit.
+
+    With `n_jobs` unset, the fit uses the cores that are free: the available
+    cores minus `TRAINING_RESERVED_CORES` kept for serving and minus the
+    cores already busy (load average). A negative `n_jobs` counts from the
+    available cores like joblib (-1: all but the reserved ones); a positive
+    one is capped at the same usable cores, so the reserved cores stay free
+    for serving whatever is requested. The "auto" backend is "threading"
+    (tree building releases the GIL, so threads share the training data
+    without copies), or "sequential" for a single core.
+
+    Args:
+        n_jobs (int): Requested number of jobs, None for automatic.
+        backend (str): One of `BACKENDS`, None for "auto".
+
+    Returns:
+        dict: The chosen `n_jobs` and `backend`, and the core counts they come from.
+
+    Raises:
+        ValueError: If the backend is unknown or `n_jobs` is 0.
+    """
+    backend = backend or "auto"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown joblib backend: {backend}")
+    if n_jobs == 0:
+        raise ValueError("n_jobs must not be 0")
+
+    available = available_cores()
+    usable = usable_cores()
+    busy = busy_cores()
+    if n_jobs is None:
+        chosen = max(1, min(usable, int(available - RESERVED_CORES - busy)))
+    elif n_jobs < 0:
+        chosen = max(1, usable + 1 + n_jobs)
+    else:
+        chosen = min(n_jobs, usable)
+    if backend == "auto":
+        backend = "sequential" if chosen == 1 else "threading"
+    return {
+        "n_jobs": chosen,
+        "backend": backend,
+        "requested_n_jobs": n_jobs,
+        "available_cores": available,
+        "reserved_cores": RESERVED_CORES,
+        "busy_cores": round(busy, 2),
+    }
+
+
+def fit_in_parallel(model, X: np.ndarray, y: np.ndarray, n_jobs: Optional[int] = None, backend: Optional[str] = None) -> dict:
+    """
+    Fit a forest with the parallelism chosen by `plan_training`.
+
+    The joblib backend defaults to the one of the "Training" section of the
+    parameters. The fitted model is left with `n_jobs=None`: once published, it predicts
+    on a single core, the API workers already sharing the CPUs.
+
+    Returns:
+        dict: The plan the fit ran with.
+
+    Raises:
+        ValueError: If the backend or `n_jobs` is invalid.
+    """
+    from joblib import parallel_backend
+
+    plan = plan_training(n_jobs, backend or load_training_parameters()["backend"])
+    model.set_params(n_jobs=plan["n_jobs"])
+    try:
+        with parallel_backend(plan["backend"], n_jobs=plan["n_jobs"]):
+            model.fit(X, y)
+    finally:
+        model.set_params(n_jobs=None)
+    return plan
+
+
+def current_plan() -> dict:
+    """Return the `plan_training` of the parameters stored in `model_parameters.json`."""
+    return plan_training(**load_training_parameters())
+
+
+class TrainingSlots:
+    """
+    Cap on the trainings fitting at the same time in this process.
+
+    Callers beyond `limit` wait for a slot; cached trainings, which do not
+    fit anything, do not take one.
+    """
+
+    def __init__(self, limit: int = MAX_CONCURRENT_TRAININGS) -> None:
+        self.limit = max(1, limit)
+        self._semaphore = threading.BoundedSemaphore(self.limit)
+        self._lock = threading.Lock()
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.active = 0
+        self.waiting = 0
+        self.peak = 0
+        self.completed = 0
+        self.wait_time_total = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        start = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+        self._semaphore.acquire()
+        with self._lock:
+            self.waiting -= 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.wait_time_total += time.perf_counter() - start
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        """
+        Return the slot counters.
+
+        Returns:
+            dict: Limit, trainings fitting and waiting, peak, completed and total wait time.
+        """
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "active": self.active,
+                "waiting": self.waiting,
+                "peak": self.peak,
+                "completed": self.completed,
+                "wait_time_total": self.wait_time_total,
+            }
+
+
+training_slots = TrainingSlots()
@@ -0,0 +1,313 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.services.executors import CPU_BACKEND, CPU_START_METHOD, CPU_WORKERS
+from src.services.jobs import job_manager
+from src.services.logs import get_logger
+from src.services.metrics import stage
+from src.services.model_registry import model_registry
+from src.services.resources import usable_cores
+
+DEFAULT_CHUNK_SIZE = int(os.environ.get("SCORING_CHUNK_SIZE", 50000))
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), '../models/iris_model.pkl')
+# Cible supposée des artefacts qui n'en enregistrent pas (anciens modèles Iris)
+DEFAULT_TARGET = "Species"
+# Les chemins reçus par l'API sont relatifs à ce dossier
+SCORING_DATA_DIR = os.environ.get("SCORING_DATA_DIR", os.path.join(os.path.dirname(__file__), '../data'))
+# Sous-dossier du dossier des données où l'API peut écrire ses résultats
+SCORING_OUTPUT_DIR = os.environ.get("SCORING_OUTPUT_DIR", "scores")
+
+scoring_log = get_logger("scoring")
+
+_predictor: Any = None
+
+
+def _load_worker_model(model_path: str, engine: Optional[str]) -> None:
+    # Initialiseur du pool : le modèle est chargé une seule fois par worker
+    global _predictor
+    _predictor = model_registry.predictor(model_registry.get(model_path), engine)
+
+
+def _score_chunk(matrix: np.ndarray, ids: pd.Series) -> bytes:
+    with stage("predict"):
+        predictions = _predictor.predict(matrix)
+    # Le CSV du bloc est produit dans le worker : le processus principal ne fait que lire et écrire
+    return pd.DataFrame({ids.name: ids.to_numpy(), "prediction": predictions}).to_csv(index=False, header=False).encode()
+
+
+def _checkpoint_path(output_path: str) -> str:
+    return f"{output_path}.progress.json"
+
+
+def _input_identity(input_path: str) -> dict:
+    stat = os.stat(input_path)
+    return {"path": os.path.abspath(input_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _write_checkpoint(path: str, checkpoint: dict) -> None:
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def _read_checkpoint(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def iter_frames(input_path: str, chunk_size: int, skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV or Parquet file as DataFrames of `chunk_size` rows.
+
+    Only one chunk (one Parquet batch) is held in memory at a time. The first
+    `skip_rows` data rows are skipped without being turned into frames.
+    """
+    if input_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size):
+            if skip_rows >= batch.num_rows:
+                skip_rows -= batch.num_rows
+                continue
+            yield batch.slice(skip_rows).to_pandas()
+            skip_rows = 0
+        return
+
+    yield from pd.read_csv(input_path, chunksize=chunk_size, skiprows=range(1, skip_rows + 1))
+
+
+def resolve_features(model_path: str, header_columns: List[str], columns: Optional[List[str]] = None,
+                     id_column: Optional[str] = None) -> List[str]:
+    """
+    Choose the input columns fed to the model.
+
+    In order: the `columns` given, the feature names stored in the artifact,
+    else every column except `id_column` and the target recorded in the
+    artifact (`DEFAULT_TARGET` if it records none).
+
+    Raises:
+        ValueError: If a column is missing or the count does not match the model.
+    """
+    schema = model_registry.metadata(model_path).get("schema", {})
+    features = columns or schema.get("feature_names")
+    if not features:
+        target = schema.get("target") or DEFAULT_TARGET
+        features = [column for column in header_columns if column not in (id_column, target)]
+    missing = [column for column in features if column not in header_columns]
+    if missing:
+        raise ValueError(f"Columns not found in the input file: {missing}")
+    n_features = schema.get("n_features")
+    if n_features and len(features) != n_features:
+        raise ValueError(f"The model expects {n_features} features, got {len(features)}: {features}")
+    return list(features)
+
+
+def _create_pool(workers: int, model_path: str, engine: Optional[str]) -> Executor:
+    if CPU_BACKEND == "thread":
+        return ThreadPoolExecutor(max_workers=workers, initializer=_load_worker_model, initargs=(model_path, engine))
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(CPU_START_METHOD),
+        initializer=_load_worker_model,
+        initargs=(model_path, engine),
+    )
+
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    model_path: str = DEFAULT_MODEL_PATH,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+    id_column: Optional[str] = None,
+    engine: Optional[str] = None,
+    resume: bool = True,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Score a CSV or Parquet file chunk by chunk into a CSV file.
+
+    Chunks are read one after the other and scored in parallel by a pool of
+    `workers` processes, each loading the model once. At most two chunks per
+    worker are in flight, so memory stays bounded whatever the file size.
+    Predictions are appended to `output_path` in input order, with the row
+    number (or `id_column`), and a checkpoint `<output>.progress.json` is
+    written after each chunk. With `resume`, a run restarts after the last
+    completed chunk if the input, the model and the chunk size are unchanged.
+
+    Args:
+        input_path (str): The file to score (.csv or .parquet).
+        output_path (str): The CSV file of predictions.
+        model_path (str): The model artifact, defaults to the Iris model.
+        chunk_size (int): Rows per chunk.
+        workers (int): Size of the pool, defaults to `CPU_EXECUTOR_WORKERS`.
+        columns (List[str]): Input columns fed to the model (see `resolve_features`).
+        id_column (str): Column copied to the output to identify rows.
+        engine (str): Inference engine, defaults to the one selected for the model.
+        resume (bool): Continue an interrupted run instead of starting over.
+        progress (Callable[[dict], None]): Called with the counters after each chunk.
+
+    Returns:
+        dict: Rows and chunks scored, duration, rows per second and the chunk resumed from.
+
+    Raises:
+        FileNotFoundError: If the input file or the model does not exist.
+        ValueError: If the feature columns do not match the model, the output
+            is the input, or the output is an existing file that no previous
+            run wrote (it has no checkpoint).
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    check_output(input_path, output_path)
+    checkpoint_path = _checkpoint_path(output_path)
+    workers = max(1, workers or CPU_WORKERS)
+    identity = {
+        "input": _input_identity(input_path),
+        "model": model_registry.get(model_path).version.digest,
+        "chunk_size": chunk_size,
+        "columns": columns,
+        "id_column": id_column,
+    }
+    checkpoint = _read_checkpoint(checkpoint_path) if resume else None
+    if checkpoint is None or checkpoint["identity"] != identity or not os.path.exists(output_path):
+        checkpoint = {"identity": identity, "chunks": 0, "rows": 0, "output_bytes": 0, "completed": False}
+    resumed_from = checkpoint["chunks"]
+    if checkpoint["completed"]:
+        return {**_summary(checkpoint, 0.0, 0), "resumed_from_chunk": resumed_from}
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)) or ".", exist_ok=True)
+    mode = "r+b" if checkpoint["output_bytes"] else "wb"
+    start = time.perf_counter()
+    rows_scored = 0
+    with open(output_path, mode) as output, _create_pool(workers, model_path, engine) as pool:
+        # Un arrêt après le dernier checkpoint a pu laisser un bloc partiel : on le retire
+        output.truncate(checkpoint["output_bytes"])
+        output.seek(checkpoint["output_bytes"])
+
+        pending: Dict[int, Tuple[Future, int]] = {}
+        features: Optional[List[str]] = None
+        next_index = checkpoint["chunks"]
+
+        def write_next() -> None:
+            nonlocal next_index, rows_scored
+            future, rows = pending.pop(next_index)
+            output.write(future.result())
+            output.flush()
+            os.fsync(output.fileno())
+            checkpoint["chunks"] += 1
+            checkpoint["rows"] += rows
+            checkpoint["output_bytes"] = output.tell()
+            _write_checkpoint(checkpoint_path, checkpoint)
+            rows_scored += rows
+            next_index += 1
+            if progress is not None:
+                progress(_summary(checkpoint, time.perf_counter() - start, rows_scored))
+
+        index, row = checkpoint["chunks"], checkpoint["rows"]
+        for frame in iter_frames(input_path, chunk_size, skip_rows=checkpoint["rows"]):
+            if features is None:
+                features = resolve_features(model_path, list(frame.columns), columns, id_column)
+                if not checkpoint["output_bytes"]:
+                    output.write(f"{id_column or 'row'},prediction\n".encode())
+            ids = frame[id_column] if id_column else pd.Series(np.arange(row, row + len(frame)), name="row")
+            row += len(frame)
+            matrix = frame[features].to_numpy(dtype=np.float32)
+            pending[index] = (pool.submit(_score_chunk, matrix, ids), len(frame))
+            index += 1
+            # Au plus deux blocs par worker en mémoire : l'écriture suit la lecture
+            while len(pending) >= 2 * workers:
+                write_next()
+        while pending:
+            write_next()
+
+    checkpoint["completed"] = True
+    _write_checkpoint(checkpoint_path, checkpoint)
+    summary = {**_summary(checkpoint, time.perf_counter() - start, rows_scored), "resumed_from_chunk": resumed_from}
+    scoring_log.event("scoring_finished", input=os.path.abspath(input_path), output=os.path.abspath(output_path), **summary)
+    return summary
+
+
+def _summary(checkpoint: dict, seconds: float, rows_scored: int) -> dict:
+    return {
+        "rows": checkpoint["rows"],
+        "chunks": checkpoint["chunks"],
+        "rows_scored": rows_scored,
+        "seconds": seconds,
+        "rows_per_second": rows_scored / seconds if seconds else None,
+    }
+
+
+def data_path(relative: str) -> str:
+    """
+    Resolve a path received by the API inside `SCORING_DATA_DIR`.
+
+    Raises:
+        ValueError: If the path is absolute or leaves the data folder.
+    """
+    root = os.path.realpath(SCORING_DATA_DIR)
+    path = os.path.realpath(os.path.join(root, relative))
+    if os.path.isabs(relative) or os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Path must stay inside the data folder: {relative}")
+    return path
+
+
+def check_output(input_path: str, output_path: str) -> None:
+    """
+    Check that scoring may write `output_path`.
+
+    Raises:
+        ValueError: If the output is the input, or an existing file that no
+            previous run wrote (it has no checkpoint).
+    """
+    if os.path.realpath(output_path) == os.path.realpath(input_path):
+        raise ValueError("The output must not be the input file")
+    # Jamais d'écrasement d'un fichier que le scoring n'a pas écrit lui-même
+    if os.path.exists(output_path) and not os.path.exists(_checkpoint_path(output_path)):
+        raise ValueError(f"Output file already exists and was not written by a scoring run: {os.path.basename(output_path)}")
+
+
+def scores_path(relative: str) -> str:
+    """
+    Resolve an output path received by the API inside `SCORING_OUTPUT_DIR` of the data folder.
+
+    Raises:
+        ValueError: If the path leaves the output folder or is not a .csv file.
+    """
+    path = data_path(relative)
+    root = os.path.realpath(os.path.join(SCORING_DATA_DIR, SCORING_OUTPUT_DIR))
+    if os.path.commonpath([root, path]) != root or not path.endswith(".csv"):
+        raise ValueError(f"Output must be a .csv file inside the {SCORING_OUTPUT_DIR}/ folder: {relative}")
+    return path
+
+
+def run_scoring(params: dict) -> dict:
+    """
+    Job task: score `params["input"]` into `params["output"]`, relative to the data folder.
+
+    The pool is capped at the usable cores (`usable_cores`), whatever the request asks for.
+    """
+    return score_file(
+        data_path(params["input"]),
+        scores_path(params["output"]),
+        model_path=DEFAULT_MODEL_PATH,
+        chunk_size=params.get("chunk_size") or DEFAULT_CHUNK_SIZE,
+        workers=min(params.get("workers") or CPU_WORKERS, usable_cores()),
+        columns=params.get("columns"),
+        id_column=params.get("id_column"),
+    )
+
+
+job_manager.register("score-file", run_scoring)
@@ -0,0 +1,120 @@
+import io
+from typing import Iterator, List, Optional
+
+import pandas as pd
+from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def select_columns(df: pd.DataFrame, columns: Optional[str]) -> List[int]:
+    """
+    Resolve a comma-separated list of column names to column positions.
+
+    Args:
+        df (pd.DataFrame): The frame to read.
+        columns (str): Comma-separated column names, or None for every column.
+
+    Returns:
+        list: The positions of the selected columns.
+
+    Raises:
+        HTTPException: If a column does not exist.
+    """
+    if not columns:
+        return list(range(len(df.columns)))
+
+    names = [name.strip() for name in columns.split(",") if name.strip()]
+    missing = [name for name in names if name not in df.columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(missing)}")
+    return [df.columns.get_loc(name) for name in names]
+
+
+def iter_chunks(df: pd.DataFrame, positions: List[int], chunk_size: int) -> Iterator[pd.DataFrame]:
+    # Seul le bloc courant est copié, jamais le DataFrame entier
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size, positions]
+
+
+def iter_ndjson(df: pd.DataFrame, positions: List[int], chunk_size: int) -> Iterator[bytes]:
+    for chunk in iter_chunks(df, positions, chunk_size):
+        yield (chunk.to_json(orient='records', lines=True).rstrip("\n") + "\n").encode()
+
+
+def iter_csv(df: pd.DataFrame, positions: List[int], chunk_size: int) -> Iterator[bytes]:
+    if not len(df):
+        yield df.iloc[:, positions].to_csv(index=False).encode()
+    for number, chunk in enumerate(iter_chunks(df, positions, chunk_size)):
+        yield chunk.to_csv(index=False, header=number == 0).encode()
+
+
+def iter_arrow(df: pd.DataFrame, positions: List[int], chunk_size: int) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    # Le schéma est déduit du premier bloc (un bloc vide ne donne pas le type des chaînes)
+    schema = pa.Schema.from_pandas(df.iloc[:chunk_size, positions], preserve_index=False)
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    for chunk in iter_chunks(df, positions, chunk_size):
+        writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+        # On vide le buffer après chaque batch pour garder une mémoire bornée
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    writer.close()
+    yield sink.getvalue()
+
+
+def frame_response(
+    df: pd.DataFrame,
+    format: str = "json",
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columns: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Response:
+    """
+    Render a page of a DataFrame in the requested format.
+
+    "json" returns the pandas "split" layout in a single body. "ndjson",
+    "csv" and "arrow" (Arrow IPC stream, requires pyarrow) stream the rows
+    in batches of `chunk_size`, so the whole payload is never built in memory.
+
+    Args:
+        df (pd.DataFrame): The frame to render.
+        format (str): One of json, ndjson, csv, arrow.
+        limit (int): Maximum number of rows, or None for all of them.
+        offset (int): Number of rows to skip.
+        columns (str): Comma-separated column names to keep.
+        chunk_size (int): Number of rows per streamed batch.
+
+    Returns:
+        Response: The rendered page.
+
+    Raises:
+        HTTPException: If the format or a column is unknown, or if pyarrow is missing.
+    """
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    if format == "arrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=406, detail="Arrow IPC format requires pyarrow")
+
+    positions = select_columns(df, columns)
+    page = df.iloc[offset:] if limit is None else df.iloc[offset:offset + limit]
+
+    if format == "json":
+        return Response(content=page.iloc[:, positions].to_json(orient='split'), media_type=MEDIA_TYPES["json"])
+
+    iterators = {"ndjson": iter_ndjson, "csv": iter_csv, "arrow": iter_arrow}
+    return StreamingResponse(iterators[format](page, positions, max(chunk_size, 1)), media_type=MEDIA_TYPES[format])
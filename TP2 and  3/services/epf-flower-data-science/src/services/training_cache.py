@@ -0,0 +1,236 @@
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from importlib import metadata as package_metadata
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.services.dataset_cache import DEFAULT_CACHE_DIR as DATA_CACHE_DIR
+from src.services.metrics import metrics
+
+# Hors de src/models : les entrées écrites ou restaurées ne sont pas des modèles publiés
+DEFAULT_CACHE_DIR = os.environ.get("TRAINING_CACHE_DIR", os.path.join(DATA_CACHE_DIR, "training"))
+USAGE_FILE = "usage.json"
+# Rétention : les N artefacts les plus récents, et aucun plus vieux que MAX_AGE secondes (0 = sans limite)
+DEFAULT_KEEP = int(os.environ.get("TRAINING_CACHE_KEEP", 5))
+DEFAULT_MAX_AGE = float(os.environ.get("TRAINING_CACHE_MAX_AGE", 0))
+
+
+def _library_version() -> str:
+    try:
+        return package_metadata.version("scikit-learn")
+    except package_metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def training_key(X_train: np.ndarray, y_train: np.ndarray, params: dict, metadata: Optional[dict] = None) -> str:
+    """
+    Content address of a training run.
+
+    Hashes the training features (dtype, shape and bytes), the labels, the
+    effective estimator parameters, the scikit-learn version and the
+    `metadata` written in the artifact header: the same key means the same
+    inputs to `fit` and the same artifact. `n_jobs` and `verbose` are left
+    out: they change how the trees are fitted, not the trees.
+
+    Returns:
+        str: The hexadecimal SHA-256 key.
+    """
+    X_train = np.ascontiguousarray(X_train)
+    digest = hashlib.sha256()
+    digest.update(f"{_library_version()};{X_train.dtype.str};{X_train.shape};".encode())
+    if X_train.dtype.hasobject:
+        digest.update("\x1f".join(map(str, X_train.ravel())).encode())
+    else:
+        digest.update(X_train.tobytes())
+    digest.update(b";")
+    digest.update("\x1f".join(map(str, np.asarray(y_train).ravel())).encode())
+    params = {name: value for name, value in params.items() if name not in ("n_jobs", "verbose")}
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    if metadata:
+        digest.update(json.dumps(metadata, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class TrainingCache:
+    """
+    Content-addressed store of trained model artifacts.
+
+    Each artifact is kept as `<key>.pkl` in `directory`, where the key is
+    `training_key` of its inputs. Entries are copies of the published model
+    file rather than links to it, so a model file rewritten in place can
+    never alter a cached artifact.
+
+    Old entries are garbage-collected after each store: only the `keep` most
+    recently used are kept, and none unused for more than `max_age` seconds.
+    The last use of each entry is recorded in `usage.json` rather than in
+    file times, so a hit never touches the artifacts.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, keep: int = DEFAULT_KEEP, max_age: float = DEFAULT_MAX_AGE) -> None:
+        self.directory = directory
+        self.keep = keep
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.collected = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _usage_path(self) -> str:
+        return os.path.join(self.directory, USAGE_FILE)
+
+    def _read_usage(self) -> Dict[str, float]:
+        try:
+            with open(self._usage_path()) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_usage(self, usage: Dict[str, float]) -> None:
+        tmp_path = f"{self._usage_path()}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(usage, f)
+        os.replace(tmp_path, self._usage_path())
+
+    def _mark_used(self, key: str) -> None:
+        # Simple indication pour la rétention : une mise à jour perdue entre processus est sans gravité
+        with self._lock:
+            usage = self._read_usage()
+            usage[key] = time.time()
+            self._write_usage(usage)
+
+    def last_used(self, entry: os.DirEntry, usage: Optional[Dict[str, float]] = None) -> float:
+        """Time of the last store or restore of an entry (its file time if it was never recorded)."""
+        usage = self._read_usage() if usage is None else usage
+        return usage.get(entry.name[:-len(".pkl")], entry.stat().st_mtime)
+
+    @staticmethod
+    def _copy(source: str, destination: str) -> None:
+        # Copie vers un fichier temporaire puis renommage : jamais de fichier à moitié écrit
+        tmp_path = f"{destination}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+
+    def restore(self, key: str, model_path: str) -> bool:
+        """
+        Publish the cached artifact of `key` at `model_path`.
+
+        Nothing is written to `model_path` if it already holds that
+        artifact, so the file watchers of the servers do not reload an
+        unchanged model; the cache entry itself is never modified.
+
+        Returns:
+            bool: True on a hit, False if no artifact is stored under `key`.
+        """
+        entry = self.path(key)
+        try:
+            if not (os.path.exists(model_path) and filecmp.cmp(entry, model_path, shallow=False)):
+                os.makedirs(os.path.dirname(os.path.abspath(model_path)), exist_ok=True)
+                self._copy(entry, model_path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False
+        self._mark_used(key)
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, model_path: str) -> str:
+        """
+        Keep the artifact published at `model_path` under `key`, then collect old entries.
+
+        Returns:
+            str: The path of the cache entry.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self.path(key)
+        self._copy(model_path, entry)
+        self._mark_used(key)
+        with self._lock:
+            self.stores += 1
+        self.gc()
+        return entry
+
+    def entries(self) -> List[os.DirEntry]:
+        """Cache entries, most recently used first."""
+        try:
+            with os.scandir(self.directory) as scan:
+                files = [entry for entry in scan if entry.name.endswith(".pkl") and entry.is_file()]
+        except FileNotFoundError:
+            return []
+        usage = self._read_usage()
+        return sorted(files, key=lambda entry: self.last_used(entry, usage), reverse=True)
+
+    def gc(self, now: Optional[float] = None) -> int:
+        """
+        Delete the entries outside the retention policy.
+
+        Returns:
+            int: The number of entries deleted.
+        """
+        now = time.time() if now is None else now
+        removed = 0
+        usage = self._read_usage()
+        for position, entry in enumerate(self.entries()):
+            if position >= self.keep or (self.max_age and now - self.last_used(entry, usage) > self.max_age):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self.collected += removed
+            if removed:
+                # Oublie les clés dont l'artefact n'existe plus
+                usage = self._read_usage()
+                self._write_usage({key: used for key, used in usage.items() if os.path.exists(self.path(key))})
+        return removed
+
+    def clear(self) -> None:
+        """Delete every entry and reset the counters."""
+        for entry in self.entries():
+            os.remove(entry.path)
+        with self._lock:
+            try:
+                os.remove(self._usage_path())
+            except FileNotFoundError:
+                pass
+            self._reset_counters()
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: Hits, misses, stores, collected entries, and the entries on disk.
+        """
+        entries = self.entries()
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "collected": self.collected,
+                "entries": len(entries),
+                "bytes": sum(entry.stat().st_size for entry in entries),
+                "keep": self.keep,
+                "max_age": self.max_age,
+                "directory": os.path.abspath(self.directory),
+            }
+
+
+training_cache = TrainingCache()
+metrics.register_cache("training", training_cache.stats)
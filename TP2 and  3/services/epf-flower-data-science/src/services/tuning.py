@@ -0,0 +1,370 @@
+import hashlib
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.services import parameters as parameters_service
+from src.services.config_store import model_parameters_store
+from src.services.data import load_iris_dataset, load_model_parameters, process_iris_dataset, split_iris_dataset
+from src.services.dataset_cache import DEFAULT_CACHE_DIR
+from src.services.datasets import dataset_engine
+from src.services.executors import get_executor
+from src.services.incremental import holdout_mask, row_fingerprints
+from src.services.jobs import job_manager
+from src.services.metrics import metrics
+
+DEFAULT_TUNING_DIR = os.environ.get("TUNING_CACHE_DIR", os.path.join(DEFAULT_CACHE_DIR, "tuning"))
+STRATEGIES = ("grid", "halving")
+FIRESTORE_FIELDS = ("n_estimators", "criterion")
+SEED = 42
+# Jeu de données entraîné par /train-iris-model (train_model), et non par le moteur de datasets
+IRIS_DATASET = "iris"
+
+# Tableaux mappés en mémoire, ouverts une fois par processus de travail
+_shared_arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+_shared_lock = threading.Lock()
+
+
+def _open_shared(data_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    with _shared_lock:
+        if data_path not in _shared_arrays:
+            _shared_arrays[data_path] = (
+                np.load(f"{data_path}-X.npy", mmap_mode="r"),
+                np.load(f"{data_path}-y.npy", mmap_mode="r"),
+            )
+        return _shared_arrays[data_path]
+
+
+def _subsample(n_total: int, n_rows: int) -> np.ndarray:
+    # Même sous-échantillon pour tous les candidats d'un tour (et entre recherches)
+    return np.sort(np.random.default_rng(SEED).permutation(n_total)[:n_rows])
+
+
+def evaluate_fold(data_path: str, params: dict, n_rows: int, cv: int, fold: int) -> float:
+    """
+    Fit a forest on all folds but one and score it on the remaining fold.
+
+    Runs in a worker of the CPU executor; the data is read from the shared
+    memory-mapped arrays written by `share_arrays`.
+
+    Args:
+        data_path (str): Prefix of the shared `-X.npy` / `-y.npy` files.
+        params (dict): Parameters of the RandomForestClassifier.
+        n_rows (int): Number of rows to use (successive halving budget).
+        cv (int): Number of folds.
+        fold (int): Index of the validation fold.
+
+    Returns:
+        float: The accuracy on the validation fold.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import StratifiedKFold
+
+    X, y = _open_shared(data_path)
+    rows = _subsample(len(y), n_rows) if n_rows < len(y) else np.arange(len(y))
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=SEED)
+    train, test = list(folds.split(rows, y[rows]))[fold]
+    # Un seul cœur par fit : le parallélisme vient du pool de processus
+    model = RandomForestClassifier(**{**params, "n_jobs": 1})
+    model.fit(X[rows[train]], y[rows[train]])
+    return float((model.predict(X[rows[test]]) == y[rows[test]]).mean())
+
+
+def param_hash(params: dict) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def validate_search(param_grid: Dict[str, List[Any]], strategy: str) -> None:
+    """
+    Check a search request before running it.
+
+    Raises:
+        ValueError: If the strategy or a parameter name is unknown, or a parameter has no value.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown search strategy: {strategy}")
+    unknown = sorted(set(param_grid) - set(RandomForestClassifier().get_params()))
+    if unknown:
+        raise ValueError(f"Unknown parameters: {unknown}")
+    if not param_grid or any(not values for values in param_grid.values()):
+        raise ValueError("Every parameter needs at least one value")
+
+
+def expand_grid(param_grid: Dict[str, List[Any]]) -> List[dict]:
+    """Return every combination of the values of `param_grid`."""
+    names = sorted(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[name] for name in names))]
+
+
+class Tuner:
+    """
+    Hyperparameter search for the RandomForestClassifier.
+
+    The training rows are written once per data digest to `.npy` files that
+    every worker memory-maps, so the pool shares one copy of the data; the
+    files are deleted when the last search using them ends.
+    Each (data, parameters, budget, fold) score is cached in memory and in a
+    JSON file per data digest: repeating a search, or a search that
+    overlaps a previous one, only fits the folds that were never scored.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_TUNING_DIR) -> None:
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._scores: Dict[str, Dict[str, float]] = {}
+        self._users: Dict[str, int] = {}
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def share_arrays(self, X: np.ndarray, y: np.ndarray) -> Tuple[str, str]:
+        """
+        Write the training data to memory-mappable files, once per content.
+
+        Every call must be paired with a call to `release`.
+
+        Returns:
+            Tuple[str, str]: The data digest and the prefix of its files.
+        """
+        X = np.ascontiguousarray(X)
+        y = np.ascontiguousarray(y)
+        digest = hashlib.sha256(X.tobytes() + y.tobytes() + str((X.shape, X.dtype, y.dtype)).encode()).hexdigest()[:16]
+        data_path = os.path.join(self.cache_dir, digest)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._lock:
+            self._users[digest] = self._users.get(digest, 0) + 1
+            for suffix, values in (("-X.npy", X), ("-y.npy", y)):
+                if not os.path.exists(data_path + suffix):
+                    tmp_path = f"{data_path}{suffix}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        np.save(f, values)
+                    os.replace(tmp_path, data_path + suffix)
+        return digest, data_path
+
+    def release(self, digest: str) -> None:
+        """Delete the shared files of `digest` once no running search uses them (the fold scores are kept)."""
+        with self._lock:
+            self._users[digest] -= 1
+            if self._users[digest]:
+                return
+            del self._users[digest]
+            data_path = os.path.join(self.cache_dir, digest)
+            with _shared_lock:
+                _shared_arrays.pop(data_path, None)
+            for suffix in ("-X.npy", "-y.npy"):
+                try:
+                    os.remove(data_path + suffix)
+                except FileNotFoundError:
+                    pass
+
+    def _scores_for(self, digest: str) -> Dict[str, float]:
+        if digest not in self._scores:
+            try:
+                with open(os.path.join(self.cache_dir, f"{digest}-scores.json")) as f:
+                    self._scores[digest] = json.load(f)
+            except (OSError, ValueError):
+                self._scores[digest] = {}
+        return self._scores[digest]
+
+    def _save_scores(self, digest: str) -> None:
+        path = os.path.join(self.cache_dir, f"{digest}-scores.json")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._scores[digest], f)
+        os.replace(tmp_path, path)
+
+    def evaluate(self, digest: str, data_path: str, candidates: List[dict], n_rows: int, cv: int) -> List[float]:
+        """
+        Score candidates by cross-validation, fitting only uncached folds.
+
+        Returns:
+            List[float]: The mean fold accuracy of each candidate.
+        """
+        keys = [[f"{param_hash(params)}:{n_rows}:{cv}:{fold}" for fold in range(cv)] for params in candidates]
+        with self._lock:
+            scores = self._scores_for(digest)
+            missing = {key: (params, fold) for params, folds in zip(candidates, keys)
+                       for fold, key in enumerate(folds) if key not in scores}
+            self.hits += sum(len(folds) for folds in keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            executor = get_executor("cpu")
+            futures = {key: executor.submit(evaluate_fold, data_path, params, n_rows, cv, fold)
+                       for key, (params, fold) in missing.items()}
+            results = {key: future.result() for key, future in futures.items()}
+            with self._lock:
+                scores = self._scores_for(digest)
+                scores.update(results)
+                self._save_scores(digest)
+
+        return [float(np.mean([scores[key] for key in folds])) for folds in keys]
+
+    def search(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        param_grid: Dict[str, List[Any]],
+        strategy: str = "grid",
+        cv: int = 3,
+        factor: int = 3,
+        min_rows: Optional[int] = None,
+    ) -> dict:
+        """
+        Search the best parameters, starting from those of `model_parameters.json`.
+
+        Args:
+            X (np.ndarray): Training features.
+            y (np.ndarray): Training labels or codes.
+            param_grid (Dict[str, List[Any]]): Values to try for each parameter.
+            strategy (str): "grid" scores every candidate on all rows;
+                "halving" scores them on a subsample, keeps the best
+                1/`factor` and multiplies the rows by `factor` each round.
+            cv (int): Number of cross-validation folds.
+            factor (int): Halving factor.
+            min_rows (int): Rows of the first halving round.
+
+        Returns:
+            dict: The best parameters and score, every evaluated candidate,
+            and the number of fold scores served from cache.
+
+        Raises:
+            ValueError: If the strategy or a parameter name is unknown.
+        """
+        validate_search(param_grid, strategy)
+
+        start = time.perf_counter()
+        hits, misses = self.hits, self.misses
+        base = load_model_parameters()
+        candidates = [{**base, **params} for params in expand_grid(param_grid)]
+        digest, data_path = self.share_arrays(X, y)
+        try:
+            n_total = len(y)
+            # Chaque fold doit contenir toutes les classes
+            smallest = max(cv * len(np.unique(y)), 2 * cv)
+
+            if strategy == "grid" or len(candidates) == 1:
+                rounds = [n_total]
+            else:
+                # Le dernier tour utilise toutes les lignes, chaque tour précédent `factor` fois moins
+                n_rounds = max(1, math.ceil(math.log(len(candidates), factor)))
+                first = max(min_rows or n_total // factor ** (n_rounds - 1), smallest)
+                rounds = sorted({min(n_total, first * factor ** i) for i in range(n_rounds)} | {n_total})
+
+            evaluated = []
+            remaining = candidates
+            for round_index, n_rows in enumerate(rounds):
+                scores = self.evaluate(digest, data_path, remaining, n_rows, cv)
+                evaluated.extend(
+                    {"params": {name: params[name] for name in param_grid}, "rows": n_rows, "score": score}
+                    for params, score in zip(remaining, scores)
+                )
+                # Tri stable : à score égal, l'ordre de la grille départage
+                order = sorted(range(len(remaining)), key=lambda i: -scores[i])
+                last = round_index == len(rounds) - 1
+                best_score = scores[order[0]]
+                remaining = [remaining[i] for i in order[:1 if last else max(1, math.ceil(len(remaining) / factor))]]
+        finally:
+            # Les scores restent en cache ; la copie partagée des données est supprimée
+            self.release(digest)
+        best = {name: remaining[0][name] for name in param_grid}
+
+        return {
+            "strategy": strategy,
+            "best_params": best,
+            "best_score": best_score,
+            "candidates": evaluated,
+            "rounds": rounds,
+            "fold_fits": self.misses - misses,
+            "fold_cache_hits": self.hits - hits,
+            "duration": time.perf_counter() - start,
+        }
+
+    def clear(self) -> None:
+        """Drop the in-memory scores and reset the counters (the files are kept)."""
+        with self._lock:
+            self._scores.clear()
+            self._reset_counters()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "cache_dir": os.path.abspath(self.cache_dir)}
+
+
+tuner = Tuner()
+metrics.register_cache("tuning_folds", tuner.stats)
+
+
+def apply_parameters(parameters: dict, sync_firestore: bool = False) -> None:
+    """
+    Write tuned parameters to `model_parameters.json`, used by every training.
+
+    Args:
+        parameters (dict): The RandomForestClassifier parameters to update.
+        sync_firestore (bool): Also update the Firestore "parameters" document
+            (only the fields it holds: n_estimators and criterion).
+    """
+    model_parameters_store.update(lambda config: config["RandomForestClassifier"].update(parameters))
+    if sync_firestore:
+        fields = {name: parameters[name] for name in FIRESTORE_FIELDS if name in parameters}
+        if fields:
+            parameters_service.update_parameters(fields)
+
+
+def training_rows(dataset: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the rows a dataset's model is trained on.
+
+    Iris is trained by `train_model` on the training split of
+    `split_iris_dataset` (every column but Species); the other datasets by
+    the dataset engine, on the rows its incremental split does not hold out.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The training features and target codes.
+    """
+    if dataset == IRIS_DATASET:
+        split_data = split_iris_dataset(process_iris_dataset(load_iris_dataset()))
+        # Les libellés (objets Python) ne se mappent pas en mémoire : codes entiers, même précision
+        _, codes = np.unique(split_data["y_train"], return_inverse=True)
+        return split_data["X_train"], codes.astype(np.int32)
+    _, X, y = dataset_engine.processed(dataset)
+    train = ~holdout_mask(row_fingerprints(X, y))
+    return X[train], y[train]
+
+
+def run_tuning(params: dict) -> dict:
+    """
+    Run a search on the training rows of a dataset. Task of the "tune-model" jobs.
+
+    The search runs on the same matrix as the training of the dataset (see
+    `training_rows`), so the test rows stay unseen.
+
+    Args:
+        params (dict): dataset, param_grid, strategy, cv, factor, min_rows,
+            apply (False by default) and sync_firestore.
+
+    Returns:
+        dict: The search result, and whether the winner was written back.
+    """
+    X, y = training_rows(params["dataset"])
+    result = tuner.search(
+        X, y, params["param_grid"], params.get("strategy", "grid"),
+        params.get("cv", 3), params.get("factor", 3), params.get("min_rows"),
+    )
+    if params.get("apply"):
+        apply_parameters(result["best_params"], params.get("sync_firestore", False))
+    result["applied"] = bool(params.get("apply"))
+    return result
+
+
+job_manager.register("tune-model", run_tuning)
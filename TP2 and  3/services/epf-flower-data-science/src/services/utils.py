@@ -0,0 +1,46 @@
+import bisect
+import threading
+from typing import Iterable
+
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed bucket upper bounds.
+
+    Buckets are cumulative, in the same way as Prometheus histograms: the
+    count reported for a bound includes every observation lower or equal to it.
+    """
+
+    def __init__(self, buckets: Iterable[float]) -> None:
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._sum = 0.0
+            self._count = 0
+
+    def snapshot(self) -> dict:
+        """
+        Return the current state of the histogram.
+
+        Returns:
+            dict: Cumulative counts per bucket bound, sum and count.
+        """
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.buckets + [float("inf")], self._counts):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+            return {"buckets": buckets, "sum": self._sum, "count": self._count}
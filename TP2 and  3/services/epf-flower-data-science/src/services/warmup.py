@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.services.logs import get_logger
+
+# eager : préchargement avant d'accepter des requêtes ; background : en parallèle ; lazy : à la première requête
+DEFAULT_MODE = os.environ.get("PRELOAD_MODE", "lazy")
+MODES = ("eager", "lazy", "background")
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+SKIPPED = "skipped"
+
+warmup_log = get_logger("warmup")
+
+
+class Warmup:
+    """
+    Startup phase preloading what the first requests would otherwise pay for.
+
+    Services register steps (import scikit-learn, parse the Iris CSV, open
+    the model...). A failing step is recorded and does not stop the others:
+    a model that is not trained yet is not a reason to refuse traffic.
+    """
+
+    def __init__(self, mode: str = DEFAULT_MODE) -> None:
+        self.mode = mode
+        self.status = PENDING
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.results: Dict[str, dict] = {}
+        self._steps: List[Tuple[str, Callable[[], object]]] = []
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, step: Callable[[], object]) -> None:
+        """Add a step, run in registration order."""
+        self._steps.append((name, step))
+
+    def run(self) -> None:
+        """Run every registered step in the calling thread."""
+        with self._lock:
+            self.status, self.started_at, self.results = RUNNING, time.time(), {}
+            self._done.clear()
+        for name, step in list(self._steps):
+            start = time.perf_counter()
+            error = None
+            try:
+                step()
+            except Exception as e:
+                error = getattr(e, "detail", None) or str(e) or type(e).__name__
+            self.results[name] = {"seconds": time.perf_counter() - start, "error": error}
+        with self._lock:
+            self.status, self.finished_at = READY, time.time()
+        self._done.set()
+        warmup_log.event("warmup_finished", mode=self.mode, duration_ms=round((self.finished_at - self.started_at) * 1000, 1),
+                         steps=self.results)
+
+    def start(self, mode: Optional[str] = None) -> None:
+        """
+        Startup hook of the application.
+
+        Args:
+            mode (str): "eager" runs the steps before the server accepts
+                requests, "background" in a daemon thread, "lazy" skips them.
+                Defaults to `PRELOAD_MODE`.
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        mode = mode or self.mode
+        if mode not in MODES:
+            raise ValueError(f"Unknown preload mode: {mode}")
+        self.mode = mode
+        if mode == "eager":
+            self.run()
+        elif mode == "background":
+            threading.Thread(target=self.run, name="warmup", daemon=True).start()
+        else:
+            with self._lock:
+                if self.status == PENDING:
+                    self.status = SKIPPED
+                    self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the warmup to finish (or be skipped); returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "status": self.status,
+                "seconds": self.finished_at - self.started_at if self.finished_at and self.started_at else None,
+                "steps": dict(self.results),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.status, self.started_at, self.finished_at, self.results = PENDING, None, None, {}
+        self._done.clear()
+
+
+warmup = Warmup()
@@ -0,0 +1,70 @@
+import os
+import threading
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from src.services.logs import get_logger
+
+# Modèles publiés que le maître charge avant de forker : seuls leurs changements justifient un rechargement
+DEFAULT_MODEL_PATHS = (os.path.join(os.path.dirname(__file__), '../models/iris_model.pkl'),)
+# Secondes entre deux inspections des modèles ; 0 désactive le rechargement
+MODEL_RELOAD_INTERVAL = float(os.environ.get("MODEL_RELOAD_INTERVAL", 0))
+
+watcher_log = get_logger("watcher")
+
+
+class ArtifactWatcher:
+    """
+    Detect new or replaced versions of published model artifacts.
+
+    Only the given paths are watched, not the folders around them: the
+    training cache and the models of the datasets, which the workers load
+    on demand, never trigger a reload. Artifacts are written to a temporary
+    file then renamed, so a changed (mtime, size) means a complete new
+    version. The first scan only records the current state.
+    """
+
+    def __init__(self, paths: Sequence[str] = DEFAULT_MODEL_PATHS) -> None:
+        self.paths = [os.path.abspath(path) for path in paths]
+        self._snapshot: Optional[Dict[str, Tuple[int, int]]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> bool:
+        """Stat the artifacts; True if one appeared or changed since the previous scan."""
+        snapshot = self.scan()
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is None:
+            return False
+        return any(previous.get(path) != version for path, version in snapshot.items())
+
+    def start(self, on_change: Callable[[], None], interval: float = MODEL_RELOAD_INTERVAL) -> None:
+        """Call `on_change` from a daemon thread each time `poll` sees a new artifact."""
+        if interval <= 0 or self._thread is not None:
+            return
+        self.poll()
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                if self.poll():
+                    watcher_log.event("artifact_changed", paths=self.paths)
+                    on_change()
+
+        self._thread = threading.Thread(target=run, name="artifact-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._stop.clear()
@@ -0,0 +1,41 @@
+import os
+import sys
+import pytest
+
+# Les tests remplacent souvent builtins.open par un mock : le travail CPU reste
+# donc dans des threads du processus de test plutôt que dans un pool de processus.
+os.environ.setdefault("CPU_EXECUTOR_BACKEND", "thread")
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from src.services.config_store import config_store
+from src.services.dataset_cache import dataset_cache
+from src.services.datasets import dataset_engine
+from src.services.jobs import JobStore, job_manager
+from src.services.model_registry import model_registry
+from src.services.parameters import set_firestore_client
+from src.services.prediction_cache import prediction_cache
+from src.services.training_cache import training_cache
+from src.services.tuning import tuner
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Chaque test relit les fichiers (éventuellement mockés) au lieu d'un cache d'un autre test
+    config_store.clear()
+    dataset_cache.clear()
+    dataset_engine.clear()
+    model_registry.clear()
+    prediction_cache.clear()
+    set_firestore_client(None)
+    yield
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    # Les caches disque et la base des jobs vont dans tmp_path, jamais dans src/data
+    state_dir = tmp_path / "state"
+    monkeypatch.setattr(dataset_cache, "cache_dir", str(state_dir / "cache"))
+    monkeypatch.setattr(training_cache, "directory", str(state_dir / "cache" / "training"))
+    monkeypatch.setattr(tuner, "cache_dir", str(state_dir / "cache" / "tuning"))
+    os.makedirs(state_dir, exist_ok=True)
+    monkeypatch.setattr(job_manager, "store", JobStore(str(state_dir / "jobs.sqlite")))
+    yield
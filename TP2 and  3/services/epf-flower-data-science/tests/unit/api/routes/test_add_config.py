@@ -10,6 +10,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.
 
 from src.api.routes.data import router, DatasetInfo
 from src.app import get_application
+from src.services.config_store import ConfigStore
 
 
 app = get_application()
@@ -28,25 +29,34 @@ def mock_config_file():
     with patch("builtins.open", mock_open(read_data=json.dumps(config_data))):
         yield
 
-def test_add_dataset_success(mock_config_file):
+@pytest.fixture
+def config_file(tmp_path):
+    # Vrai fichier temporaire : l'écriture atomique passe par un fichier temporaire et un renommage
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({
+        "iris": {
+            "name": "iris",
+            "url": "https://www.kaggle.com/datasets/uciml/iris"
+        }
+    }))
+    with patch("src.api.routes.data.config_store", ConfigStore(str(path))):
+        yield str(path)
+
+def test_add_dataset_success(config_file):
     new_dataset = {
         "name": "air_france_reviews",
         "url": "https://www.kaggle.com/api/v1/datasets/download/saharnazyaghoobpoor/air-france-reviews-dataset"
     }
-    with patch("builtins.open", mock_open()) as mocked_file:
-        response = client.post("/data/add-dataset", json=new_dataset)
-        assert response.status_code == 200
-        assert response.json() == {"message": "Dataset added successfully"}
-        
-        # Vérifiez que le fichier a été ouvert en mode écriture
-        mocked_file.assert_called_with(os.path.join(os.path.dirname(__file__), '../../config/config.json'), 'w')
-        
-        # Vérifiez que les données ont été écrites dans le fichier
-        handle = mocked_file()
-        handle.write.assert_called_once()
-        written_data = json.loads(handle.write.call_args[0][0])
-        assert new_dataset["name"] in written_data
-        assert written_data[new_dataset["name"]] == new_dataset
+    response = client.post("/data/add-dataset", json=new_dataset)
+    assert response.status_code == 200
+    assert response.json() == {"message": "Dataset added successfully"}
+
+    # Vérifiez que le fichier a été remplacé par la nouvelle version complète
+    with open(config_file) as f:
+        written_data = json.load(f)
+    assert written_data[new_dataset["name"]] == new_dataset
+    assert "iris" in written_data
+    assert not [f for f in os.listdir(os.path.dirname(config_file)) if f.endswith(".tmp")]
 
 def test_config_file_not_found():
     with patch("os.path.exists", return_value=False):
@@ -68,13 +78,19 @@ def test_error_decoding_json():
         assert response.status_code == 400
         assert response.json() == {"detail": "Error decoding JSON file"}
 
-def test_error_writing_to_config_file(mock_config_file):
+def test_error_writing_to_config_file(config_file):
     new_dataset = {
         "name": "air_france_reviews",
         "url": "https://www.kaggle.com/api/v1/datasets/download/saharnazyaghoobpoor/air-france-reviews-dataset"
     }
-    with patch("builtins.open", mock_open()) as mocked_file:
-        mocked_file.side_effect = Exception("Write error")
+    with open(config_file) as f:
+        original = f.read()
+    with patch("os.replace", side_effect=Exception("Write error")):
         response = client.post("/data/add-dataset", json=new_dataset)
-        assert response.status_code == 500
-        assert response.json() == {"detail": "Error writing to config file: Write error"}
\ No newline at end of file
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Error writing to config file: Write error"}
+
+    # Le fichier d'origine est intact et le fichier temporaire supprimé
+    with open(config_file) as f:
+        assert f.read() == original
+    assert not [f for f in os.listdir(os.path.dirname(config_file)) if f.endswith(".tmp")]
@@ -0,0 +1,159 @@
+import json
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.artifacts import ModelArtifact, dump_artifact, read_header
+from src.services.config_store import ConfigStore
+from src.services.datasets import DatasetEngine
+from src.services.model_registry import ModelRegistry
+
+app = get_application()
+client = TestClient(app)
+
+CLASSES = ("setosa", "versicolor", "virginica")
+
+
+def make_rows(n, seed):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 3, n)
+    X = (rng.normal(size=(n, 4)) * 0.5 + y[:, np.newaxis]).astype(np.float32)
+    return X, np.asarray(CLASSES)[y]
+
+
+@pytest.fixture
+def forest():
+    X, y = make_rows(300, 0)
+    return RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+
+
+def test_packed_artifact_is_loaded_lazily(forest, tmp_path):
+    model_path = str(tmp_path / "model.pkl")
+    ModelRegistry().save(forest, model_path, {"metrics": {"holdout_accuracy": 0.9}})
+
+    registry = ModelRegistry()
+    loaded = registry.get(model_path)
+    assert loaded.artifact.packed
+    assert registry.stats()["estimators_loaded"] == 0
+
+    # Le moteur compilé lit les tableaux mappés, sans désérialiser l'estimateur
+    X, _ = make_rows(50, 1)
+    compiled = registry.predictor(loaded, "compiled")
+    assert not compiled.feature.flags.writeable
+    assert (compiled.predict(X) == forest.predict(X)).all()
+    assert registry.stats()["estimators_loaded"] == 0
+
+    file_bytes = registry.stats()["bytes"]
+    assert (registry.predictor(loaded, "sklearn").predict(X) == forest.predict(X)).all()
+    assert registry.stats()["estimators_loaded"] == 1
+    # L'estimateur désérialisé compte dans le budget, en plus des tableaux mappés
+    assert registry.stats()["bytes"] == file_bytes + loaded.artifact.header["sections"]["estimator"]["raw_nbytes"]
+    assert loaded.artifact.verify()
+
+
+def test_materialized_estimator_counts_in_budget(forest, tmp_path):
+    old_path, new_path = str(tmp_path / "old.pkl"), str(tmp_path / "new.pkl")
+    ModelRegistry().save(forest, old_path)
+    ModelRegistry().save(forest, new_path)
+    registry = ModelRegistry()
+    old = registry.get(old_path)
+    registry.get(new_path)
+    # Deux fichiers tiennent dans le budget, pas un estimateur désérialisé en plus
+    registry.max_bytes = registry.stats()["bytes"] + old.artifact.header["sections"]["estimator"]["raw_nbytes"] // 2
+    # Ancienne version remplacée : elle n'est plus courante et peut être évincée
+    ModelRegistry().save(RandomForestClassifier(n_estimators=2, random_state=0).fit(*make_rows(30, 2)), old_path)
+    registry.get(old_path)
+    assert registry.stats()["evictions"] == 0
+    registry.predictor(registry.get(new_path), "sklearn")
+    assert registry.stats()["evictions"] == 1 and registry.stats()["entries"] == 2
+
+
+def test_header_is_read_without_the_model(forest, tmp_path):
+    model_path = str(tmp_path / "model.pkl")
+    ModelRegistry().save(forest, model_path, {"schema": {"target": "species"}, "metrics": {"holdout_accuracy": 0.9}})
+
+    header = read_header(model_path)
+    assert header["schema"]["classes"] == list(CLASSES)
+    assert header["schema"]["target"] == "species"
+    assert header["params"]["n_estimators"] == 10
+    assert header["metrics"] == {"holdout_accuracy": 0.9}
+    assert header["forest"]["n_trees"] == 10
+    assert len(header["sha256"]) == 64
+
+    metadata = ModelRegistry().metadata(model_path)
+    assert "sections" not in metadata
+    assert metadata["sha256"] == header["sha256"]
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib", "lzma", "bz2"])
+def test_compression_options(forest, compression, tmp_path):
+    path = tmp_path / "model.pkl"
+    path.write_bytes(dump_artifact(forest, compression=compression))
+    artifact = ModelArtifact.open(str(path))
+    section = artifact.header["sections"]["estimator"]
+    assert section["compression"] == compression
+    if compression != "none":
+        assert section["nbytes"] < section["raw_nbytes"]
+    X, _ = make_rows(20, 2)
+    assert (artifact.estimator.predict(X) == forest.predict(X)).all()
+
+
+def test_invalid_artifact_options(forest, tmp_path):
+    with pytest.raises(ValueError, match="compression"):
+        dump_artifact(forest, compression="zstd")
+    with pytest.raises(ValueError, match="format"):
+        ModelRegistry().save(forest, str(tmp_path / "model.pkl"), artifact_format="onnx")
+
+
+def test_legacy_pickle_is_still_served(forest, tmp_path):
+    model_path = str(tmp_path / "model.pkl")
+    joblib.dump(forest, model_path)
+    registry = ModelRegistry()
+    loaded = registry.get(model_path)
+    assert not loaded.artifact.packed
+    X, _ = make_rows(20, 2)
+    assert (registry.predictor(loaded, "compiled").predict(X) == forest.predict(X)).all()
+    assert registry.metadata(model_path)["params"]["n_estimators"] == 10
+
+    registry.save(forest, model_path, artifact_format="pickle")
+    assert joblib.load(model_path).n_estimators == 10
+
+
+@pytest.fixture
+def engine(tmp_path):
+    X, y = make_rows(300, 0)
+    df = pd.DataFrame(X, columns=["a", "b", "c", "d"])
+    df["label"] = y
+    (tmp_path / "flowers").mkdir()
+    df.to_csv(tmp_path / "flowers" / "flowers.csv", index=False)
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"flowers": {"name": "flowers", "url": "https://example.com/flowers.csv"}}))
+    engine = DatasetEngine(ConfigStore(str(config_path)), str(tmp_path), str(tmp_path / "models"))
+    with patch("src.services.datasets.dataset_engine", engine), patch("src.api.routes.datasets.dataset_engine", engine):
+        yield engine
+
+
+def test_dataset_model_metadata_endpoint(engine):
+    assert client.get("/datasets/flowers/model").status_code == 404
+
+    response = client.post("/datasets/flowers/train?wait=true")
+    assert response.status_code == 200
+
+    response = client.get("/datasets/flowers/model")
+    assert response.status_code == 200
+    metadata = response.json()
+    assert metadata["dataset"] == "flowers"
+    assert metadata["schema"]["feature_names"] == ["a", "b", "c", "d"]
+    assert metadata["schema"]["classes"] == list(CLASSES)
+    assert metadata["metrics"]["holdout_accuracy"] > 0.8
+    assert metadata["version"] == 1
@@ -0,0 +1,80 @@
+import os
+import asyncio
+import threading
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.services.batching import PredictionBatcher
+from src.app import get_application
+
+app = get_application()
+
+client = TestClient(app)
+
+class RecordingModel:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, X):
+        self.calls.append(X.shape)
+        return X[:, 0].tolist()
+
+def submit_all(batcher, matrices):
+    async def run():
+        return await asyncio.gather(*(batcher.submit(matrix) for matrix in matrices))
+    return asyncio.run(run())
+
+def test_concurrent_requests_are_merged():
+    model = RecordingModel()
+    batcher = PredictionBatcher(model, max_batch_size=64, max_wait_ms=20, executor_kind="io")
+    matrices = [np.full((2, 4), i, dtype=float) for i in range(5)]
+    results = submit_all(batcher, matrices)
+    assert model.calls == [(10, 4)]
+    assert results == [[float(i), float(i)] for i in range(5)]
+    assert batcher.stats()["batch_size"]["count"] == 1
+    assert batcher.stats()["queue_wait_seconds"]["count"] == 5
+
+def test_max_batch_size_splits_batches():
+    model = RecordingModel()
+    batcher = PredictionBatcher(model, max_batch_size=4, max_wait_ms=20, executor_kind="io")
+    results = submit_all(batcher, [np.full((2, 4), i, dtype=float) for i in range(4)])
+    assert model.calls == [(4, 4), (4, 4)]
+    assert results[3] == [3.0, 3.0]
+
+def test_batches_are_scored_in_parallel():
+    # Chaque lot attend l'autre : avec un seul lot à la fois, la barrière expirerait
+    barrier = threading.Barrier(2, timeout=5)
+    def model(X):
+        barrier.wait()
+        return X[:, 0].tolist()
+    batcher = PredictionBatcher(model, max_batch_size=2, max_wait_ms=1, executor_kind="io", max_in_flight=2)
+    results = submit_all(batcher, [np.full((2, 4), i, dtype=float) for i in range(2)])
+    assert results == [[0.0, 0.0], [1.0, 1.0]]
+
+def test_late_requests_join_the_batch():
+    model = RecordingModel()
+    batcher = PredictionBatcher(model, max_batch_size=64, max_wait_ms=50, executor_kind="io")
+    async def run():
+        first = asyncio.ensure_future(batcher.submit(np.zeros((1, 4))))
+        await asyncio.sleep(0.01)
+        return await asyncio.gather(first, batcher.submit(np.ones((1, 4))))
+    assert asyncio.run(run()) == [[0.0], [1.0]]
+    assert model.calls == [(2, 4)]
+
+def test_errors_are_sent_to_every_caller():
+    def failing_model(X):
+        raise ValueError("boom")
+    batcher = PredictionBatcher(failing_model, max_wait_ms=5, executor_kind="io")
+    with pytest.raises(ValueError):
+        submit_all(batcher, [np.ones((1, 4)), np.ones((1, 4))])
+
+def test_predict_batching_stats_endpoint():
+    response = client.get("/predict-batching-stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert "batch_size" in data
+    assert "queue_wait_seconds" in data
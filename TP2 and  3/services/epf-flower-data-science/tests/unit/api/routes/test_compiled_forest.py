@@ -0,0 +1,50 @@
+import os
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.services.compiled_forest import CompiledForest
+from src.services.model_registry import ModelRegistry
+from src.app import get_application
+
+app = get_application()
+
+client = TestClient(app)
+
+@pytest.fixture
+def forest():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = np.where(X[:, 0] + X[:, 1] > 0, "a", np.where(X[:, 2] > 0.5, "b", "c"))
+    return RandomForestClassifier(n_estimators=25, random_state=0).fit(X, y)
+
+def test_predictions_match_sklearn(forest):
+    X = np.random.default_rng(1).normal(size=(2000, 4))
+    compiled = CompiledForest.from_sklearn(forest)
+    assert np.array_equal(compiled.predict_proba(X), forest.predict_proba(X))
+    assert (compiled.predict(X) == forest.predict(X)).all()
+
+def test_wrong_number_of_features(forest):
+    with pytest.raises(ValueError):
+        CompiledForest.from_sklearn(forest).predict(np.ones((1, 3)))
+
+def test_registry_engine_is_selected_per_model(forest, tmp_path):
+    registry = ModelRegistry()
+    compiled_path, sklearn_path = str(tmp_path / "compiled.pkl"), str(tmp_path / "sklearn.pkl")
+    registry.save(forest, compiled_path)
+    registry.save(forest, sklearn_path)
+    registry.set_engine(compiled_path, "compiled")
+
+    assert isinstance(registry.predictor(registry.get(compiled_path)), CompiledForest)
+    assert registry.predictor(registry.get(sklearn_path)) is forest
+    # La forêt compilée est réutilisée tant que la version ne change pas
+    assert registry.predictor(registry.get(compiled_path)) is registry.predictor(registry.get(compiled_path))
+
+def test_unknown_engine():
+    response = client.put("/inference-engine", json={"engine": "gpu"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unknown inference engine: gpu"}
@@ -0,0 +1,139 @@
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.config_store import ConfigStore
+
+app = get_application()
+client = TestClient(app)
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"iris": {"name": "iris", "url": "https://www.kaggle.com/datasets/uciml/iris"}}))
+    return str(path)
+
+
+def _add_datasets(path, prefix, count):
+    store = ConfigStore(path)
+    for i in range(count):
+        name = f"{prefix}-{i}"
+        store.update(lambda config: config.update({name: {"name": name, "url": f"https://example.com/{name}"}}))
+
+
+def test_read_is_cached_until_the_file_changes(config_path):
+    store = ConfigStore(config_path)
+    assert store.read()["iris"]["name"] == "iris"
+    store.read()
+    assert store.stats()["reads"] == 1
+    assert store.stats()["hits"] == 1
+
+    # Une autre instance (autre processus) modifie le fichier : la vue en cache est invalidée
+    ConfigStore(config_path).update(lambda config: config.update({"other": {"name": "other", "url": "u"}}))
+    assert "other" in store.read()
+    assert store.stats()["reads"] == 2
+
+
+def test_read_returns_a_copy(config_path):
+    store = ConfigStore(config_path)
+    store.read()["iris"]["url"] = "changed"
+    assert store.read()["iris"]["url"] == "https://www.kaggle.com/datasets/uciml/iris"
+
+
+def test_failed_change_writes_nothing(config_path):
+    store = ConfigStore(config_path)
+
+    def change(config):
+        config["iris"] = None
+        raise KeyError("abort")
+
+    with pytest.raises(KeyError):
+        store.update(change)
+    assert store.read()["iris"]["name"] == "iris"
+    assert store.stats()["writes"] == 0
+
+
+def test_subscribers_are_notified(config_path):
+    store = ConfigStore(config_path)
+    received = []
+    unsubscribe = store.subscribe(received.append)
+
+    store.update(lambda config: config.update({"a": {"name": "a", "url": "u"}}))
+    unsubscribe()
+    store.update(lambda config: config.update({"b": {"name": "b", "url": "u"}}))
+
+    assert len(received) == 1
+    assert "a" in received[0] and "b" not in received[0]
+
+
+def test_concurrent_writers_do_not_lose_updates(config_path):
+    store = ConfigStore(config_path)
+    stop = threading.Event()
+    torn_reads = []
+
+    def reader():
+        # Un lecteur ne doit jamais voir un fichier à moitié écrit
+        while not stop.is_set():
+            with open(config_path) as f:
+                try:
+                    json.load(f)
+                except json.JSONDecodeError:
+                    torn_reads.append(True)
+
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    try:
+        def add(i):
+            name = f"dataset-{i}"
+            store.update(lambda config: config.update({name: {"name": name, "url": f"https://example.com/{name}"}}))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(add, range(200)))
+    finally:
+        stop.set()
+        reader_thread.join()
+
+    config = ConfigStore(config_path).read()
+    assert len(config) == 201
+    assert all(f"dataset-{i}" in config for i in range(200))
+    assert not torn_reads
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_concurrent_processes_do_not_lose_updates(config_path):
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_add_datasets, args=(config_path, f"p{n}", 25)) for n in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    config = ConfigStore(config_path).read()
+    assert len(config) == 1 + 4 * 25
+
+
+def test_concurrent_add_dataset_requests(config_path):
+    with patch("src.api.routes.data.config_store", ConfigStore(config_path)):
+        def add(i):
+            return client.post("/add-dataset", json={"name": f"d{i}", "url": f"https://example.com/d{i}"})
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(add, range(40)))
+
+        assert all(response.status_code == 200 for response in responses)
+        assert client.get("/config-store-stats").json()["writes"] == 40
+
+    with open(config_path) as f:
+        assert len(json.load(f)) == 41
@@ -0,0 +1,68 @@
+import os
+import pytest
+from fastapi.testclient import TestClient
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.services.dataset_cache import DatasetCache
+from src.app import get_application
+
+app = get_application()
+
+client = TestClient(app)
+
+CSV = """Id,SepalLengthCm,Species
+1,5.1,Iris-setosa
+2,7.0,Iris-versicolor
+"""
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "Iris.csv"
+    path.write_text(CSV)
+    return str(path)
+
+def test_csv_parsed_once(csv_path, tmp_path):
+    cache = DatasetCache(str(tmp_path / "cache"))
+    first = cache.get(csv_path)
+    second = cache.get(csv_path)
+    assert first is second
+    assert first["Species"].tolist() == ["Iris-setosa", "Iris-versicolor"]
+    assert cache.stats()["parses"] == 1
+    assert cache.stats()["hits"] == 1
+
+def test_columnar_files_shared_between_caches(csv_path, tmp_path):
+    DatasetCache(str(tmp_path / "cache")).get(csv_path)
+    other = DatasetCache(str(tmp_path / "cache"))
+    df = other.get(csv_path)
+    assert other.stats()["disk_hits"] == 1
+    assert other.stats()["parses"] == 0
+    assert df["SepalLengthCm"].tolist() == [5.1, 7.0]
+    assert not df["Id"].to_numpy().flags.writeable
+
+def test_invalidated_when_file_changes(csv_path, tmp_path):
+    cache = DatasetCache(str(tmp_path / "cache"))
+    cache.get(csv_path)
+    with open(csv_path, "a") as csv_file:
+        csv_file.write("3,6.3,Iris-virginica\n")
+    df = cache.get(csv_path)
+    assert len(df) == 3
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["parses"] == 2
+
+def test_entries_of_deleted_files_are_evicted(csv_path, tmp_path):
+    cache = DatasetCache(str(tmp_path / "cache"))
+    gone = tmp_path / "gone.csv"
+    gone.write_text(CSV)
+    cache.get(str(gone))
+    os.makedirs(tmp_path / "cache" / "training")
+    gone.unlink()
+    cache.get(csv_path)
+    assert sorted(os.listdir(tmp_path / "cache")) == [os.path.basename(cache._columns_dir(csv_path)), "training"]
+    assert cache.stats()["evictions"] == 1
+
+def test_dataset_cache_stats_endpoint():
+    response = client.get("/dataset-cache-stats")
+    assert response.status_code == 200
+    assert {"hits", "misses", "parses", "disk_hits"} <= set(response.json())
@@ -0,0 +1,156 @@
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.config_store import ConfigStore
+from src.services.dataset_cache import dataset_cache
+from src.services.datasets import DatasetEngine
+from src.services.executors import set_executor
+
+app = get_application()
+client = TestClient(app)
+
+IRIS = """Id,SepalLengthCm,SepalWidthCm,PetalLengthCm,PetalWidthCm,Species
+1,5.1,3.5,1.4,0.2,Iris-setosa
+2,4.9,3.0,1.4,0.2,Iris-setosa
+3,7.0,3.2,4.7,1.4,Iris-versicolor
+4,6.4,3.2,4.5,1.5,Iris-versicolor
+5,6.3,3.3,6.0,2.5,Iris-virginica
+6,5.8,2.7,5.1,1.9,Iris-virginica
+"""
+
+WINE = "alcohol,acidity,color,quality\n" + "".join(f"{10 + i % 4}.5,{i % 3}.2,{'red' if i % 2 else 'white'},{i % 3}\n" for i in range(20))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    data_dir = tmp_path / "data"
+    (data_dir / "iris").mkdir(parents=True)
+    (data_dir / "iris" / "Iris.csv").write_text(IRIS)
+    (data_dir / "wine-quality").mkdir()
+    (data_dir / "wine-quality" / "winequality.csv").write_text(WINE)
+
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({
+        "iris": {"name": "iris", "url": "https://www.kaggle.com/datasets/uciml/iris"},
+        "wine": {"name": "wine", "url": "https://www.kaggle.com/datasets/x/wine-quality", "target": "quality"},
+        "missing": {"name": "missing", "url": "https://example.com/missing.csv"},
+    }))
+    engine = DatasetEngine(ConfigStore(str(config_path)), str(data_dir), str(tmp_path / "models"))
+    with patch("src.services.datasets.dataset_engine", engine), patch("src.api.routes.datasets.dataset_engine", engine):
+        yield engine
+
+
+def test_schema_is_inferred(engine):
+    schema = engine.schema("iris")
+    assert schema.target == "Species"
+    assert schema.id_column == "Id"
+    assert schema.feature_names == ["SepalLengthCm", "SepalWidthCm", "PetalLengthCm", "PetalWidthCm"]
+    assert schema.n_rows == 6
+
+
+def test_configured_target_and_kaggle_folder(engine):
+    schema = engine.schema("wine")
+    assert schema.target == "quality"
+    assert schema.id_column is None
+    # Les colonnes non numériques ne sont pas des features
+    assert schema.feature_names == ["alcohol", "acidity"]
+    assert schema.path.endswith(os.path.join("wine-quality", "winequality.csv"))
+
+
+def test_schema_is_cached_until_config_changes(engine):
+    engine.schema("wine")
+    engine.schema("wine")
+    assert engine.stats()["schema_inferences"] == 1
+    assert engine.stats()["schema_hits"] == 1
+
+    engine.store.update(lambda config: config["wine"].update({"target": "alcohol"}))
+    assert engine.schema("wine").target == "alcohol"
+    assert engine.stats()["schema_inferences"] == 2
+
+
+def test_datasets_have_separate_frames_and_models(engine):
+    assert list(engine.load("iris").columns)[-1] == "Species"
+    assert list(engine.load("wine").columns)[-1] == "quality"
+    assert dataset_cache.stats()["entries"] == 2
+    assert engine.model_path("iris") != engine.model_path("wine")
+
+
+def test_unknown_and_missing_datasets(engine):
+    response = client.get("/datasets/unknown/schema")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Dataset not found in config file"}
+
+    response = client.get("/datasets/missing/schema")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Dataset file not found"}
+
+    response = client.get("/datasets/..secret/schema")
+    assert response.status_code == 400
+
+
+def test_train_and_predict_endpoints(engine):
+    response = client.post("/datasets/iris/predict", json={"data": [[5.1, 3.5, 1.4, 0.2]]})
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Model file not found"}
+
+    for name in ("iris", "wine"):
+        response = client.post(f"/datasets/{name}/train?wait=true")
+        assert response.status_code == 200
+        assert os.path.exists(response.json()["model_path"])
+
+    response = client.post("/datasets/iris/predict", json={"data": [[5.1, 3.5, 1.4, 0.2], [6.3, 3.3, 6.0, 2.5]]})
+    assert response.status_code == 200
+    assert len(response.json()["predictions"]) == 2
+
+    response = client.post("/datasets/wine/predict", json={"data": [{"acidity": 1.2, "alcohol": 11.5}]})
+    assert response.status_code == 200
+    assert response.json()["predictions"][0] in (0, 1, 2)
+
+    response = client.post("/datasets/wine/predict", json={"data": [[1.0, 2.0, 3.0]]})
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def process_pool():
+    # Pool de processus réel, comme en production : ce qui lui est envoyé doit se sérialiser
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    set_executor("cpu", pool)
+    yield pool
+    set_executor("cpu", ThreadPoolExecutor(max_workers=1, thread_name_prefix="cpu"))
+    pool.shutdown(wait=True)
+
+
+def test_predict_endpoint_with_process_pool(engine, process_pool):
+    response = client.post("/datasets/iris/train?wait=true")
+    assert response.status_code == 200
+
+    rows = [[5.1, 3.5, 1.4, 0.2], [6.3, 3.3, 6.0, 2.5]]
+    response = client.post("/datasets/iris/predict", json={"data": rows})
+    assert response.status_code == 200
+    assert response.json()["predictions"] == engine.predict("iris", rows)
+
+    # Les erreurs des lignes restent des 400, celles du worker gardent leur statut
+    response = client.post("/datasets/iris/predict", json={"data": [[1.0, 2.0]]})
+    assert response.status_code == 400
+    response = client.post("/datasets/wine/predict", json={"data": [[11.5, 1.2]]})
+    assert response.status_code == 404
+
+
+def test_list_and_load_endpoints(engine):
+    response = client.get("/datasets")
+    assert response.status_code == 200
+    assert response.json()["datasets"] == ["iris", "wine", "missing"]
+
+    response = client.get("/datasets/wine/load?limit=3")
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 3
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.config_store import ConfigStore
+from src.services.downloads import DownloadManager
+
+app = get_application()
+client = TestClient(app)
+
+CONTENT = b"".join(f"{i},5.1,3.5,1.4,0.2,Iris-setosa\n".encode() for i in range(20000))
+
+
+class DatasetServer(ThreadingHTTPServer):
+    """Local stand-in for a dataset host: ETag, Range and If-None-Match support."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), DatasetHandler)
+        self.content = CONTENT
+        self.use_etag = True
+        self.delay = 0.0
+        self.requests = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/Iris.csv"
+
+    @property
+    def etag(self):
+        return '"' + hashlib.md5(self.content).hexdigest() + '"'
+
+
+class DatasetHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        time.sleep(server.delay)
+
+        if server.use_etag and self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body, status = server.content, 200
+        byte_range = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if byte_range and (if_range is None or if_range == server.etag):
+            start = int(byte_range.split("=")[1].rstrip("-"))
+            body, status = server.content[start:], 206
+
+        self.send_response(status)
+        if server.use_etag:
+            self.send_header("ETag", server.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    server = DatasetServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DownloadManager(data_dir=str(tmp_path))
+    yield manager
+    manager.shutdown()
+
+
+def download(manager, server, force=False):
+    manager.start("iris", server.url, force)
+    return manager.wait("iris", timeout=30)
+
+
+def test_download_writes_file_and_manifest(manager, server):
+    result = download(manager, server)
+    assert result.status == "succeeded"
+    assert result.bytes_done == result.total_bytes == len(CONTENT)
+    with open(result.path, "rb") as f:
+        assert f.read() == CONTENT
+
+    with open(os.path.join(manager.data_dir, "iris", ".download.json")) as f:
+        manifest = json.load(f)
+    assert manifest["etag"] == server.etag
+    assert manifest["sha256"] == hashlib.sha256(CONTENT).hexdigest()
+
+
+def test_unchanged_etag_skips_the_transfer(manager, server):
+    first = download(manager, server)
+    mtime = os.stat(first.path).st_mtime_ns
+
+    second = download(manager, server)
+    assert second.status == "skipped"
+    assert second.detail == "ETag unchanged"
+    assert server.requests[-1]["If-None-Match"] == server.etag
+    assert os.stat(second.path).st_mtime_ns == mtime
+
+    assert download(manager, server, force=True).status == "succeeded"
+
+
+def test_unchanged_content_hash_keeps_the_file(manager, server):
+    server.use_etag = False
+    first = download(manager, server)
+    mtime = os.stat(first.path).st_mtime_ns
+
+    second = download(manager, server)
+    assert second.status == "skipped"
+    assert second.detail == "Content hash unchanged"
+    assert os.stat(second.path).st_mtime_ns == mtime
+
+    server.content = CONTENT + b"150,5.9,3.0,5.1,1.8,Iris-virginica\n"
+    assert download(manager, server).status == "succeeded"
+    with open(first.path, "rb") as f:
+        assert f.read() == server.content
+
+
+def test_partial_download_is_resumed(manager, server):
+    target_dir = os.path.join(manager.data_dir, "iris")
+    os.makedirs(target_dir)
+    half = len(CONTENT) // 2
+    with open(os.path.join(target_dir, "Iris.csv.part"), "wb") as f:
+        f.write(CONTENT[:half])
+    with open(os.path.join(target_dir, "Iris.csv.part.json"), "w") as f:
+        json.dump({"url": server.url, "etag": server.etag}, f)
+
+    result = download(manager, server)
+    assert result.status == "succeeded"
+    assert result.resumed_from == half
+    assert server.requests[-1]["Range"] == f"bytes={half}-"
+    with open(result.path, "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_stale_partial_download_restarts(manager, server):
+    target_dir = os.path.join(manager.data_dir, "iris")
+    os.makedirs(target_dir)
+    with open(os.path.join(target_dir, "Iris.csv.part"), "wb") as f:
+        f.write(b"old content")
+    with open(os.path.join(target_dir, "Iris.csv.part.json"), "w") as f:
+        json.dump({"url": server.url, "etag": '"old"'}, f)
+
+    # If-Range ne correspond plus : le serveur renvoie tout le fichier
+    result = download(manager, server)
+    assert result.status == "succeeded"
+    with open(result.path, "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_concurrent_starts_share_one_transfer(manager, server):
+    server.delay = 0.3
+    downloads = [manager.start("iris", server.url) for _ in range(5)]
+    assert all(d is downloads[0] for d in downloads)
+    manager.wait("iris", timeout=30)
+    assert len(server.requests) == 1
+
+
+def test_download_endpoint(manager, server, tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"iris": {"name": "iris", "url": server.url}}))
+    with patch("src.api.routes.data.config_store", ConfigStore(str(config_path))), \
+            patch("src.api.routes.data.download_manager", manager):
+        response = client.get("/download-dataset?wait=true")
+        assert response.status_code == 200
+        assert response.json()["message"] == "Dataset downloaded successfully"
+
+        response = client.get("/download-dataset")
+        assert response.status_code == 202
+        manager.wait("iris", timeout=30)
+
+        response = client.get("/download-status/iris")
+        assert response.status_code == 200
+        assert response.json()["status"] == "skipped"
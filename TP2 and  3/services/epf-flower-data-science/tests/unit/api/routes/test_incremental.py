@@ -0,0 +1,142 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.config_store import ConfigStore
+from src.services.datasets import DatasetEngine
+from src.services.incremental import read_lineage, row_fingerprints, train_incremental
+from src.services.model_registry import model_registry
+
+app = get_application()
+client = TestClient(app)
+
+CLASSES = ("setosa", "versicolor", "virginica")
+
+
+def make_rows(n, seed, flip=False):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 3, n)
+    X = (rng.normal(size=(n, 4)) * 0.3 + y[:, np.newaxis] * 2.0).astype(np.float32)
+    if flip:
+        y = (y + 1) % 3
+    return X, y.astype(np.int32)
+
+
+def grow(X, y, rows):
+    return np.concatenate([X, rows[0]]), np.concatenate([y, rows[1]])
+
+
+def test_row_fingerprints():
+    X, y = make_rows(100, 0)
+    fingerprints = row_fingerprints(X, y)
+    assert fingerprints.dtype == np.uint64
+    assert len(np.unique(fingerprints)) == 100
+    assert (row_fingerprints(X[:10], y[:10]) == fingerprints[:10]).all()
+    y_changed = y.copy()
+    y_changed[0] = (y[0] + 1) % 3
+    assert row_fingerprints(X, y_changed)[0] != fingerprints[0]
+
+
+def test_incremental_training_lineage(tmp_path):
+    model_path = str(tmp_path / "model.pkl")
+    X, y = make_rows(1000, 0)
+
+    first = train_incremental(X, y, model_path, CLASSES)
+    assert first["mode"] == "full"
+    assert first["reason"] == "no previous model"
+
+    # Lignes ajoutées de la même distribution : on ajoute des arbres
+    X, y = grow(X, y, make_rows(100, 1))
+    second = train_incremental(X, y, model_path, CLASSES)
+    assert second["mode"] == "incremental"
+    assert 60 <= second["new_rows"] <= 100
+    assert second["trees_added"] >= 1
+    assert second["n_estimators"] == first["n_estimators"] + second["trees_added"]
+    assert second["parent"] == first["digest"]
+
+    model = model_registry.get(model_path).model
+    assert model.classes_.tolist() == list(CLASSES)
+    assert (model.predict(X[:50]) == np.asarray(CLASSES)[y[:50]]).mean() > 0.9
+
+    # Aucune nouvelle ligne : rien n'est réentraîné
+    third = train_incremental(X, y, model_path, CLASSES)
+    assert third["mode"] == "unchanged"
+    assert third["digest"] == second["digest"]
+
+    # Les nouvelles lignes contredisent le modèle : réentraînement complet
+    X, y = grow(X, y, make_rows(300, 2, flip=True))
+    fourth = train_incremental(X, y, model_path, CLASSES)
+    assert fourth["mode"] == "full"
+    assert fourth["reason"].startswith("drift")
+
+    fifth = train_incremental(X, y, model_path, CLASSES, mode="full")
+    assert fifth["reason"] == "requested"
+
+    assert [entry["version"] for entry in read_lineage(model_path)] == [1, 2, 3, 4, 5]
+
+
+def test_incremental_training_with_a_new_class(tmp_path):
+    model_path = str(tmp_path / "model.pkl")
+    X, y = make_rows(500, 0)
+    keep = y < 2
+    train_incremental(X[keep], y[keep], model_path, CLASSES)
+    assert model_registry.get(model_path).model.classes_.tolist() == ["setosa", "versicolor"]
+
+    entry = train_incremental(X, y, model_path, CLASSES, drift_threshold=1.0)
+    assert entry["mode"] == "full"
+    assert entry["reason"] == "new class"
+
+
+def test_forest_size_limit(tmp_path):
+    model_path = str(tmp_path / "model.pkl")
+    X, y = make_rows(500, 0)
+    train_incremental(X, y, model_path, CLASSES)
+    X, y = grow(X, y, make_rows(50, 1))
+    entry = train_incremental(X, y, model_path, CLASSES, max_trees_factor=1)
+    assert entry["mode"] == "full"
+    assert entry["reason"] == "forest size limit"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    X, y = make_rows(600, 0)
+    df = pd.DataFrame(X, columns=["a", "b", "c", "d"])
+    df["label"] = np.asarray(CLASSES)[y]
+    (tmp_path / "flowers").mkdir()
+    df.to_csv(tmp_path / "flowers" / "flowers.csv", index=False)
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"flowers": {"name": "flowers", "url": "https://example.com/flowers.csv"}}))
+    engine = DatasetEngine(ConfigStore(str(config_path)), str(tmp_path), str(tmp_path / "models"))
+    with patch("src.services.datasets.dataset_engine", engine), patch("src.api.routes.datasets.dataset_engine", engine):
+        yield engine
+
+
+def test_incremental_training_endpoint(engine):
+    response = client.post("/datasets/flowers/train?wait=true&mode=incremental")
+    assert response.status_code == 200
+    assert response.json()["lineage"]["mode"] == "full"
+
+    # Le dataset grandit : ajout de lignes à la fin du CSV
+    X, y = make_rows(60, 1)
+    df = pd.DataFrame(X, columns=["a", "b", "c", "d"])
+    df["label"] = np.asarray(CLASSES)[y]
+    df.to_csv(os.path.join(engine.data_dir, "flowers", "flowers.csv"), mode="a", header=False, index=False)
+
+    response = client.post("/datasets/flowers/train?wait=true&mode=incremental")
+    assert response.status_code == 200
+    assert response.json()["lineage"]["mode"] == "incremental"
+
+    response = client.get("/datasets/flowers/lineage")
+    assert [entry["mode"] for entry in response.json()["lineage"]] == ["full", "incremental"]
+
+    response = client.post("/datasets/flowers/train?mode=partial")
+    assert response.status_code == 400
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import subprocess
+import threading
+import pytest
+from fastapi.testclient import TestClient
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.services.jobs import Job, JobManager, JobStore, SUCCEEDED, FAILED, QUEUED, RUNNING, process_id
+from src.app import get_application
+from src.services.executors import run_io, set_executor
+from concurrent.futures import ThreadPoolExecutor
+
+app = get_application()
+
+client = TestClient(app)
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite")
+
+def test_duplicate_submissions_are_merged(store_path):
+    release = threading.Event()
+    calls = []
+    def task(params):
+        calls.append(params)
+        release.wait(5)
+        return {"value": 42}
+
+    manager = JobManager(store_path, max_workers=2)
+    manager.register("slow", task)
+    first = manager.submit("slow", "same-fingerprint")
+    second = manager.submit("slow", "same-fingerprint")
+    assert first.id == second.id
+    release.set()
+
+    job = manager.wait(first.id, timeout=5)
+    assert job.status == SUCCEEDED
+    assert job.result == {"value": 42}
+    assert len(calls) == 1
+
+def test_failed_job_records_error(store_path):
+    def task(params):
+        raise ValueError("boom")
+
+    manager = JobManager(store_path)
+    manager.register("failing", task)
+    job = manager.wait(manager.submit("failing", "fp").id, timeout=5)
+    assert job.status == FAILED
+    assert job.error == "boom"
+
+def test_state_survives_restart(store_path):
+    manager = JobManager(store_path)
+    manager.register("echo", lambda params: params)
+    job = manager.wait(manager.submit("echo", "fp", {"a": 1}).id, timeout=5)
+
+    restarted = JobManager(store_path)
+    stored = restarted.get(job.id)
+    assert stored.status == SUCCEEDED
+    assert stored.result == {"a": 1}
+
+def test_resume_requeues_unfinished_jobs(store_path):
+    JobStore(store_path).save(Job(id="interrupted", kind="echo", fingerprint="fp", params={"b": 2}, status=QUEUED))
+
+    restarted = JobManager(store_path)
+    restarted.register("echo", lambda params: params)
+    restarted.resume()
+    job = restarted.wait("interrupted", timeout=5)
+    assert job.status == SUCCEEDED
+    assert job.result == {"b": 2}
+
+def dead_owner():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process_id().rsplit(":", 1)[0] + f":{process.pid}"
+
+def test_resume_takes_over_orphaned_jobs_only(store_path):
+    store = JobStore(store_path)
+    # Worker arrêté après son délai de grâce : son job reste "running"
+    store.save(Job(id="orphan", kind="echo", fingerprint="a", params={"c": 3}, status=RUNNING, owner=dead_owner()))
+    # Job d'un worker encore en vie : il le termine lui-même
+    store.save(Job(id="alive", kind="echo", fingerprint="b", status=RUNNING, owner=process_id()))
+
+    first, second = JobManager(store_path), JobManager(store_path)
+    for manager in (first, second):
+        manager.register("echo", lambda params: params)
+    assert first.resume() == 1
+    # Déjà repris : un autre worker ne le relance pas
+    assert second.resume() == 0
+    job = first.wait("orphan", timeout=5)
+    assert job.status == SUCCEEDED and job.result == {"c": 3} and job.owner == process_id()
+    assert store.get("alive").status == RUNNING
+
+def test_wait_async_holds_no_thread(store_path):
+    release = threading.Event()
+    manager = JobManager(store_path)
+    manager.register("slow", lambda params: release.wait(5) and {"done": True})
+    # Un seul thread d'E/S : une attente qui l'occuperait bloquerait l'appel suivant
+    set_executor("io", ThreadPoolExecutor(max_workers=1, thread_name_prefix="io"))
+
+    async def scenario():
+        job = manager.submit("slow", "fp")
+        waiters = [asyncio.ensure_future(manager.wait_async(job.id)) for _ in range(3)]
+        assert await asyncio.wait_for(run_io(lambda: "free"), timeout=2) == "free"
+        assert not any(waiter.done() for waiter in waiters)
+        release.set()
+        finished = await asyncio.wait_for(asyncio.gather(*waiters), timeout=5)
+        # Déjà terminé : lu dans le store
+        return finished, await manager.wait_async(job.id)
+
+    try:
+        finished, again = asyncio.run(scenario())
+    finally:
+        set_executor("io", ThreadPoolExecutor(max_workers=16, thread_name_prefix="io"))
+    assert all(job.status == SUCCEEDED and job.result == {"done": True} for job in finished)
+    assert again.status == SUCCEEDED and again.id == finished[0].id
+
+def test_get_unknown_job():
+    response = client.get("/jobs/unknown")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Job not found"}
+
+def test_get_unknown_job_result():
+    response = client.get("/jobs/unknown/result")
+    assert response.status_code == 404
@@ -10,6 +10,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.
 
 from src.api.routes.data import router
 from src.app import get_application
+from src.services.downloads import download_manager
 
 app = get_application()
 app.include_router(router, prefix="/data")
@@ -33,10 +34,33 @@ def mock_download():
         yield mock_download
 
 def test_download_dataset_success(mock_config_file, mock_download):
-    response = client.get("/data/download-dataset")
+    response = client.get("/data/download-dataset?force=true&wait=true")
     assert response.status_code == 200
-    assert response.json() == {"message": "Dataset downloaded successfully"}
-    mock_download.assert_called_once_with("https://www.kaggle.com/datasets/uciml/iris", os.path.join(os.path.dirname(__file__), '../../data'))
+    assert response.json()["message"] == "Dataset downloaded successfully"
+    mock_download.assert_called_once_with("https://www.kaggle.com/datasets/uciml/iris", download_manager.data_dir, force=True)
+
+def test_download_dataset_already_present(mock_config_file, mock_download):
+    # src/data/iris existe déjà : pas de nouveau transfert sans force
+    with patch("os.listdir", return_value=["Iris.csv"]), patch("os.path.isdir", return_value=True):
+        response = client.get("/data/download-dataset?wait=true")
+    assert response.status_code == 200
+    assert response.json()["status"] == "skipped"
+    mock_download.assert_not_called()
+
+def test_download_dataset_in_background(mock_config_file, mock_download):
+    response = client.get("/data/download-dataset?force=true")
+    assert response.status_code == 202
+    assert response.json()["name"] == "iris"
+
+    download_manager.wait("iris")
+    response = client.get("/data/download-status/iris")
+    assert response.status_code == 200
+    assert response.json()["status"] == "succeeded"
+
+def test_download_status_not_found():
+    response = client.get("/data/download-status/unknown")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "No download for this dataset"}
 
 def test_config_file_not_found():
     with patch("os.path.exists", return_value=False):
@@ -63,6 +87,6 @@ def test_dataset_url_not_found(mock_config_file):
 
 def test_error_downloading_dataset(mock_config_file):
     with patch("opendatasets.download", side_effect=Exception("Download error")):
-        response = client.get("/data/download-dataset")
+        response = client.get("/data/download-dataset?force=true&wait=true")
         assert response.status_code == 500
         assert response.json() == {"detail": "Error downloading dataset: Download error"}
\ No newline at end of file
@@ -0,0 +1,114 @@
+import io
+import json
+import logging
+import os
+import re
+import sys
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.data import process_iris_dataset
+from src.services.executors import _invoke, _unwrap
+from src.services.logs import JsonFormatter, get_logger
+from src.services.metrics import stage
+
+app = get_application()
+client = TestClient(app)
+
+
+def sample(text, name, **labels):
+    pattern = re.escape(name) + r'\{((?:[^"}]|"[^"]*")*)\} (\S+)'
+    for match in re.finditer(pattern, text):
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(1)))
+        if all(found.get(key) == value for key, value in labels.items()) and len(found) == len(labels):
+            return float(match.group(2))
+    return 0.0
+
+
+def scrape():
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return response.text
+
+
+def test_request_metrics_by_route_template():
+    before = scrape()
+    client.get("/hello/alice")
+    client.get("/hello/bob")
+    client.get("/no-such-route")
+    text = scrape()
+
+    labels = {"method": "GET", "route": "/hello/{name}", "status": "200"}
+    assert sample(text, "flower_http_requests_total", **labels) - sample(before, "flower_http_requests_total", **labels) == 2
+    assert sample(text, "flower_http_requests_total", method="GET", route="unmatched", status="404") >= 1
+    assert sample(text, "flower_http_request_duration_seconds_count", method="GET", route="/hello/{name}") >= 2
+    assert sample(text, "flower_http_request_duration_seconds_bucket", method="GET", route="/hello/{name}", le="+Inf") >= 2
+    # Seule la requête /metrics en cours est comptée
+    assert sample(text, "flower_http_requests_in_flight", method="GET") == 1
+    assert "/hello/alice" not in text
+
+
+def test_stage_timings_and_cache_counters():
+    before = scrape()
+    df = pd.DataFrame({"iris-length": [1.0, 2.0], "Species": ["iris-setosa", "iris-virginica"]})
+    process_iris_dataset(df)
+    try:
+        with stage("fit"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    text = scrape()
+
+    count = "flower_stage_duration_seconds_count"
+    assert sample(text, count, stage="process") - sample(before, count, stage="process") == 1
+    assert sample(text, "flower_stage_errors_total", stage="fit") - sample(before, "flower_stage_errors_total", stage="fit") == 1
+    for cache in ("model_registry", "dataset", "config", "parameters"):
+        assert f'flower_cache_hits_total{{cache="{cache}"}}' in text
+        assert f'flower_cache_misses_total{{cache="{cache}"}}' in text
+    assert "# TYPE flower_predict_batch_size histogram" in text
+
+
+def timed_in_worker():
+    with stage("predict"):
+        return 42
+
+
+def test_stages_timed_in_worker_processes_are_recorded():
+    before = scrape()
+    # Même chemin qu'un appel au pool de processus : le pid de l'appelant est différent
+    result = _invoke(timed_in_worker, (), {}, os.getpid() + 1)
+    assert result.stages[0][0] == "predict"
+    assert _unwrap(result) == 42
+    count = "flower_stage_duration_seconds_count"
+    # Une observation dans le "worker", une rejouée par l'appelant
+    assert sample(scrape(), count, stage="predict") - sample(before, count, stage="predict") == 2
+
+
+def test_structured_sampled_logging():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger = get_logger("test", sample_rate=0.0)
+    logger.logger.addHandler(handler)
+    try:
+        for _ in range(100):
+            logger.sampled("request", route="/hello/{name}")
+        assert stream.getvalue() == ""
+
+        logger.sample_rate = 1.0
+        logger.sampled("request", route="/hello/{name}", duration_ms=1.5)
+        logger.error("job_finished", job_id="abc")
+    finally:
+        logger.logger.removeHandler(handler)
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["event"] == "request"
+    assert first["route"] == "/hello/{name}"
+    assert first["sample_rate"] == 1.0
+    assert second["level"] == "ERROR"
+    assert second["job_id"] == "abc"
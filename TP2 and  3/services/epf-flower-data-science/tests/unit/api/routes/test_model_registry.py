@@ -0,0 +1,94 @@
+import os
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.services.model_registry import ModelRegistry
+from src.app import get_application
+
+app = get_application()
+
+client = TestClient(app)
+
+X_train = [[5.1, 3.5, 1.4, 0.2], [4.9, 3.0, 1.4, 0.2], [6.3, 3.3, 6.0, 2.5]]
+
+def fit_model(label):
+    model = RandomForestClassifier(n_estimators=5, random_state=0)
+    model.fit(X_train, [label, label, label])
+    return model
+
+@pytest.fixture
+def registry():
+    return ModelRegistry()
+
+def test_get_uses_cache(registry, tmp_path):
+    model_path = str(tmp_path / "model.pkl")
+    registry.save(fit_model("setosa"), model_path)
+    first = registry.get(model_path)
+    second = registry.get(model_path)
+    assert first is second
+    assert registry.stats()["hits"] == 2
+    assert registry.stats()["loads"] == 0
+
+def test_get_reloads_when_file_changes(registry, tmp_path):
+    model_path = str(tmp_path / "model.pkl")
+    ModelRegistry().save(fit_model("setosa"), model_path)
+    assert registry.get(model_path).model.predict(X_train[:1]).tolist() == ["setosa"]
+    ModelRegistry().save(fit_model("virginica"), model_path)
+    os.utime(model_path, ns=(1, 1))
+    assert registry.get(model_path).model.predict(X_train[:1]).tolist() == ["virginica"]
+    assert registry.stats()["misses"] == 2
+    assert registry.stats()["loads"] == 2
+
+def test_in_flight_version_survives_hot_swap(registry, tmp_path):
+    model_path = str(tmp_path / "model.pkl")
+    registry.save(fit_model("setosa"), model_path)
+    in_flight = registry.get(model_path)
+    registry.save(fit_model("virginica"), model_path)
+    assert in_flight.model.predict(X_train[:1]).tolist() == ["setosa"]
+    assert registry.get(model_path).model.predict(X_train[:1]).tolist() == ["virginica"]
+
+def test_old_versions_evicted_over_budget(tmp_path):
+    registry = ModelRegistry(max_bytes=1)
+    model_path = str(tmp_path / "model.pkl")
+    registry.save(fit_model("setosa"), model_path)
+    registry.save(fit_model("virginica"), model_path)
+    stats = registry.stats()
+    assert stats["entries"] == 1
+    assert stats["evictions"] == 1
+
+def test_get_missing_file(registry, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        registry.get(str(tmp_path / "missing.pkl"))
+
+def test_digest_without_loading(registry, tmp_path):
+    packed, legacy = str(tmp_path / "packed.pkl"), str(tmp_path / "legacy.pkl")
+    saved = ModelRegistry().save(fit_model("setosa"), packed)
+    ModelRegistry().save(fit_model("setosa"), legacy, artifact_format="pickle")
+    assert registry.digest(packed) == saved.version.digest
+    assert registry.digest(legacy) == registry.get(legacy).version.digest
+    assert registry.digest(str(tmp_path / "missing.pkl")) is None
+    # Seul le modèle demandé explicitement a été chargé
+    assert registry.stats()["loads"] == 1 and registry.stats()["entries"] == 1
+
+def test_model_registry_stats_endpoint():
+    response = client.get("/model-registry-stats")
+    assert response.status_code == 200
+    assert {"hits", "misses", "loads", "load_time_total"} <= set(response.json())
+
+def test_concurrent_loads_are_all_counted(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    paths = []
+    for i in range(16):
+        paths.append(str(tmp_path / f"model-{i}.pkl"))
+        ModelRegistry().save(fit_model("setosa"), paths[-1], artifact_format="pickle")
+    registry = ModelRegistry()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(registry.get, paths))
+    stats = registry.stats()
+    assert stats["loads"] == 16 and stats["misses"] == 16
+    assert stats["load_time_total"] >= stats["load_time_last"] > 0
@@ -0,0 +1,78 @@
+import os
+import pytest
+from fastapi.testclient import TestClient
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.services import parameters as parameters_service
+from src.app import get_application
+
+app = get_application()
+
+client = TestClient(app)
+
+class InMemoryFirestoreClient:
+    """Stand-in for FirestoreClient that keeps documents in a dict and counts calls."""
+
+    def __init__(self):
+        self.documents = {}
+        self.calls = 0
+
+    def get(self, collection_name, document_id):
+        self.calls += 1
+        if (collection_name, document_id) not in self.documents:
+            raise FileExistsError(f"No document found at {collection_name} with the id {document_id}")
+        return dict(self.documents[(collection_name, document_id)])
+
+    def create_parameters_collection(self):
+        self.calls += 1
+        self.documents[("parameters", "parameters")] = {"n_estimators": 100, "criterion": "gini"}
+
+    def update_parameters(self, parameters):
+        self.calls += 1
+        self.documents.setdefault(("parameters", "parameters"), {}).update(parameters)
+
+@pytest.fixture
+def firestore_client():
+    firestore_client = InMemoryFirestoreClient()
+    parameters_service.set_firestore_client(firestore_client)
+    yield firestore_client
+    parameters_service.set_firestore_client(None)
+
+def test_reads_are_cached(firestore_client):
+    client.post("/create-firestore-collection")
+    for _ in range(5):
+        response = client.get("/get-parameters")
+        assert response.status_code == 200
+        assert response.json() == {"n_estimators": 100, "criterion": "gini"}
+    # Une création + une seule lecture Firestore pour cinq requêtes
+    assert firestore_client.calls == 2
+    stats = client.get("/parameters-cache-stats").json()
+    assert stats["backend_reads"] == 1
+    # La création remplace le document : une seule écriture comptée
+    assert stats["backend_writes"] == 1
+    # Quatre lectures servies par le cache, deux constructions du client évitées
+    assert stats["backend_reads_saved"] == 4
+    assert stats["client_constructions_saved"] == 2
+    assert stats["backend_calls_saved"] == 6
+
+def test_update_is_written_through(firestore_client):
+    client.post("/create-firestore-collection")
+    client.get("/get-parameters")
+    response = client.put("/update-parameters", json={"n_estimators": 200, "criterion": "entropy"})
+    assert response.status_code == 200
+    calls = firestore_client.calls
+    assert client.get("/get-parameters").json() == {"n_estimators": 200, "criterion": "entropy"}
+    assert firestore_client.calls == calls
+
+def test_missing_document(firestore_client):
+    response = client.get("/get-parameters")
+    assert response.status_code == 404
+
+def test_entries_expire(firestore_client):
+    cache = parameters_service.ParametersCache(ttl=0)
+    firestore_client.create_parameters_collection()
+    cache.get("parameters", "parameters")
+    cache.get("parameters", "parameters")
+    assert cache.stats()["backend_reads"] == 2
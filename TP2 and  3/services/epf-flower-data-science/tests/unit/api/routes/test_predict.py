@@ -12,6 +12,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.
 
 from src.api.routes.data import router
 from src.app import get_application
+from src.services.data import run_training_pipeline
 
 app = get_application()
 app.include_router(router, prefix="/data")
@@ -24,7 +25,8 @@ def mock_model_file():
     X_train = [[5.1, 3.5, 1.4, 0.2], [4.9, 3.0, 1.4, 0.2], [4.7, 3.2, 1.3, 0.2]]
     y_train = ["setosa", "setosa", "setosa"]
     model.fit(X_train, y_train)
-    model_dir = os.path.join(os.path.dirname(__file__), '..\..\..\..\src\models')
+    model_dir = os.path.join(os.path.dirname(__file__), '../../../../src/models')
+    os.makedirs(model_dir, exist_ok=True)
     model_path = os.path.join(model_dir, 'iris_model.pkl')
     joblib.dump(model, model_path)
     yield
@@ -45,4 +47,23 @@ def test_predict_model_not_found():
     }
     response = client.post("/data/predict", json=prediction_data)
     assert response.status_code == 404
-    assert response.json() == {"detail": "Model file not found"}
\ No newline at end of file
+    assert response.json() == {"detail": "Model file not found"}
+@pytest.fixture
+def trained_model(tmp_path):
+    with patch("src.services.data.training_cache.directory", str(tmp_path / "cache")):
+        model_path = run_training_pipeline()["model_path"]
+    yield
+    os.remove(model_path)
+
+def test_predict_object_rows_in_any_key_order(trained_model):
+    row = {"Id": 1, "SepalLengthCm": 5.1, "SepalWidthCm": 3.5, "PetalLengthCm": 1.4, "PetalWidthCm": 0.2}
+    reversed_row = dict(reversed(list(row.items())))
+    # Requêtes séparées : dans une même requête, pandas aligne les clés sur celles de la première ligne
+    for rows in ([row], [reversed_row]):
+        response = client.post("/predict", json={"data": rows})
+        assert response.status_code == 200
+        assert response.json()["predictions"] == ["setosa"]
+
+    del row["PetalWidthCm"]
+    response = client.post("/predict", json={"data": [row]})
+    assert response.status_code == 400
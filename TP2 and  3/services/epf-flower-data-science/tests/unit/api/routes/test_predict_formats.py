@@ -0,0 +1,124 @@
+import io
+import json
+import os
+import struct
+import sys
+
+import joblib
+import numpy as np
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.payloads import ARROW, NPY, RAW_FLOAT32, decode_matrix
+
+app = get_application()
+client = TestClient(app)
+
+ROWS = np.array([[5.1, 3.5, 1.4, 0.2], [6.3, 3.3, 6.0, 2.5], [4.9, 3.0, 1.4, 0.2]], dtype=np.float32)
+
+
+@pytest.fixture
+def model_file():
+    model = RandomForestClassifier(n_estimators=10, random_state=0)
+    model.fit(ROWS.astype(np.float64), ["setosa", "virginica", "setosa"])
+    model_dir = os.path.join(os.path.dirname(__file__), '../../../../src/models')
+    os.makedirs(model_dir, exist_ok=True)
+    model_path = os.path.join(model_dir, 'iris_model.pkl')
+    joblib.dump(model, model_path)
+    yield model.predict(ROWS).tolist()
+    os.remove(model_path)
+
+
+def raw_body(matrix):
+    return struct.pack("<II", *matrix.shape) + matrix.astype("<f4").tobytes()
+
+
+def npy_body(matrix):
+    buffer = io.BytesIO()
+    np.save(buffer, matrix)
+    return buffer.getvalue()
+
+
+def arrow_body(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_binary_bodies_are_decoded_in_place():
+    body = raw_body(ROWS)
+    matrix = decode_matrix(body, RAW_FLOAT32)
+    assert matrix.shape == (3, 4) and matrix.dtype == np.float32
+    assert not matrix.flags.owndata and not matrix.flags.writeable
+    np.testing.assert_array_equal(matrix, ROWS)
+
+    matrix = decode_matrix(npy_body(ROWS), NPY)
+    assert not matrix.flags.owndata
+    np.testing.assert_array_equal(matrix, ROWS)
+
+    rows = pa.FixedSizeListArray.from_arrays(pa.array(ROWS.ravel()), 4)
+    matrix = decode_matrix(arrow_body(pa.table({"features": rows})), ARROW)
+    np.testing.assert_array_equal(matrix, ROWS)
+
+    columns = pa.table({f"f{i}": ROWS[:, i] for i in range(4)})
+    np.testing.assert_array_equal(decode_matrix(arrow_body(columns), ARROW), ROWS)
+
+
+def test_predict_in_the_format_of_the_request(model_file):
+    response = client.post("/predict", content=npy_body(ROWS), headers={"Content-Type": NPY})
+    assert response.status_code == 200 and response.headers["content-type"] == NPY
+    assert np.load(io.BytesIO(response.content)).tolist() == model_file
+
+    response = client.post("/predict", content=raw_body(ROWS), headers={"Content-Type": RAW_FLOAT32})
+    assert response.status_code == 200
+    rows, columns = struct.unpack_from("<II", response.content)
+    codes = np.frombuffer(response.content, dtype="<f4", offset=8).astype(int)
+    classes = json.loads(response.headers["X-Prediction-Classes"])
+    assert (rows, columns) == (3, 1) and [classes[code] for code in codes] == model_file
+
+    rows = pa.FixedSizeListArray.from_arrays(pa.array(ROWS.ravel()), 4)
+    response = client.post("/predict", content=arrow_body(pa.table({"features": rows})), headers={"Content-Type": ARROW})
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column("prediction").to_pylist() == model_file
+
+
+def test_accept_selects_the_response_format(model_file):
+    response = client.post("/predict", content=raw_body(ROWS), headers={"Content-Type": RAW_FLOAT32, "Accept": "application/json"})
+    assert response.json() == {"predictions": model_file}
+
+    response = client.post("/predict", json={"data": ROWS.tolist()}, headers={"Accept": NPY})
+    assert np.load(io.BytesIO(response.content)).tolist() == model_file
+
+
+def test_large_binary_batch_bypasses_the_batcher(model_file):
+    matrix = np.tile(ROWS, (400, 1))
+    response = client.post("/predict", content=raw_body(matrix), headers={"Content-Type": RAW_FLOAT32, "Accept": NPY})
+    assert response.status_code == 200
+    assert np.load(io.BytesIO(response.content)).tolist() == model_file * 400
+
+
+def test_invalid_binary_bodies():
+    response = client.post("/predict", content=raw_body(ROWS)[:-4], headers={"Content-Type": RAW_FLOAT32})
+    assert response.status_code == 400
+
+    response = client.post("/predict", content=npy_body(np.array([["a", "b"]])), headers={"Content-Type": NPY})
+    assert response.status_code == 400
+
+    response = client.post("/predict", content=npy_body(ROWS[0]), headers={"Content-Type": NPY})
+    assert response.status_code == 400
+
+    response = client.post("/predict", content=b"not arrow", headers={"Content-Type": ARROW})
+    assert response.status_code == 400
+
+    response = client.post("/predict", content=b"1,2,3", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 415
+
+    response = client.post("/predict", json={"rows": []})
+    assert response.status_code == 422
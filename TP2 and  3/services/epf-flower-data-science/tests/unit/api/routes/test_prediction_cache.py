@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.executors import set_executor
+from src.services.model_registry import model_registry
+from src.services.prediction_cache import PredictionCache, prediction_cache
+
+app = get_application()
+client = TestClient(app)
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '../../../../src/models/iris_model.pkl')
+ROWS = [[5.1, 3.5, 1.4, 0.2], [6.7, 3.0, 5.2, 2.3]]
+
+
+class CountingModel:
+    def __init__(self):
+        self.rows = []
+
+    def __call__(self, matrix):
+        self.rows.append(len(matrix))
+        return np.where(matrix[:, 0] > 6, "virginica", "setosa")
+
+
+def test_only_missing_rows_are_scored():
+    cache, score = PredictionCache(max_entries=10), CountingModel()
+    assert cache.predict("v1", np.array(ROWS), score) == ["setosa", "virginica"]
+    # Deux lignes connues, une nouvelle en double : un seul appel sur une ligne
+    assert cache.predict("v1", np.array(ROWS + [[7.0, 1, 1, 1], [7.0, 1, 1, 1]]), score) == ["setosa", "virginica", "virginica", "virginica"]
+    assert score.rows == [2, 1]
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 4 and stats["entries"] == 3
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
+
+
+def test_float32_canonical_keys():
+    cache, score = PredictionCache(max_entries=10), CountingModel()
+    cache.predict("v1", np.array([[5.1, 0.0]]), score)
+    # Même valeur en float32, en entier ou avec un zéro négatif : même clé
+    cache.predict("v1", np.array([[5.1, -0.0]], dtype=np.float32), score)
+    cache.predict("v1", np.array([[5.1000000001, 0]]), score)
+    assert score.rows == [1]
+
+
+def test_lru_eviction():
+    cache, score = PredictionCache(max_entries=2), CountingModel()
+    cache.predict("v1", np.array([[1.0], [2.0]]), score)
+    cache.predict("v1", np.array([[1.0]]), score)
+    cache.predict("v1", np.array([[3.0]]), score)
+    # 2.0 était la moins récemment utilisée
+    cache.predict("v1", np.array([[1.0], [3.0]]), score)
+    assert score.rows == [2, 1]
+    cache.predict("v1", np.array([[2.0]]), score)
+    assert score.rows == [2, 1, 1]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_new_model_version_invalidates():
+    cache, score = PredictionCache(max_entries=10), CountingModel()
+    cache.predict("v1", np.array(ROWS), score)
+    cache.predict("v2", np.array(ROWS), score)
+    assert score.rows == [2, 2]
+    assert cache.stats()["invalidations"] == 1 and cache.stats()["model_version"] == "v2"
+
+
+def test_disabled_or_unknown_version():
+    score = CountingModel()
+    PredictionCache(max_entries=0).predict("v1", np.array(ROWS), score)
+    PredictionCache(max_entries=10).predict(None, np.array(ROWS), score)
+    assert score.rows == [2, 2]
+
+
+def test_large_matrices_bypass_the_cache():
+    cache, score = PredictionCache(max_entries=10, max_rows=3), CountingModel()
+    rows = np.array(ROWS * 2)
+    cache.predict("v1", rows, score)
+    cache.predict("v1", rows, score)
+    # Quatre lignes > max_rows : aucune recherche, rien en cache
+    assert score.rows == [4, 4]
+    stats = cache.stats()
+    assert stats["bypassed"] == 2 and stats["entries"] == 0 and stats["misses"] == 0
+
+
+def fit(labels):
+    model = RandomForestClassifier(n_estimators=5, bootstrap=False, random_state=0)
+    model.fit(ROWS, labels)
+    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+    joblib.dump(model, MODEL_PATH)
+
+
+@pytest.fixture
+def model_file():
+    fit(["setosa", "virginica"])
+    yield
+    os.remove(MODEL_PATH)
+
+
+def test_predict_endpoint_uses_cache(model_file):
+    # La version vient du fichier : le cache sert dès le deuxième appel
+    assert client.post("/predict", json={"data": ROWS}).json()["predictions"] == ["setosa", "virginica"]
+    client.post("/predict", json={"data": ROWS})
+    response = client.post("/predict", json={"data": ROWS})
+    assert response.json()["predictions"] == ["setosa", "virginica"]
+    stats = client.get("/prediction-cache-stats").json()
+    assert stats["hits"] == 4 and stats["misses"] == 2
+
+    # Nouvel artefact : les anciennes prédictions ne sont plus servies
+    fit(["virginica", "setosa"])
+    for _ in range(3):
+        assert client.post("/predict", json={"data": ROWS}).json()["predictions"] == ["virginica", "setosa"]
+    stats = client.get("/prediction-cache-stats").json()
+    assert stats["invalidations"] == 1 and stats["hits"] == 8 and stats["misses"] == 4
+
+    assert 'flower_cache_hit_ratio{cache="predictions"} 0.6666666666666666' in client.get("/metrics").text
+
+
+@pytest.fixture
+def process_pool():
+    # Pool de processus réel : le modèle n'est chargé que dans le worker
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    set_executor("cpu", pool)
+    yield pool
+    set_executor("cpu", ThreadPoolExecutor(max_workers=1, thread_name_prefix="cpu"))
+    pool.shutdown(wait=True)
+
+
+def test_predict_cache_with_process_pool(model_file, process_pool):
+    rows = np.array(ROWS * 40)
+    for _ in range(2):
+        response = client.post("/predict", json={"data": rows.tolist()})
+        assert response.json()["predictions"] == ["setosa", "virginica"] * 40
+    assert model_registry.stats()["loads"] == 0
+    stats = client.get("/prediction-cache-stats").json()
+    assert stats["misses"] == 80 and stats["hits"] == 80
+    assert stats["model_version"] == model_registry.digest(MODEL_PATH)
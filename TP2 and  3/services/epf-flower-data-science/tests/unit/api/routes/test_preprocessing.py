@@ -0,0 +1,137 @@
+import io
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.config_store import ConfigStore
+from src.services.data import process_iris_dataset
+from src.services.datasets import DatasetEngine
+from src.services.preprocessing import PreprocessingSpec, clean_labels, compile_preprocessor
+
+app = get_application()
+client = TestClient(app)
+
+IRIS = """Id,SepalLengthCm,SepalWidthCm,PetalLengthCm,iris-PetalWidthCm,Species
+1,5.1,3.5,1.4,0.2,Iris-setosa
+2,4.9,3.0,1.4,0.2,Iris-setosa
+3,7.0,3.2,4.7,1.4,Iris-versicolor
+4,6.4,3.2,4.5,1.5,Iris-versicolor
+5,6.3,3.3,6.0,2.5,Iris-virginica
+6,5.8,2.7,5.1,1.9,Iris-virginica
+"""
+
+
+@pytest.fixture
+def iris_df():
+    return pd.read_csv(io.StringIO(IRIS))
+
+
+@pytest.fixture
+def preprocessor(iris_df):
+    spec = PreprocessingSpec(rename=(("SepalLengthCm", "sepal_length"),), strip_prefix="iris-")
+    features = ["SepalLengthCm", "SepalWidthCm", "PetalLengthCm", "iris-PetalWidthCm"]
+    return compile_preprocessor(iris_df, features, "Species", spec)
+
+
+def test_clean_labels():
+    labels = np.asarray(["Iris-setosa", "iris-virginica", "Iris-setosa", None], dtype=object)
+    assert clean_labels(labels, "iris-").tolist() == ["setosa", "virginica", "setosa", None]
+
+
+def test_compiled_preprocessor(preprocessor):
+    assert preprocessor.feature_names == ["sepal_length", "SepalWidthCm", "PetalLengthCm", "PetalWidthCm"]
+    assert preprocessor.classes == ("setosa", "versicolor", "virginica")
+
+
+def test_transform_is_float32_with_target_codes(preprocessor, iris_df):
+    X, y = preprocessor.transform(iris_df)
+    assert X.dtype == np.float32
+    assert X.shape == (6, 4)
+    np.testing.assert_array_equal(X, iris_df.iloc[:, 1:5].to_numpy(dtype=np.float32))
+    assert y.tolist() == [0, 0, 1, 1, 2, 2]
+    assert preprocessor.decode(y).tolist() == ["setosa", "setosa", "versicolor", "versicolor", "virginica", "virginica"]
+
+
+def test_transform_of_categorical_target(preprocessor, iris_df):
+    iris_df["Species"] = iris_df["Species"].astype("category")
+    assert preprocessor.transform(iris_df)[1].tolist() == [0, 0, 1, 1, 2, 2]
+
+
+def test_unknown_target_label(preprocessor, iris_df):
+    iris_df.loc[0, "Species"] = "Iris-unknown"
+    with pytest.raises(ValueError):
+        preprocessor.transform(iris_df)
+
+
+def test_features_match_training_input(preprocessor, iris_df):
+    X, _ = preprocessor.transform(iris_df)
+    rows = iris_df.iloc[:2]
+    from_lists = preprocessor.features(rows.iloc[:, 1:5].to_numpy().tolist())
+    from_source_names = preprocessor.features(rows.drop(columns=["Id", "Species"]).to_dict("records"))
+    from_output_names = preprocessor.features([dict(zip(preprocessor.feature_names, row)) for row in X[:2].tolist()])
+    for features in (from_lists, from_source_names, from_output_names):
+        assert features.dtype == np.float32
+        np.testing.assert_array_equal(features, X[:2])
+
+    with pytest.raises(ValueError):
+        preprocessor.features([[1.0, 2.0]])
+    with pytest.raises(ValueError):
+        preprocessor.features([{"sepal_length": 1.0}])
+
+
+def test_process_iris_dataset_matches_previous_implementation(iris_df):
+    expected = iris_df.rename(columns=lambda x: x.replace('iris-', ''))
+    expected['Species'] = expected['Species'].str.replace('iris-', '', case=False)
+    pd.testing.assert_frame_equal(process_iris_dataset(iris_df), expected, check_dtype=False)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    (tmp_path / "iris").mkdir()
+    (tmp_path / "iris" / "Iris.csv").write_text(IRIS)
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"iris": {"name": "iris", "url": "https://www.kaggle.com/datasets/uciml/iris"}}))
+    engine = DatasetEngine(ConfigStore(str(config_path)), str(tmp_path), str(tmp_path / "models"))
+    with patch("src.services.datasets.dataset_engine", engine), patch("src.api.routes.datasets.dataset_engine", engine):
+        yield engine
+
+
+def test_preprocessor_is_compiled_once_per_schema(engine):
+    first = engine.processed("iris")
+    second = engine.processed("iris")
+    assert first[0] is second[0] and first[1] is second[1]
+    assert engine.stats()["preprocessor_compilations"] == 1
+
+    engine.store.update(lambda config: config["iris"].update({"preprocessing": {"dtype": "float64"}}))
+    assert engine.processed("iris")[1].dtype == np.float64
+    assert engine.stats()["preprocessor_compilations"] == 2
+
+
+def test_training_and_prediction_share_the_preprocessing(engine):
+    response = client.get("/datasets/iris/preprocessing")
+    assert response.status_code == 200
+    assert response.json()["classes"] == ["setosa", "versicolor", "virginica"]
+    assert response.json()["feature_names"][-1] == "PetalWidthCm"
+
+    response = client.get("/datasets/iris/process")
+    assert response.status_code == 200
+    assert response.json()["columns"] == ["SepalLengthCm", "SepalWidthCm", "PetalLengthCm", "PetalWidthCm", "Species"]
+    assert response.json()["data"][0][-1] == "setosa"
+
+    response = client.post("/datasets/iris/train?wait=true")
+    assert response.status_code == 200
+
+    # Le modèle est entraîné sur des codes entiers mais renvoie les libellés
+    rows = [{"SepalLengthCm": 5.1, "SepalWidthCm": 3.5, "PetalLengthCm": 1.4, "iris-PetalWidthCm": 0.2}]
+    response = client.post("/datasets/iris/predict", json={"data": rows})
+    assert response.status_code == 200
+    assert response.json()["predictions"][0] in ("setosa", "versicolor", "virginica")
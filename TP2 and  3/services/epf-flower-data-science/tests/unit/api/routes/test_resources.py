@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.config_store import model_parameters_store
+from src.services.resources import TrainingSlots, fit_in_parallel, plan_training
+
+app = get_application()
+client = TestClient(app)
+
+
+@pytest.fixture
+def cores():
+    with patch("src.services.resources.available_cores", return_value=32), \
+            patch("src.services.resources.busy_cores", return_value=3.4):
+        yield
+
+
+def test_plan_uses_free_cores(cores):
+    # 32 cœurs - 1 réservé au service - 3,4 occupés
+    assert plan_training()["n_jobs"] == 27
+    assert plan_training()["backend"] == "threading"
+    assert plan_training(-1)["n_jobs"] == 31
+    assert plan_training(-4)["n_jobs"] == 28
+    assert plan_training(64)["n_jobs"] == 31
+    assert plan_training(4, "loky") == {**plan_training(4), "backend": "loky"}
+
+
+def test_plan_on_a_busy_host():
+    with patch("src.services.resources.available_cores", return_value=4), \
+            patch("src.services.resources.busy_cores", return_value=6.0):
+        plan = plan_training()
+    assert plan["n_jobs"] == 1 and plan["backend"] == "sequential"
+
+
+def test_requested_jobs_keep_the_reserved_cores():
+    with patch("src.services.resources.available_cores", return_value=4), \
+            patch("src.services.resources.busy_cores", return_value=0.0), \
+            patch("src.services.resources.RESERVED_CORES", 2):
+        # Plus de jobs que de cœurs utilisables : plafonné à 4 - 2 réservés
+        assert plan_training(3)["n_jobs"] == 2
+        assert plan_training(4)["n_jobs"] == 2
+        assert plan_training(1)["n_jobs"] == 1
+
+
+def test_invalid_plan():
+    with pytest.raises(ValueError):
+        plan_training(0)
+    with pytest.raises(ValueError):
+        plan_training(None, "dask")
+
+
+def test_fit_in_parallel(cores):
+    rng = np.random.default_rng(0)
+    X, y = rng.uniform(size=(200, 4)), rng.integers(0, 3, 200)
+    model = RandomForestClassifier(n_estimators=8, random_state=0)
+    plan = fit_in_parallel(model, X, y, 2)
+    assert plan["n_jobs"] == 2 and plan["backend"] == "threading"
+    # Le modèle publié prédit sur un seul cœur
+    assert model.n_jobs is None and len(model.estimators_) == 8
+
+
+def test_training_slots_cap():
+    slots = TrainingSlots(limit=1)
+    order = []
+
+    def train(name):
+        with slots.slot():
+            order.append(f"{name} start")
+            time.sleep(0.05)
+            order.append(f"{name} end")
+
+    threads = [threading.Thread(target=train, args=(name,)) for name in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert order[0].endswith("start") and order[1].endswith("end")
+    stats = slots.stats()
+    assert stats["peak"] == 1 and stats["completed"] == 2 and stats["active"] == 0
+
+
+@pytest.fixture
+def parameters_file(tmp_path):
+    path = str(tmp_path / "model_parameters.json")
+    shutil.copyfile(model_parameters_store.path, path)
+    with patch.object(model_parameters_store, "path", path), patch("firestore.FirestoreClient") as firestore_client:
+        model_parameters_store.clear()
+        yield path, firestore_client
+    model_parameters_store.clear()
+
+
+def test_update_training_parameters(parameters_file, cores):
+    path, firestore_client = parameters_file
+    response = client.put("/update-parameters", json={"n_estimators": 200, "criterion": "gini", "n_jobs": 8, "backend": "loky"})
+    assert response.status_code == 200
+    firestore_client.return_value.update_parameters.assert_called_once_with(
+        {"n_estimators": 200, "criterion": "gini", "n_jobs": 8, "backend": "loky"}
+    )
+    with open(path) as f:
+        config = json.load(f)
+    assert config["RandomForestClassifier"]["n_jobs"] == 8 and config["Training"]["backend"] == "loky"
+    # n_estimators reste dans Firestore : seuls les réglages de ressources vont dans le fichier
+    assert config["RandomForestClassifier"]["n_estimators"] == 100
+
+    response = client.get("/training-resources")
+    assert response.status_code == 200
+    assert response.json()["plan"]["n_jobs"] == 8 and response.json()["plan"]["backend"] == "loky"
+    assert response.json()["slots"]["limit"] >= 1
+
+
+def test_update_without_training_fields(parameters_file):
+    path, firestore_client = parameters_file
+    before = open(path).read()
+    client.put("/update-parameters", json={"n_estimators": 200, "criterion": "gini"})
+    # Les champs absents ne sont écrits ni dans Firestore ni dans le fichier
+    firestore_client.return_value.update_parameters.assert_called_once_with({"n_estimators": 200, "criterion": "gini"})
+    assert open(path).read() == before
+
+
+def test_invalid_training_parameters(parameters_file):
+    assert client.put("/update-parameters", json={"n_estimators": 1, "criterion": "gini", "backend": "dask"}).status_code == 422
+    assert client.put("/update-parameters", json={"n_estimators": 1, "criterion": "gini", "n_jobs": 0}).status_code == 422
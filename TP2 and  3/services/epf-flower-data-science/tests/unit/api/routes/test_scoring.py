@@ -0,0 +1,184 @@
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.data import run_training_pipeline
+from src.services.scoring import run_scoring, score_file
+
+app = get_application()
+client = TestClient(app)
+
+FEATURES = ["SepalLengthCm", "SepalWidthCm", "PetalLengthCm", "PetalWidthCm"]
+
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.uniform(0.1, 7.0, size=(rows, 4)), columns=FEATURES)
+    frame.insert(0, "Id", np.arange(100, 100 + rows))
+    return frame
+
+
+@pytest.fixture
+def model():
+    frame = make_frame(60)
+    model = RandomForestClassifier(n_estimators=5, random_state=0)
+    model.fit(frame[FEATURES].to_numpy(), np.where(frame["PetalLengthCm"] > 3.5, "virginica", "setosa"))
+    return model
+
+
+@pytest.fixture
+def model_path(model, tmp_path):
+    path = str(tmp_path / "model.pkl")
+    joblib.dump(model, path)
+    return path
+
+
+@pytest.fixture
+def input_csv(tmp_path):
+    path = str(tmp_path / "input.csv")
+    make_frame(1000).to_csv(path, index=False)
+    return path
+
+
+def expected(model, frame, id_column="row"):
+    ids = frame["Id"] if id_column == "Id" else np.arange(len(frame))
+    return pd.DataFrame({id_column: ids, "prediction": model.predict(frame[FEATURES].to_numpy(dtype=np.float32))})
+
+
+def test_score_file_in_chunks(model, model_path, input_csv, tmp_path):
+    output = str(tmp_path / "out.csv")
+    summary = score_file(input_csv, output, model_path=model_path, chunk_size=128, workers=2, columns=FEATURES)
+    assert summary["rows"] == 1000 and summary["chunks"] == 8 and summary["rows_scored"] == 1000
+    assert summary["rows_per_second"] > 0 and summary["resumed_from_chunk"] == 0
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected(model, pd.read_csv(input_csv)))
+
+    # Déjà terminé : rien n'est recalculé
+    assert score_file(input_csv, output, model_path=model_path, chunk_size=128, columns=FEATURES)["rows_scored"] == 0
+
+
+def test_parquet_input_with_id_column(model, model_path, tmp_path):
+    path = str(tmp_path / "input.parquet")
+    make_frame(300).to_parquet(path)
+    output = str(tmp_path / "out.csv")
+    score_file(path, output, model_path=model_path, chunk_size=64, id_column="Id")
+    # Sans `columns` : toutes les colonnes sauf l'identifiant
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected(model, make_frame(300), "Id"))
+
+
+def test_resume_after_interruption(model, model_path, input_csv, tmp_path):
+    output = str(tmp_path / "out.csv")
+
+    def crash(counters):
+        if counters["chunks"] == 3:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        score_file(input_csv, output, model_path=model_path, chunk_size=100, workers=1, columns=FEATURES, progress=crash)
+    # Bloc à moitié écrit après le dernier checkpoint
+    with open(output, "ab") as f:
+        f.write(b"999,partial")
+
+    summary = score_file(input_csv, output, model_path=model_path, chunk_size=100, workers=1, columns=FEATURES)
+    assert summary["resumed_from_chunk"] == 3
+    assert summary["rows_scored"] == 700 and summary["rows"] == 1000
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected(model, pd.read_csv(input_csv)))
+
+    # Autre taille de bloc : le checkpoint ne correspond plus, on repart de zéro
+    summary = score_file(input_csv, output, model_path=model_path, chunk_size=250, columns=FEATURES)
+    assert summary["resumed_from_chunk"] == 0 and summary["rows_scored"] == 1000
+
+
+def test_feature_mismatch(model_path, input_csv, tmp_path):
+    with pytest.raises(ValueError):
+        score_file(input_csv, str(tmp_path / "out.csv"), model_path=model_path, columns=["Id", "missing"])
+    with pytest.raises(ValueError):
+        # Id compté comme variable : 5 colonnes pour un modèle qui en attend 4
+        score_file(input_csv, str(tmp_path / "out.csv"), model_path=model_path)
+
+
+def test_fallback_drops_the_target(model, model_path, tmp_path):
+    # Artefact sans schéma : la colonne "Species" n'est pas une feature
+    frame = make_frame(50).assign(Species="setosa")
+    frame.to_csv(tmp_path / "labelled.csv", index=False)
+    output = str(tmp_path / "out.csv")
+    score_file(str(tmp_path / "labelled.csv"), output, model_path=model_path, id_column="Id")
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected(model, frame, "Id"))
+
+
+def test_score_file_endpoint(model, model_path, input_csv, tmp_path):
+    with patch("src.services.scoring.SCORING_DATA_DIR", str(tmp_path)), \
+            patch("src.services.scoring.DEFAULT_MODEL_PATH", model_path):
+        response = client.post("/score-file?wait=true", json={"input": "input.csv", "output": "scores/out.csv",
+                                                                "chunk_size": 200, "columns": FEATURES})
+        assert response.status_code == 200
+        assert response.json()["rows"] == 1000 and response.json()["chunks"] == 5
+        assert os.path.exists(tmp_path / "scores" / "out.csv")
+
+        response = client.post("/score-file", json={"input": "../input.csv", "output": "out.csv"})
+        assert response.status_code == 400
+        response = client.post("/score-file", json={"input": "missing.csv", "output": "scores/other.csv"})
+        assert response.status_code == 404
+
+
+def test_score_file_endpoint_protects_files(model_path, input_csv, tmp_path):
+    (tmp_path / "scores").mkdir()
+    (tmp_path / "scores" / "report.csv").write_text("kept")
+    with patch("src.services.scoring.SCORING_DATA_DIR", str(tmp_path)), \
+            patch("src.services.scoring.DEFAULT_MODEL_PATH", model_path):
+        # Hors de scores/, autre extension, entrée elle-même ou fichier existant non écrit par un scoring
+        for output in ("input.csv", "jobs.sqlite", "scores/out.txt", "scores/report.csv"):
+            response = client.post("/score-file", json={"input": "input.csv", "output": output})
+            assert response.status_code == 400, output
+        response = client.post("/score-file", json={"input": "scores/report.csv", "output": "scores/report.csv"})
+        assert response.status_code == 400
+    assert (tmp_path / "scores" / "report.csv").read_text() == "kept"
+    assert len(pd.read_csv(input_csv)) == 1000
+
+
+def test_output_is_never_the_input(model_path, input_csv):
+    with pytest.raises(ValueError):
+        score_file(input_csv, input_csv, model_path=model_path, columns=FEATURES)
+    assert len(pd.read_csv(input_csv)) == 1000
+
+
+def test_scoring_jobs_are_capped_at_usable_cores(tmp_path):
+    with patch("src.services.scoring.SCORING_DATA_DIR", str(tmp_path)), \
+            patch("src.services.scoring.usable_cores", return_value=3), \
+            patch("src.services.scoring.score_file") as score:
+        run_scoring({"input": "input.csv", "output": "scores/out.csv", "workers": 1000})
+    assert score.call_args.kwargs["workers"] == 3
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../'))
+
+
+@pytest.fixture
+def trained_iris_model(tmp_path):
+    # Artefact produit par le vrai pipeline d'entraînement, sans toucher au cache d'entraînement du dépôt
+    with patch("src.services.data.training_cache.directory", str(tmp_path / "cache")):
+        model_path = run_training_pipeline()["model_path"]
+    yield model_path
+    os.remove(model_path)
+
+
+def test_score_cli_with_trained_iris_model(trained_iris_model, tmp_path):
+    # Exemple de la docstring de score.py
+    output = str(tmp_path / "predictions.csv")
+    result = subprocess.run([sys.executable, "score.py", "src/data/iris/Iris.csv", output, "--id-column", "Id"],
+                            cwd=ROOT, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    predictions = pd.read_csv(output)
+    iris = pd.read_csv(os.path.join(ROOT, "src/data/iris/Iris.csv"))
+    assert list(predictions.columns) == ["Id", "prediction"] and len(predictions) == len(iris)
+    assert (predictions["prediction"] == iris["Species"].str.replace("Iris-", "")).mean() > 0.9
@@ -0,0 +1,76 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.environment import load_environment, parse_env_file
+from src.services.jobs import JobManager
+from src.services.warmup import warmup
+from src.services.watcher import ArtifactWatcher
+
+app = get_application()
+client = TestClient(app)
+
+
+def test_environment_file(tmp_path, monkeypatch):
+    (tmp_path / "uat").write_text("# comment\n\nWEB_CONCURRENCY=4\nPRELOAD_MODE = 'eager'\nLOG_LEVEL=INFO\n")
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.delenv("PRELOAD_MODE", raising=False)
+
+    values = load_environment("uat", str(tmp_path))
+    assert values == {"WEB_CONCURRENCY": "4", "PRELOAD_MODE": "eager", "LOG_LEVEL": "INFO"}
+    assert os.environ["WEB_CONCURRENCY"] == "4" and os.environ["PRELOAD_MODE"] == "eager"
+    # La variable déjà définie dans l'environnement du processus l'emporte
+    assert os.environ["LOG_LEVEL"] == "DEBUG"
+    assert os.environ["APP_ENV"] == "uat"
+
+    with pytest.raises(ValueError):
+        load_environment("staging", str(tmp_path))
+    (tmp_path / "dev").write_text("NOT AN ASSIGNMENT\n")
+    with pytest.raises(ValueError):
+        parse_env_file(str(tmp_path / "dev"))
+
+
+def test_artifact_watcher(tmp_path):
+    model_path = tmp_path / "iris_model.pkl"
+    watcher = ArtifactWatcher([str(model_path)])
+    assert not watcher.poll()
+    model_path.write_bytes(b"v1")
+    assert watcher.poll()
+    assert not watcher.poll()
+
+    # Seuls les modèles publiés surveillés comptent : ni le cache, ni les modèles des datasets
+    os.makedirs(tmp_path / "datasets")
+    (tmp_path / "datasets" / "wine.pkl").write_bytes(b"v1")
+    (tmp_path / "cache.pkl").write_bytes(b"v1")
+    assert not watcher.poll()
+    model_path.write_bytes(b"version 2")
+    assert watcher.poll()
+    assert not watcher.poll()
+
+
+def test_liveness_and_readiness():
+    response = client.get("/health/live")
+    assert response.status_code == 200 and response.json()["status"] == "alive"
+
+    warmup.reset()
+    assert client.get("/health/ready").status_code == 503
+
+    warmup.start("lazy")
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready" and response.json()["warm"] is True
+    warmup.reset()
+
+
+def test_resume_disabled_for_secondary_workers(tmp_path):
+    manager = JobManager(str(tmp_path / "jobs.sqlite"))
+    manager.register("noop", lambda params: {})
+    manager.resume_on_startup = False
+    manager.store.unfinished = lambda: pytest.fail("jobs must not be resumed")
+    manager.resume()
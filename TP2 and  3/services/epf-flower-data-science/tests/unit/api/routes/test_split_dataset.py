@@ -42,4 +42,14 @@ def test_split_iris_dataset_endpoint(mock_dataset_file):
     assert "X_train" in data
     assert "X_test" in data
     assert "y_train" in data
-    assert "y_test" in data
\ No newline at end of file
+    assert "y_test" in data
+def test_split_iris_dataset_matches_pandas_split(mock_dataset_file):
+    from sklearn.model_selection import train_test_split
+    df = load_iris_dataset()
+    split_data = split_iris_dataset(df)
+    X_train, X_test, y_train, y_test = train_test_split(
+        df.drop(columns=['Species']), df['Species'], test_size=0.2, random_state=42
+    )
+    assert split_data["X_train"].tolist() == X_train.to_numpy().tolist()
+    assert split_data["y_test"].tolist() == y_test.tolist()
+    assert split_data["train_index"].tolist() == X_train.index.tolist()
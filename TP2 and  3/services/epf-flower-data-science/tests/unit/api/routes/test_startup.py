@@ -0,0 +1,73 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.api.router import build_router
+from src.app import get_application
+from src.services.warmup import Warmup, warmup
+
+SERVICE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../'))
+
+
+def test_application_import_does_not_load_heavy_dependencies():
+    code = (
+        "import sys\n"
+        f"sys.path.append({SERVICE_DIR!r})\n"
+        "from src.app import get_application\n"
+        "get_application()\n"
+        "print(','.join(m for m in ('sklearn', 'joblib', 'opendatasets', 'google.cloud.firestore') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_route_groups_subset():
+    app = get_application(route_groups=["hello", "metrics"])
+    paths = {route.path for route in app.routes}
+    assert "/hello/{name}" in paths and "/warmup-stats" in paths
+    assert "/predict" not in paths
+
+    with pytest.raises(ValueError):
+        build_router(["hello", "nope"])
+
+
+def test_warmup_modes_and_failing_step():
+    calls = []
+    steps = Warmup(mode="lazy")
+    steps.register("ok", lambda: calls.append("ok"))
+    steps.register("broken", lambda: 1 / 0)
+    steps.register("after", lambda: calls.append("after"))
+
+    steps.start()
+    assert steps.stats()["status"] == "skipped" and calls == []
+
+    steps.reset()
+    steps.start("background")
+    assert steps.wait(5)
+    stats = steps.stats()
+    assert stats["status"] == "ready" and stats["mode"] == "background"
+    assert calls == ["ok", "after"]
+    assert stats["steps"]["broken"]["error"] == "division by zero"
+    assert stats["steps"]["ok"]["error"] is None
+
+    with pytest.raises(ValueError):
+        steps.start("sometimes")
+
+
+def test_eager_preload_before_serving():
+    warmup.reset()
+    app = get_application(preload="eager")
+    # Seuls les handlers de démarrage : ceux d'arrêt fermeraient les pools partagés par les autres tests
+    asyncio.run(app.router.startup())
+    stats = TestClient(app).get("/warmup-stats").json()
+    assert stats["mode"] == "eager" and stats["status"] == "ready"
+    assert {"sklearn", "iris_dataset", "iris_model"} <= set(stats["steps"])
+    assert stats["steps"]["iris_dataset"]["error"] is None
+    warmup.reset()
+    warmup.mode = "lazy"
@@ -0,0 +1,62 @@
+import os
+import json
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch, mock_open
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.api.routes.data import router
+from src.app import get_application
+
+app = get_application()
+app.include_router(router, prefix="/data")
+
+client = TestClient(app)
+
+@pytest.fixture
+def mock_dataset_file():
+    dataset_data = """sepal_length,sepal_width,petal_length,petal_width,Species
+5.1,3.5,1.4,0.2,setosa
+4.9,3.0,1.4,0.2,setosa
+4.7,3.2,1.3,0.2,setosa
+"""
+    with patch("builtins.open", mock_open(read_data=dataset_data)):
+        yield
+
+def test_load_iris_dataset_json_page(mock_dataset_file):
+    response = client.get("/data/load-iris-dataset?limit=2&offset=1&columns=sepal_length,Species")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["columns"] == ["sepal_length", "Species"]
+    assert data["data"] == [[4.9, "setosa"], [4.7, "setosa"]]
+
+def test_load_iris_dataset_ndjson(mock_dataset_file):
+    response = client.get("/data/load-iris-dataset?format=ndjson&chunk_size=2")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 3
+    assert rows[0]["sepal_length"] == 5.1
+
+def test_process_iris_dataset_csv(mock_dataset_file):
+    response = client.get("/data/process-iris-dataset?format=csv&chunk_size=1&columns=Species")
+    assert response.status_code == 200
+    assert response.text.splitlines() == ["Species", "setosa", "setosa", "setosa"]
+
+def test_arrow_stream(mock_dataset_file):
+    pa = pytest.importorskip("pyarrow")
+    response = client.get("/data/load-iris-dataset?format=arrow&chunk_size=2")
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 3
+
+def test_unknown_column(mock_dataset_file):
+    response = client.get("/data/load-iris-dataset?columns=unknown")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unknown columns: unknown"}
+
+def test_unknown_format(mock_dataset_file):
+    response = client.get("/data/load-iris-dataset?format=xml")
+    assert response.status_code == 400
@@ -2,9 +2,10 @@ import os
 import json
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, mock_open
-import pandas as pd
 from io import StringIO
+from unittest.mock import patch
+
+import pandas as pd
 
 import sys
 import os
@@ -21,26 +22,29 @@ app.include_router(router, prefix="/data")
 client = TestClient(app)
 
 @pytest.fixture
-def mock_dataset_file():
+def mock_dataset_file(tmp_path):
     dataset_data = """sepal_length,sepal_width,petal_length,petal_width,Species
 5.1,3.5,1.4,0.2,setosa
 4.9,3.0,1.4,0.2,setosa
 4.7,3.2,1.3,0.2,setosa
 """
-    with patch("builtins.open", mock_open(read_data=dataset_data)):
+    # Seule la lecture du dataset est remplacée : model_parameters.json reste lu normalement
+    with patch("src.services.data.dataset_cache.get", return_value=pd.read_csv(StringIO(dataset_data))), \
+            patch("src.services.data.training_cache.directory", str(tmp_path / "cache")):
         yield
+    model_path = os.path.join(os.path.dirname(__file__), '../../../../src/models/iris_model.pkl')
+    if os.path.exists(model_path):
+        os.remove(model_path)
 
 def test_train_model_success(mock_dataset_file):
     df = load_iris_dataset()
     df_processed = process_iris_dataset(df)
     split_data = split_iris_dataset(df_processed)
-    X_train = pd.read_json(StringIO(split_data["X_train"]), orient='split')
-    y_train = pd.read_json(StringIO(split_data["y_train"]), orient='split').squeeze()
-    model_path = train_model(X_train, y_train)
+    model_path = train_model(split_data["X_train"], split_data["y_train"])
     assert os.path.exists(model_path)
 
 def test_train_iris_model_endpoint(mock_dataset_file):
-    response = client.post("/data/train-iris-model")
+    response = client.post("/data/train-iris-model?wait=true")
     assert response.status_code == 200
     data = response.json()
     assert "message" in data
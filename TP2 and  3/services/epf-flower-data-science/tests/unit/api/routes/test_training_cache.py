@@ -0,0 +1,118 @@
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services.training_cache import TrainingCache, training_cache, training_key
+from src.services.watcher import ArtifactWatcher
+
+app = get_application()
+client = TestClient(app)
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '../../../../src/models/iris_model.pkl')
+X = np.array([[5.1, 3.5], [6.7, 3.0]])
+y = np.array(["setosa", "virginica"], dtype=object)
+
+
+def test_training_key():
+    key = training_key(X, y, {"n_estimators": 10, "criterion": "gini"})
+    # Ordre des paramètres sans importance, contenu des données oui
+    assert key == training_key(X.copy(), y.copy(), {"criterion": "gini", "n_estimators": 10})
+    assert key != training_key(X, y, {"n_estimators": 11, "criterion": "gini"})
+    assert key != training_key(X + 0.1, y, {"n_estimators": 10, "criterion": "gini"})
+    assert key != training_key(X, y[::-1], {"n_estimators": 10, "criterion": "gini"})
+    assert key != training_key(X.astype(np.float32), y, {"n_estimators": 10, "criterion": "gini"})
+    assert key != training_key(X, y, {"n_estimators": 10, "criterion": "gini"}, {"schema": {"target": "Species"}})
+
+
+def write(path, content):
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def test_store_and_restore(tmp_path):
+    cache = TrainingCache(str(tmp_path / "cache"))
+    model_path = str(tmp_path / "model.pkl")
+    assert not cache.restore("a", model_path)
+
+    write(model_path, b"model a")
+    cache.store("a", model_path)
+    assert cache.restore("a", model_path)
+    write(model_path, b"model b")
+    cache.store("b", model_path)
+
+    assert cache.restore("a", model_path)
+    assert open(model_path, "rb").read() == b"model a"
+    # Modèle réécrit sur place : l'artefact en cache ne change pas
+    write(model_path, b"model c")
+    assert open(cache.path("a"), "rb").read() == b"model a"
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["stores"] == 2 and stats["entries"] == 2
+
+
+def test_retention(tmp_path):
+    cache = TrainingCache(str(tmp_path / "cache"), keep=2)
+    model_path = str(tmp_path / "model.pkl")
+    for age, key in enumerate("abc"):
+        write(model_path, key.encode())
+        with patch("src.services.training_cache.time.time", return_value=1000 + age):
+            cache.store(key, model_path)
+    # "a" est la moins récemment utilisée
+    assert [entry.name for entry in cache.entries()] == ["c.pkl", "b.pkl"]
+
+    # Une restauration compte comme une utilisation, sans toucher au fichier de l'entrée
+    mtime = os.stat(cache.path("b")).st_mtime_ns
+    with patch("src.services.training_cache.time.time", return_value=2000):
+        cache.restore("b", model_path)
+    assert os.stat(cache.path("b")).st_mtime_ns == mtime
+    cache.max_age = 60
+    assert cache.gc(now=2030) == 1
+    assert [entry.name for entry in cache.entries()] == ["b.pkl"]
+    assert cache.stats()["collected"] == 2
+
+
+def test_hits_do_not_reload_the_servers(tmp_path):
+    cache = TrainingCache(str(tmp_path / "cache"))
+    model_path = str(tmp_path / "model.pkl")
+    write(model_path, b"model a")
+    watcher = ArtifactWatcher([model_path])
+    watcher.poll()
+    cache.store("a", model_path)
+    assert cache.restore("a", model_path)
+    assert not watcher.poll()
+
+    # Autre artefact publié : rechargement
+    write(model_path, b"model b")
+    cache.store("b", model_path)
+    assert cache.restore("a", model_path)
+    assert watcher.poll()
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    with patch.object(training_cache, "directory", str(tmp_path / "cache")):
+        yield
+    os.remove(MODEL_PATH)
+
+
+def test_unchanged_inputs_are_not_refitted(cache_dir):
+    response = client.post("/train-iris-model?wait=true")
+    assert response.status_code == 200 and response.json()["cached"] is False
+    digest = client.get("/model-metadata").json()["sha256"]
+
+    with patch("src.services.data.fit_model") as fit_model:
+        response = client.post("/train-iris-model?wait=true")
+    assert response.status_code == 200 and response.json()["cached"] is True
+    fit_model.assert_not_called()
+    assert client.get("/model-metadata").json()["sha256"] == digest
+
+    # Paramètres modifiés : nouvel entraînement
+    with patch("src.services.data.load_model_parameters", return_value={"n_estimators": 5}):
+        assert client.post("/train-iris-model?wait=true").json()["cached"] is False
+    assert client.get("/training-cache-stats").json()["entries"] == 2
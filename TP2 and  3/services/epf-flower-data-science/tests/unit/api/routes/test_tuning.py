@@ -0,0 +1,174 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+
+from src.app import get_application
+from src.services import parameters as parameters_service
+from src.services.config_store import ConfigStore
+from src.services.data import load_iris_dataset, process_iris_dataset, split_iris_dataset
+from src.services.datasets import DatasetEngine
+from src.services.jobs import job_manager
+from src.services.tuning import Tuner, training_rows
+
+app = get_application()
+client = TestClient(app)
+
+CLASSES = ("setosa", "versicolor", "virginica")
+
+
+def make_rows(n, seed):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 3, n)
+    X = (rng.normal(size=(n, 4)) * 0.6 + y[:, np.newaxis] * 1.0).astype(np.float32)
+    return X, y.astype(np.int32)
+
+
+@pytest.fixture
+def tuner(tmp_path):
+    tuner = Tuner(str(tmp_path / "tuning"))
+    with patch("src.services.tuning.tuner", tuner), patch("src.api.routes.tuning.tuner", tuner):
+        yield tuner
+
+
+@pytest.fixture
+def parameters_file(tmp_path):
+    path = tmp_path / "model_parameters.json"
+    path.write_text(json.dumps({"RandomForestClassifier": {"n_estimators": 100, "criterion": "gini"}}))
+    with patch("src.services.tuning.model_parameters_store", ConfigStore(str(path))):
+        yield path
+
+
+def test_grid_search_and_fold_cache(tuner):
+    X, y = make_rows(300, 0)
+    grid = {"max_depth": [1, None], "n_estimators": [5, 20]}
+
+    first = tuner.search(X, y, grid, cv=3)
+    assert len(first["candidates"]) == 4
+    assert first["fold_fits"] == 12
+    assert first["fold_cache_hits"] == 0
+    # Des souches (profondeur 1) ne séparent pas trois classes
+    assert first["best_params"]["max_depth"] is None
+    assert first["best_score"] == max(candidate["score"] for candidate in first["candidates"])
+    # La copie partagée des données est supprimée à la fin de la recherche
+    assert not [name for name in os.listdir(tuner.cache_dir) if name.endswith(".npy")]
+
+    # Même recherche : tout vient du cache
+    second = tuner.search(X, y, grid, cv=3)
+    assert second["fold_fits"] == 0
+    assert second["fold_cache_hits"] == 12
+    assert second["best_params"] == first["best_params"]
+
+    # Les scores survivent à un redémarrage (fichier par jeu de données)
+    restarted = Tuner(tuner.cache_dir)
+    assert restarted.search(X, y, grid, cv=3)["fold_fits"] == 0
+
+    # Une grille qui recoupe la précédente ne réévalue que les nouveaux candidats
+    third = tuner.search(X, y, {"max_depth": [None, 3], "n_estimators": [20]}, cv=3)
+    assert third["fold_fits"] == 3
+    assert third["fold_cache_hits"] == 3
+
+
+def test_successive_halving(tuner):
+    X, y = make_rows(900, 0)
+    grid = {"max_depth": [1, 2, 3, None], "n_estimators": [5, 10]}
+
+    result = tuner.search(X, y, grid, strategy="halving", cv=3, factor=3)
+    assert result["rounds"] == [300, 900]
+    rows = [candidate["rows"] for candidate in result["candidates"]]
+    assert rows.count(300) == 8
+    assert rows.count(900) == 3
+    # Moins de fits qu'une recherche exhaustive sur toutes les lignes
+    assert result["fold_fits"] == 33
+    assert result["best_params"]["max_depth"] != 1
+
+
+def test_invalid_search(tuner):
+    X, y = make_rows(100, 0)
+    with pytest.raises(ValueError, match="Unknown parameters"):
+        tuner.search(X, y, {"depth": [1]})
+    with pytest.raises(ValueError, match="Unknown search strategy"):
+        tuner.search(X, y, {"max_depth": [1]}, strategy="random")
+
+
+@pytest.fixture
+def engine(tmp_path):
+    X, y = make_rows(300, 0)
+    df = pd.DataFrame(X, columns=["a", "b", "c", "d"])
+    df["label"] = np.asarray(CLASSES)[y]
+    (tmp_path / "flowers").mkdir()
+    df.to_csv(tmp_path / "flowers" / "flowers.csv", index=False)
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"flowers": {"name": "flowers", "url": "https://example.com/flowers.csv"}}))
+    engine = DatasetEngine(ConfigStore(str(config_path)), str(tmp_path), str(tmp_path / "models"))
+    with patch("src.services.tuning.dataset_engine", engine), patch("src.api.routes.tuning.dataset_engine", engine):
+        yield engine
+
+
+def test_tune_endpoint_writes_back_parameters(engine, tuner, parameters_file):
+    body = {"dataset": "flowers", "param_grid": {"n_estimators": [5, 15], "max_depth": [1, None]}, "apply": True}
+    response = client.post("/tune?wait=true", json=body)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["applied"] is True
+    assert result["fold_fits"] == 12
+
+    parameters = json.loads(parameters_file.read_text())["RandomForestClassifier"]
+    assert parameters["n_estimators"] == result["best_params"]["n_estimators"]
+    assert parameters["max_depth"] == result["best_params"]["max_depth"]
+    assert parameters["criterion"] == "gini"
+
+    assert client.get("/tune-cache-stats").json()["misses"] == 12
+
+
+def test_tune_endpoint_syncs_firestore(engine, tuner, parameters_file):
+    with patch.object(parameters_service, "get_firestore_client") as firestore_client:
+        body = {"dataset": "flowers", "param_grid": {"n_estimators": [5, 15]}, "apply": True, "sync_firestore": True}
+        response = client.post("/tune?wait=true", json=body)
+        assert response.status_code == 200
+        firestore_client.return_value.update_parameters.assert_called_once_with(
+            {"n_estimators": response.json()["best_params"]["n_estimators"]}
+        )
+
+
+def test_tune_endpoint_in_background(engine, tuner, parameters_file):
+    body = {"dataset": "flowers", "param_grid": {"n_estimators": [5]}, "apply": False}
+    response = client.post("/tune", json=body)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    job_manager.wait(job_id)
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "succeeded"
+    assert client.get(f"/jobs/{job_id}/result").json()["applied"] is False
+    assert json.loads(parameters_file.read_text())["RandomForestClassifier"]["n_estimators"] == 100
+
+
+def test_iris_is_tuned_on_the_training_matrix(tuner, parameters_file):
+    # Même matrice que train_model : toutes les colonnes sauf Species, Id compris
+    split_data = split_iris_dataset(process_iris_dataset(load_iris_dataset()))
+    X, y = training_rows("iris")
+    assert "Id" in split_data["feature_names"]
+    np.testing.assert_array_equal(X, split_data["X_train"])
+    np.testing.assert_array_equal(np.unique(split_data["y_train"])[y], split_data["y_train"])
+
+    # Sans `apply`, les paramètres ne sont pas modifiés
+    response = client.post("/tune?wait=true", json={"dataset": "iris", "param_grid": {"n_estimators": [5]}})
+    assert response.status_code == 200
+    assert response.json()["applied"] is False
+    assert response.json()["rounds"] == [len(split_data["y_train"])]
+    assert json.loads(parameters_file.read_text())["RandomForestClassifier"]["n_estimators"] == 100
+
+
+def test_tune_endpoint_rejects_invalid_search(tuner):
+    response = client.post("/tune", json={"param_grid": {"depth": [1]}})
+    assert response.status_code == 400
+    assert "Unknown parameters" in response.json()["detail"]
+    response = client.post("/tune", json={"param_grid": {"max_depth": [1]}, "strategy": "random"})
+    assert response.status_code == 400